@@ -0,0 +1,27 @@
+// Client-disconnect cancellation.
+//
+// req.signal aborts when the client goes away before the response has been
+// fully written: a superseded or cleared Gradio event, a closed tab, a frontend
+// that gave up. Handlers pass it to the OpenAI / ElevenLabs calls (through
+// Upstream.call) so abandoned analyses stop spending tokens and free their
+// fan-out slots. Coalesced work is only aborted once every subscriber is gone.
+
+const { metrics } = require('./telemetry');
+
+// Express middleware: runs after tracing so the log line carries the trace ID
+function cancellation(req, res, next) {
+  const controller = new AbortController();
+  req.signal = controller.signal;
+
+  res.on('close', () => {
+    if (res.writableFinished) return;
+    controller.abort();
+    const route = req.route?.path || 'unmatched';
+    metrics.cancelledRequests.inc({ route });
+    console.log(`[trace ${req.trace?.id}] client disconnected; cancelled ${req.method} ${req.originalUrl}`);
+  });
+
+  next();
+}
+
+module.exports = { cancellation };
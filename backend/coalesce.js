@@ -0,0 +1,102 @@
+// Single-flight request coalescing.
+//
+// Concurrent requests with the same key (e.g. the same normalized crisis text
+// and leader set) attach to one in-flight computation instead of fanning out
+// their own LLM calls. Every subscriber replays the flight's events from the
+// start (so streaming clients still see each agent) and receives its result.
+// Flights are forgotten as soon as they settle; caching is a separate concern.
+// A subscriber whose client disconnects detaches on its own signal; the flight's
+// work is only aborted once no subscriber is left.
+
+const crypto = require('crypto');
+
+class Flight {
+  constructor() {
+    this.events = [];
+    this.listeners = new Set();
+    this.promise = null;
+    this.subscribers = 0;
+    this.settled = false;
+    this.controller = new AbortController();
+  }
+
+  get signal() {
+    return this.controller.signal;
+  }
+
+  emit(event) {
+    this.events.push(event);
+    for (const listener of this.listeners) listener(event);
+  }
+
+  // Replay buffered events, forward new ones, and resolve with the flight's result;
+  // rejects early with signal's reason if the subscriber's own signal aborts
+  subscribe(onEvent = () => {}, signal = null) {
+    this.events.forEach(onEvent);
+    this.listeners.add(onEvent);
+    this.subscribers++;
+
+    let onAbort;
+    const detached = new Promise((resolve, reject) => {
+      onAbort = () => reject(signal.reason);
+      if (signal?.aborted) onAbort();
+      else signal?.addEventListener('abort', onAbort, { once: true });
+    });
+
+    return Promise.race([this.promise, detached]).finally(() => {
+      signal?.removeEventListener('abort', onAbort);
+      this.listeners.delete(onEvent);
+      // Nobody is waiting for the result any more: stop paying for it
+      if (--this.subscribers === 0 && !this.settled) this.controller.abort(signal?.reason);
+    });
+  }
+}
+
+class SingleFlight {
+  constructor(name) {
+    this.name = name;
+    this.flights = new Map();
+    this.counters = { leaders: 0, followers: 0, abandoned: 0 };
+  }
+
+  // { flight, joined } for key; work(emit, signal) only runs when no flight is in
+  // progress, and signal aborts when every subscriber has gone
+  join(key, work) {
+    const existing = this.flights.get(key);
+    if (existing) {
+      this.counters.followers++;
+      return { flight: existing, joined: true };
+    }
+
+    const flight = new Flight();
+    this.flights.set(key, flight);
+    this.counters.leaders++;
+    // An abandoned flight leaves the map at once so a new request starts afresh
+    flight.signal.addEventListener('abort', () => {
+      this.counters.abandoned++;
+      if (this.flights.get(key) === flight) this.flights.delete(key);
+    }, { once: true });
+    flight.promise = Promise.resolve()
+      .then(() => work(event => flight.emit(event), flight.signal))
+      .finally(() => {
+        flight.settled = true;
+        if (this.flights.get(key) === flight) this.flights.delete(key);
+      });
+    return { flight, joined: false };
+  }
+
+  stats() {
+    return { ...this.counters, in_flight: this.flights.size };
+  }
+}
+
+// Collapse whitespace so trivially different submissions share a key (matches the frontend cache key)
+function normalizeText(text) {
+  return String(text).replace(/\s+/g, ' ').trim();
+}
+
+function flightKey(...parts) {
+  return crypto.createHash('sha256').update(parts.map(part => JSON.stringify(part)).join('\n')).digest('hex');
+}
+
+module.exports = { Flight, SingleFlight, normalizeText, flightKey };
@@ -0,0 +1,83 @@
+// Leader registry: every data/personalities/<stem>_final_profile.json with a
+// matching <stem>_beliefs.json becomes a leader. The profile's "registry"
+// block supplies display metadata and the voice; anything missing falls back
+// to values derived from the file name.
+
+const fs = require('fs');
+const path = require('path');
+
+const PERSONALITY_DIR = path.join(__dirname, 'data/personalities');
+
+function titleCase(stem) {
+  return stem.replace(/[_-]+/g, ' ').replace(/\b\w/g, c => c.toUpperCase());
+}
+
+// Resolve "{behavioral_parameters.escalation_ladder.0}"-style placeholders against a profile
+function renderProfileTemplate(template, profile) {
+  return template.replace(/\{([\w.]+)\}/g, (match, dotted) => {
+    const value = dotted.split('.').reduce((obj, part) => (obj == null ? undefined : obj[part]), profile);
+    return value === undefined ? match : String(value);
+  });
+}
+
+// Key-insight line for leaders whose registry block has none: "<Name> favors <phase> approach"
+const DEFAULT_KEY_INSIGHT = { verb: 'favors', field: 'escalation_phase', format: '{value} approach', fallback: 'measured' };
+
+function loadLeaders(directory = PERSONALITY_DIR) {
+  const leaders = [];
+
+  for (const file of fs.readdirSync(directory).sort()) {
+    if (!file.endsWith('_final_profile.json')) continue;
+
+    const stem = file.slice(0, -'_final_profile.json'.length);
+    const beliefsFile = path.join(directory, `${stem}_beliefs.json`);
+    if (!fs.existsSync(beliefsFile)) {
+      console.warn(`Skipping ${file}: no ${stem}_beliefs.json`);
+      continue;
+    }
+
+    const profile = JSON.parse(fs.readFileSync(path.join(directory, file), 'utf8'));
+    const beliefs = JSON.parse(fs.readFileSync(beliefsFile, 'utf8'));
+    const meta = profile.registry || {};
+    const displayName = meta.display_name || titleCase(stem);
+
+    leaders.push({
+      key: meta.key || stem,
+      order: meta.order ?? Number.MAX_SAFE_INTEGER,
+      name: displayName,
+      shortName: meta.short_name || displayName.split(' ').slice(-1)[0],
+      dossierName: meta.dossier_name || displayName.toUpperCase(),
+      description: meta.description || 'Leadership Profile',
+      color: meta.color || '#1a1a1a',
+      voiceId: meta.voice_id || null,
+      personalityNote: meta.personality_note ? renderProfileTemplate(meta.personality_note, profile) : '',
+      summaryVerb: meta.summary_verb || 'signals',
+      summaryFallback: meta.summary_fallback || 'a considered position',
+      keyInsight: { ...DEFAULT_KEY_INSIGHT, ...meta.key_insight },
+      profile,
+      beliefs: beliefs.beliefs
+    });
+  }
+
+  leaders.sort((a, b) => a.order - b.order || a.key.localeCompare(b.key));
+  return leaders;
+}
+
+const LEADERS = loadLeaders();
+const LEADER_KEYS = LEADERS.map(leader => leader.key);
+const LEADERS_BY_KEY = Object.fromEntries(LEADERS.map(leader => [leader.key, leader]));
+
+// Public metadata for the frontend (no prompt material)
+function leaderSummaries() {
+  return LEADERS.map(leader => ({
+    key: leader.key,
+    name: leader.name,
+    short_name: leader.shortName,
+    dossier_name: leader.dossierName,
+    description: leader.description,
+    color: leader.color,
+    voice_id: leader.voiceId
+  }));
+}
+
+module.exports = { LEADERS, LEADER_KEYS, LEADERS_BY_KEY, leaderSummaries };
@@ -0,0 +1,276 @@
+// Resilience layer for upstream calls (OpenAI, ElevenLabs):
+// exponential-backoff retries under a shared retry budget, a circuit breaker
+// per upstream, and optional hedged duplicates for calls slower than their p95.
+// Calls take the caller's AbortSignal so a disconnected client stops paying for them.
+
+const { setTimeout: sleep } = require('timers/promises');
+
+const RETRY_MAX_ATTEMPTS = parseInt(process.env.RETRY_MAX_ATTEMPTS || '2', 10);
+const RETRY_BASE_DELAY_MS = parseInt(process.env.RETRY_BASE_DELAY_MS || '250', 10);
+const RETRY_MAX_DELAY_MS = parseInt(process.env.RETRY_MAX_DELAY_MS || '4000', 10);
+const RETRY_BUDGET_RATIO = parseFloat(process.env.RETRY_BUDGET_RATIO || '0.2');
+const RETRY_BUDGET_MIN = parseInt(process.env.RETRY_BUDGET_MIN || '3', 10);
+const RETRY_BUDGET_WINDOW_MS = 10000;
+
+const BREAKER_FAILURE_THRESHOLD = parseInt(process.env.BREAKER_FAILURE_THRESHOLD || '5', 10);
+const BREAKER_RESET_MS = parseInt(process.env.BREAKER_RESET_MS || '30000', 10);
+
+const HEDGE_ENABLED = process.env.HEDGE_ENABLED === 'true';
+const HEDGE_MIN_SAMPLES = parseInt(process.env.HEDGE_MIN_SAMPLES || '20', 10);
+const LATENCY_WINDOW = 200;
+
+class CircuitOpenError extends Error {
+  constructor(upstream) {
+    super(`${upstream} circuit open`);
+    this.name = 'CircuitOpenError';
+  }
+}
+
+// closed → open after N consecutive failures; open → half_open after the reset
+// timeout, letting one probe through; probe success closes, failure reopens
+class CircuitBreaker {
+  constructor(name, { failureThreshold = BREAKER_FAILURE_THRESHOLD, resetTimeoutMs = BREAKER_RESET_MS } = {}) {
+    this.name = name;
+    this.failureThreshold = failureThreshold;
+    this.resetTimeoutMs = resetTimeoutMs;
+    this.state = 'closed';
+    this.failures = 0;
+    this.openedAt = 0;
+    this.probeInFlight = false;
+    this.rejected = 0;
+  }
+
+  allowRequest() {
+    if (this.state === 'open' && Date.now() - this.openedAt >= this.resetTimeoutMs) {
+      this.state = 'half_open';
+      this.probeInFlight = false;
+    }
+    if (this.state === 'closed') return true;
+    if (this.state === 'half_open' && !this.probeInFlight) {
+      this.probeInFlight = true;
+      return true;
+    }
+    this.rejected++;
+    return false;
+  }
+
+  recordSuccess() {
+    this.state = 'closed';
+    this.failures = 0;
+    this.probeInFlight = false;
+  }
+
+  recordFailure() {
+    this.failures++;
+    this.probeInFlight = false;
+    if (this.state === 'half_open' || this.failures >= this.failureThreshold) {
+      this.state = 'open';
+      this.openedAt = Date.now();
+    }
+  }
+
+  stats() {
+    return { state: this.state, consecutive_failures: this.failures, rejected: this.rejected };
+  }
+}
+
+// Retries may not exceed RETRY_BUDGET_RATIO of recent requests (plus a small
+// floor), so an upstream outage cannot multiply our own traffic
+class RetryBudget {
+  constructor({ ratio = RETRY_BUDGET_RATIO, minRetries = RETRY_BUDGET_MIN, windowMs = RETRY_BUDGET_WINDOW_MS } = {}) {
+    this.ratio = ratio;
+    this.minRetries = minRetries;
+    this.windowMs = windowMs;
+    this.requests = [];
+    this.retries = [];
+    this.exhausted = 0;
+  }
+
+  prune(now) {
+    while (this.requests.length && now - this.requests[0] > this.windowMs) this.requests.shift();
+    while (this.retries.length && now - this.retries[0] > this.windowMs) this.retries.shift();
+  }
+
+  recordRequest() {
+    this.requests.push(Date.now());
+  }
+
+  tryRetry() {
+    const now = Date.now();
+    this.prune(now);
+    const allowed = Math.max(this.minRetries, this.requests.length * this.ratio);
+    if (this.retries.length >= allowed) {
+      this.exhausted++;
+      return false;
+    }
+    this.retries.push(now);
+    return true;
+  }
+
+  stats() {
+    this.prune(Date.now());
+    return { window_requests: this.requests.length, window_retries: this.retries.length, exhausted: this.exhausted };
+  }
+}
+
+// Rolling latency samples per call key (e.g. one per leader)
+class LatencyTracker {
+  constructor(size = LATENCY_WINDOW) {
+    this.size = size;
+    this.samples = new Map();
+  }
+
+  record(key, ms) {
+    const samples = this.samples.get(key) || [];
+    samples.push(ms);
+    if (samples.length > this.size) samples.shift();
+    this.samples.set(key, samples);
+  }
+
+  percentile(key, p) {
+    const samples = this.samples.get(key);
+    if (!samples || samples.length < HEDGE_MIN_SAMPLES) return null;
+    const sorted = [...samples].sort((a, b) => a - b);
+    return sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))];
+  }
+}
+
+function isAbortError(error) {
+  return error?.name === 'AbortError' || error?.name === 'APIUserAbortError';
+}
+
+function isRetryable(error) {
+  if (isAbortError(error) || error instanceof CircuitOpenError) return false;
+  const status = error.status || error.statusCode;
+  // No status means the request never got a response (network / timeout)
+  return !status || status === 408 || status === 409 || status === 429 || status >= 500;
+}
+
+function backoffDelay(attempt) {
+  const exp = Math.min(RETRY_MAX_DELAY_MS, RETRY_BASE_DELAY_MS * 2 ** attempt);
+  return exp / 2 + Math.random() * exp / 2;
+}
+
+class Upstream {
+  constructor(name) {
+    this.name = name;
+    this.breaker = new CircuitBreaker(name);
+    this.budget = new RetryBudget();
+    this.latency = new LatencyTracker();
+    // cancelled: aborted mid-call by the caller; skipped: caller gone before the call started
+    this.counters = { calls: 0, failures: 0, retries: 0, hedges: 0, hedge_wins: 0, cancelled: 0, skipped: 0 };
+  }
+
+  // Run task(signal) with hedging when the key's p95 is known; the loser is aborted,
+  // and both attempts abort with the caller's signal
+  async hedged(task, key, signal) {
+    const p95 = HEDGE_ENABLED && key ? this.latency.percentile(key, 0.95) : null;
+    const primary = new AbortController();
+    const linked = controller => signal ? AbortSignal.any([controller.signal, signal]) : controller.signal;
+    if (p95 === null) return task(linked(primary));
+
+    const secondary = new AbortController();
+    let timer;
+    let hedging = false;
+    let skipHedge;
+    // A hedge only races a primary that is still pending; once the primary has failed,
+    // the budgeted retry loop in call() decides whether to try again
+    const second = new Promise((resolve, reject) => {
+      skipHedge = reject;
+      timer = setTimeout(() => { hedging = true; resolve(); }, p95);
+    })
+      .then(() => {
+        signal?.throwIfAborted();
+        this.counters.hedges++;
+        return task(linked(secondary)).then(result => ({ result, hedge: true }));
+      });
+    const first = task(linked(primary)).then(result => ({ result, hedge: false }), error => {
+      if (!hedging) {
+        clearTimeout(timer);
+        skipHedge(error);
+      }
+      throw error;
+    });
+
+    try {
+      const winner = await Promise.any([first, second]);
+      if (winner.hedge) {
+        this.counters.hedge_wins++;
+        primary.abort();
+      } else {
+        secondary.abort();
+      }
+      return winner.result;
+    } catch (aggregate) {
+      throw aggregate.errors ? aggregate.errors[0] : aggregate;
+    } finally {
+      clearTimeout(timer);
+    }
+  }
+
+  // Call task(signal) through the breaker with budgeted exponential-backoff retries;
+  // an aborted `signal` (client gone) stops the call, its retries and its hedge
+  async call(task, { key = null, maxRetries = RETRY_MAX_ATTEMPTS, signal } = {}) {
+    if (signal?.aborted) {
+      this.counters.skipped++;
+      signal.throwIfAborted();
+    }
+    this.counters.calls++;
+    this.budget.recordRequest();
+
+    for (let attempt = 0; ; attempt++) {
+      if (!this.breaker.allowRequest()) throw new CircuitOpenError(this.name);
+
+      const started = Date.now();
+      try {
+        const result = await this.hedged(task, key, signal);
+        this.breaker.recordSuccess();
+        if (key) this.latency.record(key, Date.now() - started);
+        return result;
+      } catch (error) {
+        if (signal?.aborted) {
+          this.counters.cancelled++;
+          this.breaker.probeInFlight = false;
+          throw isAbortError(error) ? error : signal.reason;
+        }
+        if (!isRetryable(error)) {
+          // Client-side errors (bad request, aborts) say nothing about upstream health
+          this.breaker.probeInFlight = false;
+          throw error;
+        }
+        this.counters.failures++;
+        this.breaker.recordFailure();
+        if (attempt >= maxRetries || !this.budget.tryRetry()) throw error;
+        this.counters.retries++;
+        await sleep(backoffDelay(attempt), undefined, { signal }).catch(error => {
+          this.counters.cancelled++;
+          throw error;
+        });
+      }
+    }
+  }
+
+  stats() {
+    const p95 = {};
+    for (const key of this.latency.samples.keys()) {
+      p95[key] = this.latency.percentile(key, 0.95);
+    }
+    return {
+      ...this.counters,
+      breaker: this.breaker.stats(),
+      retry_budget: this.budget.stats(),
+      p95_latency_ms: p95
+    };
+  }
+}
+
+const upstreams = {
+  openai: new Upstream('openai'),
+  elevenlabs: new Upstream('elevenlabs')
+};
+
+function resilienceStats() {
+  return Object.fromEntries(Object.entries(upstreams).map(([name, upstream]) => [name, upstream.stats()]));
+}
+
+module.exports = { upstreams, resilienceStats, CircuitOpenError, isAbortError, isRetryable, HEDGE_ENABLED };
@@ -3,13 +3,22 @@ const cors = require('cors');
 const OpenAI = require('openai');
 const { ElevenLabsClient } = require('@elevenlabs/elevenlabs-js');
 require('dotenv').config();
+const { upstreams, resilienceStats, isAbortError } = require('./resilience');
+const { registerCollector, renderMetrics, span, recordTokens, tracing } = require('./telemetry');
+const { SingleFlight, normalizeText, flightKey } = require('./coalesce');
+const { cancellation } = require('./cancellation');
+const { LEADERS, LEADER_KEYS, LEADERS_BY_KEY, leaderSummaries } = require('./registry');
+const { planSweep } = require('./sweep');
+const { SimulationState, SIMULATION_MAX_ROUNDS } = require('./simulation');
 
 const app = express();
 const PORT = process.env.PORT || 3001;
 
 // Initialize OpenAI
+// Retries go through upstreams.*.call (budget + breaker), so the SDKs must not add their own
 const openai = new OpenAI({
-  apiKey: process.env.OPENAI_API_KEY
+  apiKey: process.env.OPENAI_API_KEY,
+  maxRetries: 0
 });
 
 // Initialize ElevenLabs
@@ -18,48 +27,80 @@ const elevenlabs = new ElevenLabsClient({
 });
 
 app.use(cors());
-app.use(express.json());
+// Uploaded documents can be large; keep a generous but bounded body limit
+app.use(express.json({ limit: process.env.JSON_BODY_LIMIT || '25mb' }));
+// Trace IDs and per-request spans (after the body parser so handlers inherit the trace)
+app.use(tracing);
+// req.signal aborts when the client disconnects; passed down to every upstream call
+app.use(cancellation);
 
-// Load real personality profiles from JSON files
-const fs = require('fs');
-const path = require('path');
+// Leader fan-out: how many agent LLM calls one request may have in flight
+const AGENT_CONCURRENCY = parseInt(process.env.AGENT_CONCURRENCY || '8', 10);
 
-// Load JSON files
-const rooseveltProfile = JSON.parse(fs.readFileSync(path.join(__dirname, 'data/personalities/roosevelt_final_profile.json'), 'utf8'));
-const rooseveltBeliefs = JSON.parse(fs.readFileSync(path.join(__dirname, 'data/personalities/roosevelt_beliefs.json'), 'utf8'));
-const gandhiProfile = JSON.parse(fs.readFileSync(path.join(__dirname, 'data/personalities/indira_final_profile.json'), 'utf8'));
-const gandhiBeliefs = JSON.parse(fs.readFileSync(path.join(__dirname, 'data/personalities/indira_beliefs.json'), 'utf8'));
-const putinProfile = JSON.parse(fs.readFileSync(path.join(__dirname, 'data/personalities/putin_final_profile.json'), 'utf8'));
-const putinBeliefs = JSON.parse(fs.readFileSync(path.join(__dirname, 'data/personalities/putin_beliefs.json'), 'utf8'));
+// Belief sweeps: agent calls in flight per sweep (the call budget is in sweep.js)
+const SWEEP_AGENT_CONCURRENCY = parseInt(process.env.SWEEP_AGENT_CONCURRENCY || '6', 10);
 
-// Analyze documents through agent psychological frameworks
-async function analyzeDocumentThroughAgent(leaderName, documentText, filename) {
-  let profile, beliefs, name;
-  
-  // Select the right profile and beliefs
-  switch(leaderName) {
-    case 'roosevelt':
-      profile = rooseveltProfile;
-      beliefs = rooseveltBeliefs;
-      name = "Theodore Roosevelt";
-      break;
-    case 'gandhi':
-      profile = gandhiProfile;
-      beliefs = gandhiBeliefs;
-      name = "Indira Gandhi";
-      break;
-    case 'putin':
-      profile = putinProfile;
-      beliefs = putinBeliefs;
-      name = "Vladimir Putin";
-      break;
-  }
-
-  const systemPrompt = `You are ${name}. Analyze this diplomatic document through your psychological framework.
-
-DOCUMENT: "${documentText}"
-
-Based on your psychological profile, analyze what this document REALLY means:
+// Real personality profiles are loaded by the registry from data/personalities
+const AGENT_NAMES = Object.fromEntries(LEADERS.map(leader => [leader.key, leader.name]));
+
+// ---------------------------------------------------------------------------
+// Precompiled leader prompts
+//
+// Everything that depends only on the leader is rendered once at startup into a
+// stable system prompt, and the per-request input (crisis, document) is sent
+// last in the user message. Identical prefixes across requests let the
+// provider's prompt cache serve them; beliefs come after the static profile
+// so belief variants still share most of the prefix.
+// ---------------------------------------------------------------------------
+
+function formatBeliefState(beliefs) {
+  return Object.entries(beliefs).map(([key, value]) => `- ${key}: ${value}`).join('\n');
+}
+
+function buildCrisisPrompt(name, profile, beliefs) {
+  return `You are ${name}.
+
+PSYCHOLOGICAL PROFILE (from historical analysis):
+Public OCEAN Scores: Openness=${profile.public_ocean_scores.openness}, Conscientiousness=${profile.public_ocean_scores.conscientiousness}, Extraversion=${profile.public_ocean_scores.extraversion}, Agreeableness=${profile.public_ocean_scores.agreeableness}, Neuroticism=${profile.public_ocean_scores.neuroticism}
+
+Behavioral OCEAN Scores: Openness=${profile.behavioral_ocean_scores.openness}, Conscientiousness=${profile.behavioral_ocean_scores.conscientiousness}, Extraversion=${profile.behavioral_ocean_scores.extraversion}, Agreeableness=${profile.behavioral_ocean_scores.agreeableness}, Neuroticism=${profile.behavioral_ocean_scores.neuroticism}
+
+CRISIS RESPONSE PARAMETERS:
+- Crisis latency: ${profile.behavioral_parameters.crisis_latency_hours}
+- Escalation ladder: ${profile.behavioral_parameters.escalation_ladder.join(' → ')}
+- Scapegoat probability: ${profile.behavioral_parameters.scapegoat_probability_pct}%
+
+CONTRADICTION PATTERNS:
+${profile.contradiction_patterns.join('\n')}
+
+CONTEXTUAL SWITCHING RULES:
+${profile.contextual_switching_rules.join('\n')}
+
+PREDICTIVE FRAMEWORK for this type of crisis:
+- Public approach: ${profile.predictive_framework.international_negotiation?.public || profile.predictive_framework.economic_pressure?.public}
+- Private approach: ${profile.predictive_framework.international_negotiation?.private || profile.predictive_framework.economic_pressure?.private}
+
+The user will give you a CRISIS SCENARIO. Based on your complete psychological profile, belief state, and historical decision patterns, respond with a JSON object:
+{
+  "public_response": "Your public statement (using your communication style)",
+  "private_actions": "Your behind-the-scenes moves (based on your behavioral patterns)",
+  "psychological_reasoning": "Explain your decision process using your personality traits, escalation ladder position, and belief state",
+  "escalation_risk": "Low/Medium/High (based on your escalation ladder)",
+  "timeline": "When you would act (based on your crisis_latency_hours)",
+  "escalation_phase": "Current position on your escalation ladder",
+  "belief_impact": "How this crisis affects your belief state"
+}
+
+Stay completely true to your psychological profile and historical patterns.
+
+CURRENT BELIEF STATE:
+${formatBeliefState(beliefs)}`;
+}
+
+function buildDocumentPrompt(name) {
+  return `You are ${name}. Analyze diplomatic documents through your psychological framework.
+
+The user will give you a DOCUMENT. Based on your psychological profile, analyze what this document REALLY means:
 - What are the hidden intentions behind the words?
 - What psychological tactics do you see being used?
 - How would you respond to this document?
@@ -74,128 +115,402 @@ Respond with a JSON object:
 }
 
 Stay completely in character based on your personality profile.`;
+}
 
-  try {
-    const response = await openai.chat.completions.create({
-      model: "gpt-4o-mini",
-      messages: [
-        { role: "system", content: systemPrompt },
-        { role: "user", content: "Analyze this document through your psychological framework." }
-      ],
-      temperature: 0.7,
-      max_tokens: 600
+function buildMergePrompt(name) {
+  return `You are ${name}. You analyzed a diplomatic document section by section; the user will give you your SECTION FINDINGS.
+
+Combine these findings into one assessment of the whole document. Resolve contradictions, keep the most significant points, and respond with a JSON object:
+{
+  "document_interpretation": "What this document really means from your perspective",
+  "hidden_intentions": "What the author is actually trying to accomplish",
+  "psychological_tactics": "What manipulation or persuasion techniques you identify",
+  "your_response": "How you would respond to this document",
+  "authenticity_assessment": "Whether you believe this document is genuine or deceptive"
+}
+
+Stay completely in character based on your personality profile.`;
+}
+
+const LEADER_PROMPTS = Object.fromEntries(LEADERS.map(leader => [
+  leader.key,
+  {
+    crisis: buildCrisisPrompt(leader.name, leader.profile, leader.beliefs),
+    document: buildDocumentPrompt(leader.name),
+    merge: buildMergePrompt(leader.name)
+  }
+]));
+
+function crisisUserMessage(crisis) {
+  return `CRISIS SCENARIO: ${crisis}
+
+Process this crisis through your complete psychological framework and respond accordingly.`;
+}
+
+// Sweep variants keep the system prompt and scenario as a shared prefix and only
+// append the overridden beliefs, so every variant after the first hits the prompt cache
+function sweepUserMessage(crisis, beliefs) {
+  if (Object.keys(beliefs).length === 0) return crisisUserMessage(crisis);
+  return `${crisisUserMessage(crisis)}
+
+BELIEF STATE FOR THIS RUN (replaces these values in your current belief state):
+${formatBeliefState(beliefs)}`;
+}
+
+// Token and latency accounting surfaced to the frontend with every agent result
+// (and counted in the token metrics per leader and call kind)
+function usageMetrics(response, startedAt, leaderName, kind) {
+  const usage = response.usage || {};
+  const metrics = {
+    latency_ms: Date.now() - startedAt,
+    prompt_tokens: usage.prompt_tokens || 0,
+    cached_tokens: usage.prompt_tokens_details?.cached_tokens || 0,
+    completion_tokens: usage.completion_tokens || 0
+  };
+  recordTokens(leaderName, kind, metrics);
+  return metrics;
+}
+
+// Long-document handling: documents above the token budget are split into
+// sections, analyzed concurrently, then merged per leader
+const CHARS_PER_TOKEN = 4;
+const DOC_CHUNK_TOKENS = parseInt(process.env.DOC_CHUNK_TOKENS || '2500', 10);
+const DOC_CHUNK_CONCURRENCY = parseInt(process.env.DOC_CHUNK_CONCURRENCY || '6', 10);
+
+// Run at most `limit` async tasks at once; returns a scheduler function
+function createLimiter(limit) {
+  let active = 0;
+  const queue = [];
+
+  const next = () => {
+    if (active >= limit || queue.length === 0) return;
+    active++;
+    const { task, resolve, reject } = queue.shift();
+    task().then(resolve, reject).finally(() => {
+      active--;
+      next();
     });
+  };
 
-    // Clean the response content to handle markdown code blocks
-    let content = response.choices[0].message.content.trim();
-    if (content.startsWith('```json')) {
-      content = content.replace(/```json\n?/, '').replace(/\n?```$/, '');
-    } else if (content.startsWith('```')) {
-      content = content.replace(/```\n?/, '').replace(/\n?```$/, '');
+  return (task) => new Promise((resolve, reject) => {
+    queue.push({ task, resolve, reject });
+    next();
+  });
+}
+
+// Requested subset of leaders (defaults to the whole registry, in registry order)
+function resolveLeaders(requested) {
+  if (!Array.isArray(requested) || requested.length === 0) return LEADER_KEYS;
+  const unknown = requested.filter(key => !LEADERS_BY_KEY[key]);
+  if (unknown.length) throw new Error(`Unknown leaders: ${unknown.join(', ')}`);
+  return LEADER_KEYS.filter(key => requested.includes(key));
+}
+
+// Fan out fn(leaderName) over leaders with at most AGENT_CONCURRENCY in flight
+function fanOut(leaders, fn, limit = createLimiter(AGENT_CONCURRENCY)) {
+  return Promise.all(leaders.map(leaderName => limit(() => fn(leaderName))));
+}
+
+// Strip markdown code fences the model sometimes wraps around JSON
+function parseAgentJSON(content) {
+  content = content.trim();
+  if (content.startsWith('```json')) {
+    content = content.replace(/```json\n?/, '').replace(/\n?```$/, '');
+  } else if (content.startsWith('```')) {
+    content = content.replace(/```\n?/, '').replace(/\n?```$/, '');
+  }
+  return JSON.parse(content);
+}
+
+// Split text into sections of at most maxTokens, preferring paragraph then sentence boundaries
+function splitDocument(text, maxTokens = DOC_CHUNK_TOKENS) {
+  const maxChars = maxTokens * CHARS_PER_TOKEN;
+  if (text.length <= maxChars) return [text];
+
+  const chunks = [];
+  let current = '';
+  for (const section of text.split(/\n\s*\n/)) {
+    const pieces = section.length > maxChars ? splitOversizedSection(section, maxChars) : [section];
+    for (const piece of pieces) {
+      if (current && current.length + piece.length + 2 > maxChars) {
+        chunks.push(current);
+        current = '';
+      }
+      current = current ? `${current}\n\n${piece}` : piece;
     }
+  }
+  if (current) chunks.push(current);
+  return chunks;
+}
+
+function splitOversizedSection(section, maxChars) {
+  const sentences = section.match(/[^.!?]+[.!?]+["')\]]*\s*|[^.!?]+$/g) || [section];
+  const pieces = [];
+  let current = '';
+  for (const sentence of sentences) {
+    if (current && current.length + sentence.length > maxChars) {
+      pieces.push(current);
+      current = '';
+    }
+    if (sentence.length > maxChars) {
+      for (let i = 0; i < sentence.length; i += maxChars) {
+        pieces.push(sentence.slice(i, i + maxChars));
+      }
+      continue;
+    }
+    current += sentence;
+  }
+  if (current) pieces.push(current);
+  return pieces;
+}
+
+const DOCUMENT_ANALYSIS_FIELDS = [
+  'document_interpretation',
+  'hidden_intentions',
+  'psychological_tactics',
+  'your_response',
+  'authenticity_assessment'
+];
+
+function documentAnalysisFallback(name) {
+  return {
+    name: name,
+    document_interpretation: "Unable to analyze document",
+    hidden_intentions: "Analysis failed",
+    psychological_tactics: "Could not identify tactics",
+    your_response: "System error prevented analysis",
+    authenticity_assessment: "Unable to assess"
+  };
+}
+
+// Single LLM call over a whole document or one section of it; throws on failure
+async function requestDocumentAnalysis(leaderName, documentText, filename, section, signal) {
+  const sectionNote = section
+    ? `This is section ${section.index} of ${section.total} of "${filename}". Analyze this section only; your findings will be combined with the other sections.\n\n`
+    : '';
 
+  const startedAt = Date.now();
+  const response = await span('llm', () => upstreams.openai.call(signal => openai.chat.completions.create({
+    model: "gpt-4o-mini",
+    messages: [
+      { role: "system", content: LEADER_PROMPTS[leaderName].document },
+      { role: "user", content: `${sectionNote}DOCUMENT: "${documentText}"\n\nAnalyze this document through your psychological framework.` }
+    ],
+    temperature: 0.7,
+    max_tokens: 600,
+    prompt_cache_key: `document:${leaderName}`
+  }, { signal }), { signal }), section ? { agent: leaderName, kind: 'document', section: section.index } : { agent: leaderName, kind: 'document' });
+
+  return {
+    ...await span('parse', () => parseAgentJSON(response.choices[0].message.content), { agent: leaderName }),
+    usage: usageMetrics(response, startedAt, leaderName, 'document')
+  };
+}
+
+// Analyze documents through agent psychological frameworks
+async function analyzeDocumentThroughAgent(leaderName, documentText, filename, signal) {
+  const name = AGENT_NAMES[leaderName];
+
+  try {
     return {
       name: name,
-      ...JSON.parse(content)
+      ...await requestDocumentAnalysis(leaderName, documentText, filename, undefined, signal)
     };
 
   } catch (error) {
+    if (isAbortError(error)) throw error;
     console.error(`Error analyzing document for ${name}:`, error);
+    return documentAnalysisFallback(name);
+  }
+}
+
+// Reduce per-section findings into the standard five-field analysis
+async function mergeDocumentAnalyses(leaderName, filename, partials, signal) {
+  const name = AGENT_NAMES[leaderName];
+
+  const findings = partials.map((partial, i) =>
+    `SECTION ${i + 1}:\n` + DOCUMENT_ANALYSIS_FIELDS.map(field => `- ${field}: ${partial[field]}`).join('\n')
+  ).join('\n\n');
+
+  try {
+    const startedAt = Date.now();
+    const response = await span('llm', () => upstreams.openai.call(signal => openai.chat.completions.create({
+      model: "gpt-4o-mini",
+      messages: [
+        { role: "system", content: LEADER_PROMPTS[leaderName].merge },
+        { role: "user", content: `DOCUMENT: "${filename}"\n\nSECTION FINDINGS:\n${findings}\n\nCombine your section findings into a single document assessment.` }
+      ],
+      temperature: 0.7,
+      max_tokens: 800,
+      prompt_cache_key: `merge:${leaderName}`
+    }, { signal }), { signal }), { agent: leaderName, kind: 'merge' });
+
     return {
       name: name,
-      document_interpretation: "Unable to analyze document",
-      hidden_intentions: "Analysis failed",
-      psychological_tactics: "Could not identify tactics",
-      your_response: "System error prevented analysis",
-      authenticity_assessment: "Unable to assess"
+      ...await span('parse', () => parseAgentJSON(response.choices[0].message.content), { agent: leaderName }),
+      usage: usageMetrics(response, startedAt, leaderName, 'merge')
     };
+
+  } catch (error) {
+    if (isAbortError(error)) throw error;
+    // Fall back to stitching the section findings together verbatim
+    console.error(`Error merging document analysis for ${name}:`, error);
+    const merged = { name: name };
+    for (const field of DOCUMENT_ANALYSIS_FIELDS) {
+      merged[field] = partials.map(partial => partial[field]).filter(Boolean).join(' / ');
+    }
+    return merged;
   }
 }
 
-// Create AI agents using real psychological profiles
-async function createAgent(leaderName, crisis) {
-  let profile, beliefs, name;
-  
-  // Select the right profile and beliefs
-  switch(leaderName) {
-    case 'roosevelt':
-      profile = rooseveltProfile;
-      beliefs = rooseveltBeliefs;
-      name = "Theodore Roosevelt";
-      break;
-    case 'gandhi':
-      profile = gandhiProfile;
-      beliefs = gandhiBeliefs;
-      name = "Indira Gandhi";
-      break;
-    case 'putin':
-      profile = putinProfile;
-      beliefs = putinBeliefs;
-      name = "Vladimir Putin";
-      break;
-  }
-
-  const systemPrompt = `You are ${name}.
+// Map-reduce analysis of a sectioned document for one leader
+async function analyzeDocumentInSections(leaderName, sections, filename, limit, onSectionDone, signal) {
+  const name = AGENT_NAMES[leaderName];
 
-PSYCHOLOGICAL PROFILE (from historical analysis):
-Public OCEAN Scores: Openness=${profile.public_ocean_scores.openness}, Conscientiousness=${profile.public_ocean_scores.conscientiousness}, Extraversion=${profile.public_ocean_scores.extraversion}, Agreeableness=${profile.public_ocean_scores.agreeableness}, Neuroticism=${profile.public_ocean_scores.neuroticism}
+  const partials = await Promise.all(sections.map((sectionText, i) => limit(async () => {
+    try {
+      return await requestDocumentAnalysis(leaderName, sectionText, filename,
+        { index: i + 1, total: sections.length }, signal);
+    } catch (error) {
+      if (isAbortError(error)) throw error;
+      console.error(`Error analyzing section ${i + 1} for ${name}:`, error);
+      return null;
+    } finally {
+      onSectionDone();
+    }
+  })));
 
-Behavioral OCEAN Scores: Openness=${profile.behavioral_ocean_scores.openness}, Conscientiousness=${profile.behavioral_ocean_scores.conscientiousness}, Extraversion=${profile.behavioral_ocean_scores.extraversion}, Agreeableness=${profile.behavioral_ocean_scores.agreeableness}, Neuroticism=${profile.behavioral_ocean_scores.neuroticism}
+  const usable = partials.filter(Boolean);
+  if (usable.length === 0) return documentAnalysisFallback(name);
+  if (usable.length === 1) return { name: name, ...usable[0] };
+  return mergeDocumentAnalyses(leaderName, filename, usable, signal);
+}
 
-CRISIS RESPONSE PARAMETERS:
-- Crisis latency: ${profile.behavioral_parameters.crisis_latency_hours}
-- Escalation ladder: ${profile.behavioral_parameters.escalation_ladder.join(' → ')}
-- Scapegoat probability: ${profile.behavioral_parameters.scapegoat_probability_pct}%
+// Full document analysis across all leaders; onEvent receives progress/agent events,
+// and an aborted signal stops the remaining LLM calls
+async function runDocumentAnalysis(documentText, filename, onEvent = () => {}, leaders = LEADER_KEYS, signal) {
+  const sections = splitDocument(documentText);
+  const limit = createLimiter(DOC_CHUNK_CONCURRENCY);
+  const total = sections.length * leaders.length;
+  let completed = 0;
 
-CURRENT BELIEF STATE:
-${Object.entries(beliefs.beliefs).map(([key, value]) => `- ${key}: ${value}`).join('\n')}
+  const sectionDone = () => {
+    completed++;
+    onEvent({ type: 'progress', completed, total, sections: sections.length });
+  };
 
-CONTRADICTION PATTERNS:
-${profile.contradiction_patterns.join('\n')}
+  onEvent({ type: 'progress', completed, total, sections: sections.length });
 
-CONTEXTUAL SWITCHING RULES:
-${profile.contextual_switching_rules.join('\n')}
+  const agents = {};
+  await fanOut(leaders, async leaderName => {
+    if (sections.length === 1) {
+      agents[leaderName] = await analyzeDocumentThroughAgent(leaderName, documentText, filename, signal);
+      sectionDone();
+    } else {
+      agents[leaderName] = await analyzeDocumentInSections(leaderName, sections, filename, limit, sectionDone, signal);
+    }
+    onEvent({ type: 'agent', key: leaderName, agent: agents[leaderName] });
+  });
 
-PREDICTIVE FRAMEWORK for this type of crisis:
-- Public approach: ${profile.predictive_framework.international_negotiation?.public || profile.predictive_framework.economic_pressure?.public}
-- Private approach: ${profile.predictive_framework.international_negotiation?.private || profile.predictive_framework.economic_pressure?.private}
+  return {
+    document: filename,
+    timestamp: new Date().toISOString(),
+    sections: sections.length,
+    agents: Object.fromEntries(leaders.map(leaderName => [leaderName, agents[leaderName]]))
+  };
+}
 
-CRISIS SCENARIO: ${crisis}
+// Structured output contract for crisis agents (enforced by the model via
+// json_schema response_format and re-checked locally before use)
+const AGENT_RESPONSE_FIELDS = [
+  'public_response',
+  'private_actions',
+  'psychological_reasoning',
+  'escalation_risk',
+  'timeline',
+  'escalation_phase',
+  'belief_impact'
+];
 
-Based on your complete psychological profile, belief state, and historical decision patterns, respond with a JSON object:
-{
-  "public_response": "Your public statement (using your communication style)",
-  "private_actions": "Your behind-the-scenes moves (based on your behavioral patterns)",
-  "psychological_reasoning": "Explain your decision process using your personality traits, escalation ladder position, and belief state",
-  "escalation_risk": "Low/Medium/High (based on your escalation ladder)",
-  "timeline": "When you would act (based on your crisis_latency_hours)",
-  "escalation_phase": "Current position on your escalation ladder",
-  "belief_impact": "How this crisis affects your belief state"
+const ESCALATION_RISK_LEVELS = ['Low', 'Medium', 'High'];
+
+const AGENT_RESPONSE_SCHEMA = {
+  name: 'agent_response',
+  strict: true,
+  schema: {
+    type: 'object',
+    additionalProperties: false,
+    required: AGENT_RESPONSE_FIELDS,
+    properties: Object.fromEntries(AGENT_RESPONSE_FIELDS.map(field => [
+      field,
+      field === 'escalation_risk'
+        ? { type: 'string', enum: ESCALATION_RISK_LEVELS }
+        : { type: 'string' }
+    ]))
+  }
+};
+
+// Simulation rounds add the leader's position on its own escalation ladder, as an enum of its rungs
+const SIMULATION_RESPONSE_SCHEMAS = Object.fromEntries(LEADERS.map(leader => [leader.key, {
+  name: 'simulation_response',
+  strict: true,
+  schema: {
+    ...AGENT_RESPONSE_SCHEMA.schema,
+    required: [...AGENT_RESPONSE_FIELDS, 'ladder_step'],
+    properties: {
+      ...AGENT_RESPONSE_SCHEMA.schema.properties,
+      ladder_step: { type: 'string', enum: leader.profile.behavioral_parameters.escalation_ladder }
+    }
+  }
+}]));
+
+function validateAgentResponse(response) {
+  if (!response || typeof response !== 'object') {
+    throw new Error('Agent response is not an object');
+  }
+  for (const field of AGENT_RESPONSE_FIELDS) {
+    if (typeof response[field] !== 'string' || !response[field].trim()) {
+      throw new Error(`Agent response missing field: ${field}`);
+    }
+  }
+  if (!ESCALATION_RISK_LEVELS.includes(response.escalation_risk)) {
+    throw new Error(`Invalid escalation_risk: ${response.escalation_risk}`);
+  }
+  return response;
 }
 
-Stay completely true to your psychological profile and historical patterns.`;
+// Create AI agents using real psychological profiles; userMessage, schema and kind
+// let sweeps and simulations vary the input and output and account for them separately
+async function createAgent(leaderName, crisis, signal,
+  { userMessage = crisisUserMessage(crisis), schema = AGENT_RESPONSE_SCHEMA, kind = 'crisis' } = {}) {
+  const name = AGENT_NAMES[leaderName];
 
   try {
-    const response = await openai.chat.completions.create({
+    const startedAt = Date.now();
+
+    // Agent calls are hedged per leader once their p95 latency is known
+    const response = await span('llm', () => upstreams.openai.call(signal => openai.chat.completions.create({
       model: "gpt-4o-mini",
       messages: [
-        { role: "system", content: systemPrompt },
-        { role: "user", content: "Process this crisis through your complete psychological framework and respond accordingly." }
+        { role: "system", content: LEADER_PROMPTS[leaderName].crisis },
+        { role: "user", content: userMessage }
       ],
       temperature: 0.7,
-      max_tokens: 800
-    });
+      max_tokens: 800,
+      response_format: { type: "json_schema", json_schema: schema },
+      prompt_cache_key: `crisis:${leaderName}`
+    }, { signal }), { key: `agent:${leaderName}`, signal }), { agent: leaderName, kind });
 
     // Clean the response content to handle markdown code blocks
-    let content = response.choices[0].message.content.trim();
-    if (content.startsWith('```json')) {
-      content = content.replace(/```json\n?/, '').replace(/\n?```$/, '');
-    } else if (content.startsWith('```')) {
-      content = content.replace(/```\n?/, '').replace(/\n?```$/, '');
-    }
-
-    return JSON.parse(content);
+    const parsed = await span('parse', () => validateAgentResponse(parseAgentJSON(response.choices[0].message.content)),
+      { agent: leaderName });
+    return {
+      ...parsed,
+      usage: usageMetrics(response, startedAt, leaderName, kind)
+    };
   } catch (error) {
+    // Nobody is waiting for this agent; don't dress the abort up as an analysis
+    if (isAbortError(error)) throw error;
     console.error(`Error creating agent for ${name}:`, error);
     return {
       public_response: "Processing error occurred",
@@ -204,58 +519,176 @@ Stay completely true to your psychological profile and historical patterns.`;
       escalation_risk: "Unknown",
       timeline: "System error",
       escalation_phase: "Error",
-      belief_impact: "Unable to calculate"
+      belief_impact: "Unable to calculate",
+      error: error.message
+    };
+  }
+}
+
+function buildAgentEntry(leaderName, response) {
+  return {
+    name: AGENT_NAMES[leaderName],
+    ...response,
+    personality_notes: LEADERS_BY_KEY[leaderName].personalityNote
+  };
+}
+
+// Assemble the full intelligence assessment once all agents have responded
+function buildIntelligenceAssessment(crisis, responses, leaders = Object.keys(responses)) {
+  leaders = LEADER_KEYS.filter(key => leaders.includes(key));
+  return {
+    scenario: crisis,
+    timestamp: new Date().toISOString(),
+    agents: Object.fromEntries(leaders.map(leaderName => [leaderName, buildAgentEntry(leaderName, responses[leaderName])])),
+    overall_risk: calculateOverallRisk(leaders.map(leaderName => responses[leaderName])),
+    key_insights: generateKeyInsights(leaders, responses),
+    bluf: generateBLUF(leaders, responses, crisis)
+  };
+}
+
+// Run every requested leader's agent, reporting each as it completes; an aborted
+// signal cancels the calls in flight and skips the ones still queued
+async function runCrisisAnalysis(crisis, leaders = LEADER_KEYS, onAgent = () => {}, signal) {
+  const responses = {};
+  await fanOut(leaders, leaderName =>
+    createAgent(leaderName, crisis, signal).then(response => {
+      responses[leaderName] = response;
+      onAgent(leaderName, response);
+    })
+  );
+  return span('assemble', () => buildIntelligenceAssessment(crisis, responses, leaders));
+}
+
+// Identical concurrent analyses (same normalized text and leader set) share one fan-out;
+// profiles are fixed for the life of the process, so they need no part in the key
+const crisisFlights = new SingleFlight('crisis');
+const documentFlights = new SingleFlight('document');
+
+// signal is the caller's own (req.signal); the shared work runs on the flight's signal,
+// which only aborts once every caller has disconnected
+function coalescedCrisisAnalysis(crisis, leaders, onAgent = () => {}, signal) {
+  const { flight, joined } = crisisFlights.join(flightKey(normalizeText(crisis), leaders), (emit, flightSignal) =>
+    runCrisisAnalysis(crisis, leaders, (leaderName, response) => emit({ leaderName, response }), flightSignal)
+  );
+  const result = flight.subscribe(({ leaderName, response }) => onAgent(leaderName, response), signal);
+  return joined ? span('coalesced', () => result) : result;
+}
+
+function coalescedDocumentAnalysis(documentText, filename, onEvent = () => {}, leaders = LEADER_KEYS, signal) {
+  const { flight, joined } = documentFlights.join(flightKey(normalizeText(documentText), filename, leaders),
+    (emit, flightSignal) => runDocumentAnalysis(documentText, filename, emit, leaders, flightSignal)
+  );
+  const result = flight.subscribe(onEvent, signal);
+  return joined ? span('coalesced', () => result) : result;
+}
+
+// Belief sensitivity sweep over plan.tasks (see sweep.js). Each leader's first
+// variant runs alone so it writes the provider's prompt cache; the rest of that
+// leader's variants then share the cached prefix, SWEEP_AGENT_CONCURRENCY calls
+// at a time across the sweep. Variants are returned in plan order.
+async function runSweep(crisis, plan, onVariant = () => {}, signal) {
+  const limit = createLimiter(SWEEP_AGENT_CONCURRENCY);
+  const variants = new Array(plan.tasks.length);
+
+  const run = index => limit(async () => {
+    const { leaderName, beliefs } = plan.tasks[index];
+    const response = await createAgent(leaderName, crisis, signal,
+      { userMessage: sweepUserMessage(crisis, beliefs), kind: 'sweep' });
+    variants[index] = {
+      key: leaderName,
+      beliefs,
+      escalation_risk: response.escalation_risk,
+      escalation_phase: response.escalation_phase,
+      timeline: response.timeline,
+      usage: response.usage,
+      ...(response.error ? { error: response.error } : {})
     };
+    onVariant(variants[index]);
+  });
+
+  await Promise.all(plan.leaders.map(async leaderName => {
+    const [first, ...rest] = plan.tasks.flatMap((task, index) => task.leaderName === leaderName ? [index] : []);
+    if (first === undefined) return;
+    await run(first);
+    await Promise.all(rest.map(run));
+  }));
+  return variants;
+}
+
+// Multi-round escalation simulation: rounds run in sequence, the leaders within a
+// round in parallel. Each call sends the shared system prompt and scenario, then
+// only the SimulationState context (rolling summary plus last-round deltas).
+// onEvent receives "round", "agent" and "round_complete" events.
+async function runSimulation(crisis, leaders, rounds, onEvent = () => {}, signal) {
+  const state = new SimulationState(leaders.map(key => ({
+    key,
+    name: AGENT_NAMES[key],
+    ladder: LEADERS_BY_KEY[key].profile.behavioral_parameters.escalation_ladder
+  })), rounds);
+  const history = [];
+
+  for (let round = 1; round <= rounds; round++) {
+    onEvent({ type: 'round', round, rounds });
+    const responses = {};
+    await fanOut(leaders, leaderName => createAgent(leaderName, crisis, signal, {
+      userMessage: `${crisisUserMessage(crisis)}\n\n${state.context(leaderName, round)}`,
+      schema: SIMULATION_RESPONSE_SCHEMAS[leaderName],
+      kind: 'simulation'
+    }).then(response => {
+      responses[leaderName] = response;
+      onEvent({ type: 'agent', round, key: leaderName, agent: buildAgentEntry(leaderName, response) });
+    }));
+
+    const digest = state.record(round, responses);
+    const ordered = leaders.map(leaderName => responses[leaderName]);
+    const entry = {
+      round,
+      overall_risk: calculateOverallRisk(ordered),
+      digest,
+      positions: Object.fromEntries(leaders.map(leaderName => [leaderName, state.position(leaderName)])),
+      usage: ['prompt_tokens', 'cached_tokens', 'completion_tokens'].reduce((usage, field) => ({
+        ...usage, [field]: ordered.reduce((sum, response) => sum + (response.usage?.[field] || 0), 0)
+      }), {})
+    };
+    history.push({ ...entry, agents: Object.fromEntries(leaders.map(leaderName => [leaderName, buildAgentEntry(leaderName, responses[leaderName])])) });
+    onEvent({ type: 'round_complete', ...entry });
   }
+
+  return {
+    scenario: crisis,
+    timestamp: new Date().toISOString(),
+    rounds: history,
+    trajectory: state.trajectory,
+    overall_risk: history[history.length - 1].overall_risk
+  };
 }
 
 // Main crisis analysis endpoint
 app.post('/api/process-crisis', async (req, res) => {
   try {
-    const { crisis } = req.body;
+    const { crisis, leaders } = req.body;
     
     if (!crisis) {
       return res.status(400).json({ error: 'Crisis scenario required' });
     }
 
+    let selected;
+    try {
+      selected = resolveLeaders(leaders);
+    } catch (error) {
+      return res.status(400).json({ error: error.message });
+    }
+
     console.log('Processing crisis:', crisis);
 
-    // Process crisis through all three agents simultaneously
-    const [rooseveltResponse, gandhiResponse, putinResponse] = await Promise.all([
-      createAgent('roosevelt', crisis),
-      createAgent('gandhi', crisis),
-      createAgent('putin', crisis)
-    ]);
-
-    // Create intelligence assessment
-    const intelligenceAssessment = {
-      scenario: crisis,
-      timestamp: new Date().toISOString(),
-      agents: {
-        roosevelt: {
-          name: "Theodore Roosevelt",
-          ...rooseveltResponse,
-          personality_notes: `Extraversion: ${rooseveltProfile.public_ocean_scores.extraversion}/10 → Bold public positioning`
-        },
-        gandhi: {
-          name: "Indira Gandhi", 
-          ...gandhiResponse,
-          personality_notes: `Crisis latency: ${gandhiProfile.behavioral_parameters.crisis_latency_hours} → Strategic delay`
-        },
-        putin: {
-          name: "Vladimir Putin",
-          ...putinResponse,
-          personality_notes: `Escalation pattern: ${putinProfile.behavioral_parameters.escalation_ladder[0]} → ${putinProfile.behavioral_parameters.escalation_ladder[1]}`
-        }
-      },
-      overall_risk: calculateOverallRisk([rooseveltResponse, gandhiResponse, putinResponse]),
-      key_insights: generateKeyInsights([rooseveltResponse, gandhiResponse, putinResponse]),
-      bluf: generateBLUF([rooseveltResponse, gandhiResponse, putinResponse], crisis)
-    };
+    // Process crisis through every selected agent, AGENT_CONCURRENCY at a time
+    const intelligenceAssessment = await coalescedCrisisAnalysis(crisis, selected, undefined, req.signal);
 
+    res.setHeader('Server-Timing', req.trace.serverTiming());
     res.json(intelligenceAssessment);
 
   } catch (error) {
+    if (req.signal.aborted) return;
     console.error('Crisis processing error:', error);
     res.status(500).json({ 
       error: 'Intelligence processing failed',
@@ -264,37 +697,213 @@ app.post('/api/process-crisis', async (req, res) => {
   }
 });
 
+// Streaming crisis analysis endpoint (NDJSON: one "agent" event per leader as it
+// finishes, then a final "assessment" event with the executive summary fields)
+app.post('/api/process-crisis/stream', async (req, res) => {
+  const { crisis, leaders } = req.body;
+
+  if (!crisis) {
+    return res.status(400).json({ error: 'Crisis scenario required' });
+  }
+
+  let selected;
+  try {
+    selected = resolveLeaders(leaders);
+  } catch (error) {
+    return res.status(400).json({ error: error.message });
+  }
+
+  console.log('Streaming crisis:', crisis);
+
+  res.setHeader('Content-Type', 'application/x-ndjson');
+  res.setHeader('Cache-Control', 'no-cache');
+  res.setHeader('X-Accel-Buffering', 'no');
+  res.flushHeaders();
+
+  const sendEvent = (event) => res.write(JSON.stringify(event) + '\n');
+
+  try {
+    const assessment = await coalescedCrisisAnalysis(crisis, selected, (leaderName, response) => {
+      sendEvent({ type: 'agent', key: leaderName, agent: buildAgentEntry(leaderName, response) });
+    }, req.signal);
+
+    // Server-side spans for the caller's timing breakdown, just before the final event
+    sendEvent({ type: 'timing', ...req.trace.toJSON() });
+    sendEvent({ type: 'assessment', ...assessment });
+
+  } catch (error) {
+    // The client has gone; there is no one to send an error event to
+    if (req.signal.aborted) return;
+    console.error('Crisis streaming error:', error);
+    sendEvent({ type: 'error', error: 'Intelligence processing failed', details: error.message });
+  }
+
+  res.end();
+});
+
+// The caller's copies of the other leaders' responses, reduced to registered
+// leaders and the agent response fields; null, unknown or malformed entries are dropped
+function callerResponses(agents) {
+  if (!agents || typeof agents !== 'object' || Array.isArray(agents)) return {};
+  return Object.fromEntries(Object.entries(agents)
+    .filter(([leaderName, response]) => Object.hasOwn(LEADER_PROMPTS, leaderName)
+      && response && typeof response === 'object' && !Array.isArray(response))
+    .map(([leaderName, response]) => [leaderName, Object.fromEntries([...AGENT_RESPONSE_FIELDS, 'error']
+      .filter(field => typeof response[field] === 'string')
+      .map(field => [field, response[field]]))]));
+}
+
+// Single-agent re-run: recomputes one leader and returns the full assessment
+// rebuilt around the caller's existing responses for the other leaders
+app.post('/api/process-crisis/agent', async (req, res) => {
+  try {
+    const { crisis, agent, agents } = req.body;
+
+    if (!crisis || !agent) {
+      return res.status(400).json({ error: 'Crisis scenario and agent required' });
+    }
+    if (!Object.hasOwn(LEADER_PROMPTS, agent)) {
+      return res.status(400).json({ error: `Unknown agent: ${agent}` });
+    }
+
+    console.log(`Re-running ${agent} for crisis:`, crisis);
+
+    const responses = callerResponses(agents);
+    responses[agent] = await createAgent(agent, crisis, req.signal);
+
+    // The assessment covers the leaders the caller already had, plus this one
+    const assessment = await span('assemble', () => buildIntelligenceAssessment(crisis, responses, Object.keys(responses)));
+    res.setHeader('Server-Timing', req.trace.serverTiming());
+    res.json(assessment);
+
+  } catch (error) {
+    if (req.signal.aborted) return;
+    console.error('Agent re-run error:', error);
+    res.status(500).json({
+      error: 'Agent re-run failed',
+      details: error.message
+    });
+  }
+});
+
+// Belief sensitivity sweep (NDJSON: a "plan" event, then a "variant" and a
+// "progress" event per agent call, then timing and a final "sweep" event).
+// Body: { crisis, grid: { "<belief>": [values...] }, leaders?, budget? }
+app.post('/api/process-crisis/sweep', async (req, res) => {
+  const { crisis, grid, leaders, budget } = req.body;
+
+  if (!crisis) {
+    return res.status(400).json({ error: 'Crisis scenario required' });
+  }
+
+  let plan;
+  try {
+    const selected = resolveLeaders(leaders);
+    plan = planSweep(grid, selected, Object.fromEntries(selected.map(key => [key, LEADERS_BY_KEY[key].beliefs])), budget);
+  } catch (error) {
+    return res.status(400).json({ error: error.message });
+  }
+
+  console.log(`Sweeping ${plan.parameters.join(' x ')} (${plan.calls} calls) for crisis:`, crisis);
+
+  res.setHeader('Content-Type', 'application/x-ndjson');
+  res.setHeader('Cache-Control', 'no-cache');
+  res.setHeader('X-Accel-Buffering', 'no');
+  res.flushHeaders();
+
+  const sendEvent = (event) => res.write(JSON.stringify(event) + '\n');
+  const { tasks, ...summary } = plan;
+
+  try {
+    sendEvent({ type: 'plan', ...summary });
+    let completed = 0;
+    const variants = await runSweep(crisis, plan, variant => {
+      completed++;
+      sendEvent({ type: 'variant', ...variant });
+      sendEvent({ type: 'progress', completed, total: plan.calls });
+    }, req.signal);
+
+    sendEvent({ type: 'timing', ...req.trace.toJSON() });
+    sendEvent({ type: 'sweep', scenario: crisis, timestamp: new Date().toISOString(), ...summary, variants });
+
+  } catch (error) {
+    if (req.signal.aborted) return;
+    console.error('Sweep error:', error);
+    sendEvent({ type: 'error', error: 'Belief sweep failed', details: error.message });
+  }
+
+  res.end();
+});
+
+// Multi-round escalation simulation (NDJSON: per round a "round" event, an
+// "agent" event per leader and a "round_complete" event, then timing and a
+// final "simulation" event). Body: { crisis, rounds?, leaders? }
+app.post('/api/process-crisis/simulate', async (req, res) => {
+  const { crisis, leaders, rounds = 3 } = req.body;
+
+  if (!crisis) {
+    return res.status(400).json({ error: 'Crisis scenario required' });
+  }
+  if (!Number.isInteger(rounds) || rounds < 1 || rounds > SIMULATION_MAX_ROUNDS) {
+    return res.status(400).json({ error: `rounds must be an integer from 1 to ${SIMULATION_MAX_ROUNDS}` });
+  }
+
+  let selected;
+  try {
+    selected = resolveLeaders(leaders);
+  } catch (error) {
+    return res.status(400).json({ error: error.message });
+  }
+
+  console.log(`Simulating ${rounds} rounds for crisis:`, crisis);
+
+  res.setHeader('Content-Type', 'application/x-ndjson');
+  res.setHeader('Cache-Control', 'no-cache');
+  res.setHeader('X-Accel-Buffering', 'no');
+  res.flushHeaders();
+
+  const sendEvent = (event) => res.write(JSON.stringify(event) + '\n');
+
+  try {
+    const simulation = await runSimulation(crisis, selected, rounds, sendEvent, req.signal);
+    sendEvent({ type: 'timing', ...req.trace.toJSON() });
+    sendEvent({ type: 'simulation', ...simulation });
+
+  } catch (error) {
+    if (req.signal.aborted) return;
+    console.error('Simulation error:', error);
+    sendEvent({ type: 'error', error: 'Escalation simulation failed', details: error.message });
+  }
+
+  res.end();
+});
+
 // Document analysis endpoint
 app.post('/api/analyze-document', async (req, res) => {
   try {
-    const { documentText, filename } = req.body;
+    const { documentText, filename, leaders } = req.body;
     
     if (!documentText) {
       return res.status(400).json({ error: 'Document text required' });
     }
 
+    let selected;
+    try {
+      selected = resolveLeaders(leaders);
+    } catch (error) {
+      return res.status(400).json({ error: error.message });
+    }
+
     console.log('Analyzing document:', filename);
 
-    // Process document through all three agents for psychological interpretation
-    const [rooseveltAnalysis, gandhiAnalysis, putinAnalysis] = await Promise.all([
-      analyzeDocumentThroughAgent('roosevelt', documentText, filename),
-      analyzeDocumentThroughAgent('gandhi', documentText, filename),
-      analyzeDocumentThroughAgent('putin', documentText, filename)
-    ]);
-
-    const documentAnalysis = {
-      document: filename,
-      timestamp: new Date().toISOString(),
-      agents: {
-        roosevelt: rooseveltAnalysis,
-        gandhi: gandhiAnalysis,
-        putin: putinAnalysis
-      }
-    };
+    // Process document through every selected agent for psychological interpretation
+    const documentAnalysis = await coalescedDocumentAnalysis(documentText, filename, undefined, selected, req.signal);
 
+    res.setHeader('Server-Timing', req.trace.serverTiming());
     res.json(documentAnalysis);
 
   } catch (error) {
+    if (req.signal.aborted) return;
     console.error('Document analysis error:', error);
     res.status(500).json({ 
       error: 'Document analysis failed',
@@ -303,6 +912,45 @@ app.post('/api/analyze-document', async (req, res) => {
   }
 });
 
+// Streaming document analysis endpoint (NDJSON: "progress" events per analyzed
+// section, "agent" events per leader, then a final "analysis" event)
+app.post('/api/analyze-document/stream', async (req, res) => {
+  const { documentText, filename, leaders } = req.body;
+
+  if (!documentText) {
+    return res.status(400).json({ error: 'Document text required' });
+  }
+
+  let selected;
+  try {
+    selected = resolveLeaders(leaders);
+  } catch (error) {
+    return res.status(400).json({ error: error.message });
+  }
+
+  console.log('Streaming document analysis:', filename);
+
+  res.setHeader('Content-Type', 'application/x-ndjson');
+  res.setHeader('Cache-Control', 'no-cache');
+  res.setHeader('X-Accel-Buffering', 'no');
+  res.flushHeaders();
+
+  const sendEvent = (event) => res.write(JSON.stringify(event) + '\n');
+
+  try {
+    const documentAnalysis = await coalescedDocumentAnalysis(documentText, filename, sendEvent, selected, req.signal);
+    sendEvent({ type: 'timing', ...req.trace.toJSON() });
+    sendEvent({ type: 'analysis', ...documentAnalysis });
+
+  } catch (error) {
+    if (req.signal.aborted) return;
+    console.error('Document streaming error:', error);
+    sendEvent({ type: 'error', error: 'Document analysis failed', details: error.message });
+  }
+
+  res.end();
+});
+
 // Voice synthesis endpoint
 app.post('/api/synthesize-voice', async (req, res) => {
   try {
@@ -314,46 +962,61 @@ app.post('/api/synthesize-voice', async (req, res) => {
 
     console.log(`Synthesizing voice for ${agent}:`, text.substring(0, 50) + '...');
 
-    // Voice IDs for authentic historical figures
-    let voiceId;
-    switch(agent) {
-      case 'roosevelt':
-        voiceId = "zkXpoOeAWrFgfuIRi0yD";
-        break;
-      case 'gandhi':
-        voiceId = "XB0fDUnXU5powFXDhCwa";
-        break;
-      case 'putin':
-        voiceId = "pNInz6obpgDQGcFmaJgB";
-        break;
-      default:
-        voiceId = "zkXpoOeAWrFgfuIRi0yD";
+    // Voice IDs for authentic historical figures come from the registry
+    const voiceId = (LEADERS_BY_KEY[agent] || LEADERS[0]).voiceId;
+    if (!voiceId) {
+      return res.status(400).json({ error: `No voice configured for ${agent}` });
     }
 
     // DEBUG: Log which voice ID is being used
     console.log(`Using voice ID for ${agent}: ${voiceId}`);
-    
-    const audio = await elevenlabs.textToSpeech.convert(voiceId, {
+
+    // Retries only cover opening the stream; once audio flows it is relayed as-is
+    const audio = await span('tts_open', () => upstreams.elevenlabs.call(signal => elevenlabs.textToSpeech.stream(voiceId, {
       text: text,
       model_id: "eleven_multilingual_v2"
-    });
+    }, { abortSignal: signal, maxRetries: 0 }), { signal: req.signal }), { agent });
 
-    console.log('Audio type:', typeof audio);
+    // Relay chunks as ElevenLabs produces them (chunked transfer encoding)
+    // so playback can start on the first chunk and memory stays flat
+    res.setHeader('Content-Type', 'audio/mpeg');
+    res.setHeader('Cache-Control', 'no-cache');
+    res.flushHeaders();
 
-    // Convert ReadableStream to Buffer
-    const chunks = [];
     const reader = audio.getReader();
-    while (true) {
-      const { done, value } = await reader.read();
-      if (done) break;
-      chunks.push(value);
+    // Listener closed the player or moved on: stop pulling audio from ElevenLabs
+    const stopReading = () => reader.cancel().catch(() => {});
+    req.signal.addEventListener('abort', stopReading, { once: true });
+    try {
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done || req.signal.aborted) break;
+        if (!res.write(Buffer.from(value))) {
+          // Resume on drain, or give up if the client disconnects while we wait
+          await new Promise(resolve => {
+            const resume = () => {
+              res.off('drain', resume);
+              req.signal.removeEventListener('abort', resume);
+              resolve();
+            };
+            res.once('drain', resume);
+            req.signal.addEventListener('abort', resume, { once: true });
+          });
+        }
+      }
+    } catch (error) {
+      if (req.signal.aborted) return;
+      // Headers are already sent; abort the body so the client sees a truncated stream
+      console.error('Voice streaming error:', error);
+      res.destroy(error);
+      return;
+    } finally {
+      req.signal.removeEventListener('abort', stopReading);
     }
-    const audioBuffer = Buffer.concat(chunks);
-
-    res.setHeader('Content-Type', 'audio/mpeg');
-    res.send(audioBuffer);
+    res.end();
 
   } catch (error) {
+    if (req.signal.aborted) return;
     console.error('Voice synthesis error:', error);
     res.status(500).json({ error: 'Voice synthesis failed', details: error.message });
   }
@@ -370,19 +1033,35 @@ function calculateOverallRisk(responses) {
   return 'Low';
 }
 
-function generateKeyInsights(responses) {
+// One leader's insight line from its registry "key_insight" block: a conditional
+// block picks "then"/"else" by whether the response field contains or equals a
+// value; otherwise the field (lower-cased, or the fallback) fills "format"
+function describeKeyInsight(leader, response) {
+  const { verb, field, contains, equals, format, fallback } = leader.keyInsight;
+  const value = response?.[field];
+  let phrase;
+  if (contains !== undefined || equals !== undefined) {
+    const matched = contains !== undefined ? Boolean(value?.includes?.(contains)) : value === equals;
+    phrase = matched ? leader.keyInsight.then : leader.keyInsight.else;
+  } else {
+    phrase = format.replace('{value}', (typeof value === 'string' && value.toLowerCase()) || fallback);
+  }
+  return `${leader.shortName} ${verb} ${phrase}`;
+}
+
+function generateKeyInsights(leaders, responses) {
+  const ordered = leaders.map(leaderName => responses[leaderName]);
   return [
-    `Response timeline variance: ${responses.map(r => r.timeline).join(' vs ')}`,
-    `Escalation risk distribution: ${responses.map(r => r.escalation_risk).join(', ')}`,
-    `Roosevelt favors ${responses[0].escalation_phase?.toLowerCase() || 'measured'} approach`,
-    `Gandhi prioritizes ${responses[1].timeline?.includes('Immediate') ? 'rapid response' : 'deliberate action'}`,
-    `Putin calculates ${responses[2].escalation_risk === 'High' ? 'aggressive positioning' : 'strategic patience'}`
+    `Response timeline variance: ${ordered.map(r => r.timeline).join(' vs ')}`,
+    `Escalation risk distribution: ${ordered.map(r => r.escalation_risk).join(', ')}`,
+    ...leaders.map(leaderName => describeKeyInsight(LEADERS_BY_KEY[leaderName], responses[leaderName]))
   ];
 }
 
-function generateBLUF(responses, scenario) {
-  const riskLevel = calculateOverallRisk(responses);
-  const timelines = responses.map(r => r.timeline);
+function generateBLUF(leaders, responses, scenario) {
+  const ordered = leaders.map(leaderName => responses[leaderName]);
+  const riskLevel = calculateOverallRisk(ordered);
+  const timelines = ordered.map(r => r.timeline);
   const hasImmediateResponse = timelines.some(t => t?.includes('Immediate'));
 
   let bluf = `Multi-agent psychological analysis of "${scenario.substring(0, 50)}${scenario.length > 50 ? '...' : ''}" reveals `;
@@ -399,18 +1078,69 @@ function generateBLUF(responses, scenario) {
     bluf += 'At least one actor is likely to respond within 24 hours, creating pressure for rapid decision-making. ';
   }
 
-  bluf += `Roosevelt emphasizes ${responses[0].public_response?.substring(0, 80) || 'principled engagement'}... `;
-  bluf += `Gandhi calculates ${responses[1].public_response?.substring(0, 80) || 'strategic positioning'}... `;
-  bluf += `Putin prioritizes ${responses[2].public_response?.substring(0, 80) || 'leverage maximization'}...`;
+  bluf += leaders.map(leaderName => {
+    const leader = LEADERS_BY_KEY[leaderName];
+    return `${leader.shortName} ${leader.summaryVerb} ${responses[leaderName].public_response?.substring(0, 80) || leader.summaryFallback}...`;
+  }).join(' ');
 
   return bluf;
 }
 
+// Leader registry metadata (drives frontend dossier tabs and voices)
+app.get('/api/leaders', (req, res) => {
+  res.json({ leaders: leaderSummaries() });
+});
+
+// Upstream resilience counters and breaker state, rendered at scrape time
+registerCollector(() => {
+  const lines = [
+    '# HELP aiq_upstream_calls_total Upstream calls, failures, retries, hedges, and calls abandoned by disconnected clients (cancelled mid-call, skipped before starting)',
+    '# TYPE aiq_upstream_calls_total counter',
+    '# HELP aiq_upstream_breaker_open 1 while the upstream circuit breaker is not closed',
+    '# TYPE aiq_upstream_breaker_open gauge'
+  ];
+  for (const [upstream, stats] of Object.entries(resilienceStats())) {
+    for (const outcome of ['calls', 'failures', 'retries', 'hedges', 'hedge_wins', 'cancelled', 'skipped']) {
+      lines.push(`aiq_upstream_calls_total{upstream="${upstream}",outcome="${outcome}"} ${stats[outcome]}`);
+    }
+    lines.push(`aiq_upstream_breaker_open{upstream="${upstream}"} ${stats.breaker.state === 'closed' ? 0 : 1}`);
+  }
+  return lines.join('\n');
+});
+
+// Single-flight deduplication: leaders started a computation, followers joined one in flight
+registerCollector(() => {
+  const lines = [
+    '# HELP aiq_coalesced_requests_total Analyses that started a computation (leader) or joined an identical one (follower)',
+    '# TYPE aiq_coalesced_requests_total counter'
+  ];
+  for (const flights of [crisisFlights, documentFlights]) {
+    const stats = flights.stats();
+    lines.push(`aiq_coalesced_requests_total{kind="${flights.name}",role="leader"} ${stats.leaders}`);
+    lines.push(`aiq_coalesced_requests_total{kind="${flights.name}",role="follower"} ${stats.followers}`);
+  }
+  lines.push(
+    '# HELP aiq_abandoned_flights_total Analyses aborted because every client waiting on them disconnected',
+    '# TYPE aiq_abandoned_flights_total counter'
+  );
+  for (const flights of [crisisFlights, documentFlights]) {
+    lines.push(`aiq_abandoned_flights_total{kind="${flights.name}"} ${flights.stats().abandoned}`);
+  }
+  return lines.join('\n');
+});
+
+// Prometheus text exposition: request/span latency histograms, token counters, upstream state
+app.get('/api/metrics', (req, res) => {
+  res.type('text/plain; version=0.0.4').send(renderMetrics());
+});
+
 // Health check endpoint
 app.get('/api/health', (req, res) => {
   res.json({ 
     status: 'operational', 
     message: 'AdversaryIQ Intelligence Engine Online',
+    upstreams: resilienceStats(),
+    coalescing: { crisis: crisisFlights.stats(), document: documentFlights.stats() },
     timestamp: new Date().toISOString()
   });
 });
@@ -0,0 +1,131 @@
+// Multi-round escalation simulation context.
+//
+// A simulation replays one scenario over several rounds; in each round every
+// leader reacts to the others' moves from the round before and reports where
+// it now stands on its own escalation ladder. The transcript is never resent.
+// A leader's context for a round is:
+//   - a rolling summary: one trajectory line per leader, with consecutive
+//     rounds on the same rung and risk merged ("Denial, Medium (R1-R3)"), so
+//     it only grows when someone actually moves;
+//   - the deltas: the other leaders' last-round public statements and
+//     (intelligence-reported) private actions, clipped to MOVE_CHARS, and what
+//     changed since the round before;
+//   - its own last position.
+// Per-call context stays roughly constant, so tokens and latency grow about
+// linearly with the number of rounds.
+
+const SIMULATION_MAX_ROUNDS = parseInt(process.env.SIMULATION_MAX_ROUNDS || '6', 10);
+// Simulated time per round, so leaders can weigh their crisis_latency_hours
+const SIMULATION_ROUND_HOURS = parseInt(process.env.SIMULATION_ROUND_HOURS || '24', 10);
+
+// Characters kept from each field of a leader's last move
+const MOVE_CHARS = 360;
+
+function clip(text, limit) {
+  text = String(text || '').replace(/\s+/g, ' ').trim();
+  return text.length > limit ? `${text.slice(0, limit - 1).trimEnd()}…` : text;
+}
+
+class SimulationState {
+  // leaders: [{ key, name, ladder }] in registry order
+  constructor(leaders, rounds, roundHours = SIMULATION_ROUND_HOURS) {
+    this.leaders = leaders;
+    this.rounds = rounds;
+    this.roundHours = roundHours;
+    // key -> [{ round, step, index, risk }]
+    this.trajectory = Object.fromEntries(leaders.map(leader => [leader.key, []]));
+    // key -> the leader's move in the latest recorded round
+    this.lastMoves = {};
+  }
+
+  position(key) {
+    const positions = this.trajectory[key];
+    return positions[positions.length - 1] || null;
+  }
+
+  // Run-length summary of one leader's trajectory
+  summarize(key) {
+    const spans = [];
+    for (const { round, step, risk } of this.trajectory[key]) {
+      const last = spans[spans.length - 1];
+      if (last && last.step === step && last.risk === risk) last.to = round;
+      else spans.push({ step, risk, from: round, to: round });
+    }
+    return spans.map(({ step, risk, from, to }) =>
+      `${step || 'no reported move'}, ${risk} (R${from}${to > from ? `-R${to}` : ''})`).join(' → ');
+  }
+
+  describeChange(key) {
+    const positions = this.trajectory[key];
+    const [before, now] = positions.slice(-2);
+    if (!before || !now) return '';
+    const leader = this.leaders.find(candidate => candidate.key === key);
+    if (now.index === null || before.index === null || now.index === before.index) {
+      return before.risk === now.risk ? 'held position' : `risk ${before.risk} → ${now.risk}`;
+    }
+    const direction = now.index > before.index ? 'climbed' : 'stepped back';
+    return `${direction} from "${leader.ladder[before.index]}"`;
+  }
+
+  // The per-round part of a leader's user message (appended after the shared scenario prefix)
+  context(key, round) {
+    const hours = `hours ${(round - 1) * this.roundHours}-${round * this.roundHours} after the crisis broke`;
+    const header = `SIMULATION ROUND ${round} of ${this.rounds} (${hours}).`;
+    const instruction = 'Report where you now stand on your escalation ladder in "ladder_step".';
+
+    if (round === 1) {
+      return `${header}
+No leader has moved yet. Decide your opening move. ${instruction}`;
+    }
+
+    const summary = this.leaders.map(leader => `- ${leader.name}: ${this.summarize(leader.key)}`).join('\n');
+    const others = this.leaders.filter(leader => leader.key !== key && this.lastMoves[leader.key]).map(leader => {
+      const move = this.lastMoves[leader.key];
+      const change = this.describeChange(leader.key);
+      return `${leader.name} (now at "${move.step || 'unknown'}", risk ${move.risk}${change ? `; ${change}` : ''}):
+  Public: ${clip(move.public_response, MOVE_CHARS)}
+  Private (intelligence reports): ${clip(move.private_actions, MOVE_CHARS)}`;
+    }).join('\n');
+    const own = this.lastMoves[key];
+    const ownLine = own
+      ? `YOUR LAST MOVE: "${own.step || 'unknown'}", risk ${own.risk}. You said: ${clip(own.public_response, MOVE_CHARS / 2)}`
+      : 'YOUR LAST MOVE: none reported.';
+
+    return `${header}
+
+ESCALATION SO FAR (earlier rounds condensed):
+${summary}
+
+LAST ROUND (round ${round - 1}), WHAT THE OTHER LEADERS DID:
+${others || 'No other leader reported a move.'}
+
+${ownLine}
+
+React to the other leaders' latest moves. Hold, climb your escalation ladder or step back, consistent with your crisis latency and historical patterns. ${instruction}`;
+  }
+
+  // Record one finished round ({ key: agent response }); returns the round's one-line digest
+  record(round, responses) {
+    for (const leader of this.leaders) {
+      const response = responses[leader.key];
+      if (!response) continue;
+      const previous = this.position(leader.key);
+      const index = leader.ladder.indexOf(response.ladder_step);
+      // An unusable step (e.g. a failed call) keeps the leader where it was
+      const step = index >= 0 ? response.ladder_step : previous?.step ?? null;
+      this.trajectory[leader.key].push({
+        round,
+        step,
+        index: index >= 0 ? index : previous?.index ?? null,
+        risk: response.escalation_risk
+      });
+      if (response.error) delete this.lastMoves[leader.key];
+      else this.lastMoves[leader.key] = { ...response, step, risk: response.escalation_risk };
+    }
+    return this.leaders.filter(leader => responses[leader.key])
+      .map(leader => `${leader.name}: ${this.position(leader.key).step || 'no reported move'} (${responses[leader.key].escalation_risk})`)
+      .join('; ');
+  }
+}
+
+module.exports = { SimulationState, SIMULATION_MAX_ROUNDS, SIMULATION_ROUND_HOURS };
@@ -0,0 +1,80 @@
+// Belief sensitivity sweeps.
+//
+// A sweep re-runs one scenario with some of the leaders' belief values
+// overridden, over a grid of values per belief (e.g. domestic_support at
+// 0.3 / 0.45 / 0.6 crossed with western_threat at 0.6 / 0.8). The plan is
+// made before any LLM call: a leader only varies the beliefs its beliefs
+// file actually has, so a leader without western_threat needs one call per
+// domestic_support value rather than one per grid cell, and a plan that needs
+// more calls than the budget allows is rejected outright.
+
+// Hard ceiling on agent calls per sweep; a request's own budget can only lower it
+const SWEEP_MAX_CALLS = parseInt(process.env.SWEEP_MAX_CALLS || '75', 10);
+const SWEEP_MAX_VALUES = parseInt(process.env.SWEEP_MAX_VALUES || '9', 10);
+
+// One axis gives a sensitivity table, two give a heatmap
+const SWEEP_MAX_PARAMETERS = 2;
+
+function cartesian(axes) {
+  return axes.reduce((combos, [parameter, values]) =>
+    combos.flatMap(combo => values.map(value => ({ ...combo, [parameter]: value }))), [{}]);
+}
+
+// Validate grid ({ belief: [values] }) against the selected leaders' beliefs and
+// expand it into one task per distinct (leader, overrides); throws on a bad grid
+// or when the plan exceeds min(budget, SWEEP_MAX_CALLS)
+function planSweep(grid, leaders, beliefsByLeader, budget) {
+  if (!grid || typeof grid !== 'object' || Array.isArray(grid) || Object.keys(grid).length === 0) {
+    throw new Error('Sweep grid required: { "<belief>": [values...] }');
+  }
+  const parameters = Object.keys(grid);
+  if (parameters.length > SWEEP_MAX_PARAMETERS) {
+    throw new Error(`At most ${SWEEP_MAX_PARAMETERS} beliefs can be swept at once`);
+  }
+
+  const values = {};
+  for (const parameter of parameters) {
+    const raw = grid[parameter];
+    if (!Array.isArray(raw) || raw.length === 0) {
+      throw new Error(`No values given for ${parameter}`);
+    }
+    if (!raw.every(value => typeof value === 'number' && value >= 0 && value <= 1)) {
+      throw new Error(`Values for ${parameter} must be numbers between 0 and 1`);
+    }
+    values[parameter] = [...new Set(raw)].sort((a, b) => a - b);
+    if (values[parameter].length > SWEEP_MAX_VALUES) {
+      throw new Error(`At most ${SWEEP_MAX_VALUES} values per belief`);
+    }
+    if (!leaders.some(leaderName => parameter in beliefsByLeader[leaderName])) {
+      throw new Error(`No selected leader has a belief named ${parameter}`);
+    }
+  }
+
+  const tasks = leaders.flatMap(leaderName => {
+    const axes = parameters.filter(parameter => parameter in beliefsByLeader[leaderName])
+      .map(parameter => [parameter, values[parameter]]);
+    return cartesian(axes).map(beliefs => ({ leaderName, beliefs }));
+  });
+
+  const limit = Math.min(Number.isInteger(budget) && budget > 0 ? budget : SWEEP_MAX_CALLS, SWEEP_MAX_CALLS);
+  if (tasks.length > limit) {
+    throw new Error(`Sweep needs ${tasks.length} LLM calls; the budget is ${limit}`);
+  }
+
+  return {
+    parameters,
+    values,
+    leaders,
+    // Each leader's current value of the swept beliefs it has, so the UI can mark the baseline
+    baseline: Object.fromEntries(leaders.map(leaderName => [leaderName, Object.fromEntries(
+      parameters.filter(parameter => parameter in beliefsByLeader[leaderName])
+        .map(parameter => [parameter, beliefsByLeader[leaderName][parameter]])
+    )])),
+    cells: parameters.reduce((cells, parameter) => cells * values[parameter].length, 1),
+    calls: tasks.length,
+    budget: limit,
+    tasks
+  };
+}
+
+module.exports = { planSweep, SWEEP_MAX_CALLS, SWEEP_MAX_VALUES, SWEEP_MAX_PARAMETERS };
@@ -0,0 +1,197 @@
+// Request tracing and Prometheus-style metrics.
+//
+// Every API request runs inside a Trace: its ID comes from the caller's
+// X-Trace-Id header (or is generated) and is echoed back, and span() records
+// named, timed stages anywhere below the request handler without threading the
+// trace through every call (AsyncLocalStorage finds the active one). Span and
+// request durations also feed the histograms served by /api/metrics.
+
+const { AsyncLocalStorage } = require('async_hooks');
+const crypto = require('crypto');
+const { performance } = require('perf_hooks');
+
+const TRACE_HEADER = 'X-Trace-Id';
+const TRACE_ID_PATTERN = /^[A-Za-z0-9_-]{8,64}$/;
+
+// Seconds; spans range from sub-ms JSON handling to multi-second LLM calls
+const LATENCY_BUCKETS = [0.001, 0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80];
+
+const storage = new AsyncLocalStorage();
+
+function labelKey(labels) {
+  return JSON.stringify(Object.entries(labels).sort(([a], [b]) => a.localeCompare(b)));
+}
+
+function formatLabels(entries) {
+  if (!entries.length) return '';
+  return `{${entries.map(([key, value]) => `${key}="${String(value).replace(/["\\\n]/g, '\\$&')}"`).join(',')}}`;
+}
+
+class Counter {
+  constructor(name, help) {
+    this.name = name;
+    this.help = help;
+    this.values = new Map();
+  }
+
+  inc(labels = {}, amount = 1) {
+    const key = labelKey(labels);
+    this.values.set(key, (this.values.get(key) || 0) + amount);
+  }
+
+  render() {
+    const lines = [`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} counter`];
+    for (const [key, value] of this.values) {
+      lines.push(`${this.name}${formatLabels(JSON.parse(key))} ${value}`);
+    }
+    return lines.join('\n');
+  }
+}
+
+class Histogram {
+  constructor(name, help, buckets = LATENCY_BUCKETS) {
+    this.name = name;
+    this.help = help;
+    this.buckets = buckets;
+    this.series = new Map();
+  }
+
+  observe(labels, value) {
+    const key = labelKey(labels);
+    let series = this.series.get(key);
+    if (!series) {
+      series = { counts: new Array(this.buckets.length).fill(0), sum: 0, count: 0 };
+      this.series.set(key, series);
+    }
+    const bucket = this.buckets.findIndex(bound => value <= bound);
+    if (bucket !== -1) series.counts[bucket]++;
+    series.sum += value;
+    series.count++;
+  }
+
+  render() {
+    const lines = [`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} histogram`];
+    for (const [key, series] of this.series) {
+      const labels = JSON.parse(key);
+      let cumulative = 0;
+      this.buckets.forEach((bound, i) => {
+        cumulative += series.counts[i];
+        lines.push(`${this.name}_bucket${formatLabels([...labels, ['le', bound]])} ${cumulative}`);
+      });
+      lines.push(`${this.name}_bucket${formatLabels([...labels, ['le', '+Inf']])} ${series.count}`);
+      lines.push(`${this.name}_sum${formatLabels(labels)} ${series.sum.toFixed(6)}`);
+      lines.push(`${this.name}_count${formatLabels(labels)} ${series.count}`);
+    }
+    return lines.join('\n');
+  }
+}
+
+const metrics = {
+  requestDuration: new Histogram('aiq_http_request_duration_seconds', 'API request duration by route and status'),
+  spanDuration: new Histogram('aiq_span_duration_seconds', 'Traced stage duration by span name and agent'),
+  tokens: new Counter('aiq_llm_tokens_total', 'LLM tokens by agent, call kind and token type (prompt, cached, completion)'),
+  cancelledRequests: new Counter('aiq_cancelled_requests_total', 'Requests whose client disconnected before the response finished, by route')
+};
+
+// Functions returning extra exposition text (e.g. upstream resilience state) at scrape time
+const collectors = [];
+
+function registerCollector(collect) {
+  collectors.push(collect);
+}
+
+function renderMetrics() {
+  return [...Object.values(metrics).map(metric => metric.render()), ...collectors.map(collect => collect())]
+    .join('\n') + '\n';
+}
+
+class Trace {
+  constructor(id) {
+    this.id = id;
+    this.startedAt = performance.now();
+    this.spans = [];
+  }
+
+  record(name, startedAt, attrs = {}) {
+    this.spans.push({
+      name,
+      start_ms: Math.round(startedAt - this.startedAt),
+      duration_ms: Math.round((performance.now() - startedAt) * 10) / 10,
+      ...attrs
+    });
+  }
+
+  toJSON() {
+    return {
+      trace_id: this.id,
+      total_ms: Math.round(performance.now() - this.startedAt),
+      spans: this.spans
+    };
+  }
+
+  // Server-Timing header value: total plus the summed duration of each span name
+  serverTiming() {
+    const totals = {};
+    for (const span of this.spans) totals[span.name] = (totals[span.name] || 0) + span.duration_ms;
+    const entries = Object.entries(totals).map(([name, ms]) => `${name};dur=${ms.toFixed(1)}`);
+    return [`total;dur=${(performance.now() - this.startedAt).toFixed(1)}`, ...entries].join(', ');
+  }
+}
+
+function currentTrace() {
+  return storage.getStore();
+}
+
+// Time fn() as a span of the active trace (if any) and in the span histogram
+async function span(name, fn, attrs = {}) {
+  const startedAt = performance.now();
+  let error;
+  try {
+    return await fn();
+  } catch (e) {
+    error = e;
+    throw e;
+  } finally {
+    metrics.spanDuration.observe({ span: name, agent: attrs.agent || '' }, (performance.now() - startedAt) / 1000);
+    currentTrace()?.record(name, startedAt, error ? { ...attrs, error: error.message } : attrs);
+  }
+}
+
+function recordTokens(agent, kind, usage) {
+  metrics.tokens.inc({ agent, kind, type: 'prompt' }, usage.prompt_tokens);
+  metrics.tokens.inc({ agent, kind, type: 'cached' }, usage.cached_tokens);
+  metrics.tokens.inc({ agent, kind, type: 'completion' }, usage.completion_tokens);
+}
+
+// Express middleware: must run after the body parser so handlers inherit the trace
+function tracing(req, res, next) {
+  const incoming = req.get(TRACE_HEADER);
+  const trace = new Trace(incoming && TRACE_ID_PATTERN.test(incoming) ? incoming : crypto.randomBytes(8).toString('hex'));
+  req.trace = trace;
+  res.setHeader(TRACE_HEADER, trace.id);
+
+  res.on('close', () => {
+    const seconds = (performance.now() - trace.startedAt) / 1000;
+    const route = req.route?.path || 'unmatched';
+    metrics.requestDuration.observe({ method: req.method, route, status: res.statusCode }, seconds);
+    if (req.method !== 'GET') {
+      console.log(`[trace ${trace.id}] ${req.method} ${req.originalUrl} ${res.statusCode} ${seconds.toFixed(2)}s`);
+    }
+  });
+
+  storage.run(trace, next);
+}
+
+module.exports = {
+  TRACE_HEADER,
+  Counter,
+  Histogram,
+  Trace,
+  metrics,
+  registerCollector,
+  renderMetrics,
+  currentTrace,
+  span,
+  recordTokens,
+  tracing
+};
@@ -3,687 +3,562 @@ AdversaryIQ - Diplomatic Intelligence Platform
 Gradio Frontend - Classified Dossier Theme
 
 Inspired by declassified CIA/NSC documents.
-"""
 
-import gradio as gr
-import requests
-import os
-import tempfile
-import base64
-from datetime import datetime
-
-# Configuration
-API_URL = os.environ.get("API_URL", "http://localhost:3001")
-
-# Dossier Theme CSS
-DOSSIER_CSS = """
-@import url('https://fonts.googleapis.com/css2?family=Courier+Prime:wght@400;700&family=Special+Elite&display=swap');
-
-.gradio-container {
-    background-color: #f5f2e8 !important;
-    background-image:
-        repeating-linear-gradient(
-            0deg,
-            transparent,
-            transparent 31px,
-            rgba(0,0,0,0.025) 31px,
-            rgba(0,0,0,0.025) 32px
-        ) !important;
-    font-family: 'Courier Prime', 'Courier New', Courier, monospace !important;
-}
-
-.contain {
-    max-width: 900px !important;
-    margin: 0 auto !important;
-}
-
-.voice-btn {
-    background: #8B4513 !important;
-    color: white !important;
-    font-size: 11px !important;
-    letter-spacing: 1px !important;
-}
+Only the Gradio layout lives here; the analysis logic is in handlers.py
+and the HTML in rendering.py. The Blocks tree is built on first access to
+`app` (or by build_app()), not at import.
 """
 
-# Store last response for voice synthesis
-last_crisis_response = {}
-
-
-def format_agent_dossier(agent_key: str, agent_data: dict) -> str:
-    """Format agent response as a classified dossier page."""
-
-    agent_info = {
-        'roosevelt': {
-            'name': 'ROOSEVELT, Theodore',
-            'description': 'U.S. Historical Leadership Profile',
-            'color': '#8B4513'
-        },
-        'gandhi': {
-            'name': 'GANDHI, Indira',
-            'description': 'Indian Strategic Leadership Profile',
-            'color': '#2F4F4F'
-        },
-        'putin': {
-            'name': 'PUTIN, Vladimir',
-            'description': 'Russian Federation Leadership Profile',
-            'color': '#8B0000'
-        }
-    }
-
-    info = agent_info.get(agent_key, agent_info['roosevelt'])
-
-    if not agent_data:
-        return f"""
-        <div style="background: #fffefa; border: 1px solid #888; padding: 36px;
-                    font-family: 'Courier Prime', monospace; text-align: center; color: #888;">
-            No analysis data available for {info['name']}.
-        </div>
-        """
-
-    public_response = agent_data.get('public_response', 'Awaiting analysis...')
-    private_actions = agent_data.get('private_actions', 'Awaiting analysis...')
-    psych_reasoning = agent_data.get('psychological_reasoning', 'Awaiting analysis...')
-
-    html = f"""
-    <div style="background: #fffefa; border: 1px solid #888; padding: 36px; position: relative;
-                font-family: 'Courier Prime', 'Courier New', monospace; box-shadow: 3px 3px 10px rgba(0,0,0,0.08);">
-
-        <!-- Corner fold effect -->
-        <div style="position: absolute; bottom: 0; right: 0; width: 40px; height: 40px;
-                    background: linear-gradient(135deg, #fffefa 50%, #e8e4d8 50%);
-                    box-shadow: -2px -2px 4px rgba(0,0,0,0.05);"></div>
-
-        <!-- Dossier Header -->
-        <div style="border-bottom: 1px solid #ccc; padding-bottom: 16px; margin-bottom: 28px;">
-            <div style="margin-bottom: 6px;">
-                <span style="font-size: 10px; font-weight: bold; letter-spacing: 2px; margin-right: 8px;">SUBJECT:</span>
-                <span style="font-size: 13px; text-decoration: underline; text-underline-offset: 3px;">
-                    {info['name']} — {info['description']}
-                </span>
-            </div>
-            <div>
-                <span style="font-size: 10px; font-weight: bold; letter-spacing: 2px; margin-right: 8px;">STATUS:</span>
-                <span style="font-size: 11px; color: #006400; font-weight: bold; letter-spacing: 1px;">PROFILE ACTIVE</span>
-            </div>
-        </div>
-
-        <!-- Content Blocks -->
-        <div style="display: flex; flex-direction: column; gap: 28px;">
-
-            <!-- A. Public Response -->
-            <div>
-                <h4 style="font-size: 11px; font-weight: bold; letter-spacing: 2px; margin-bottom: 10px;
-                           text-decoration: underline; text-underline-offset: 3px;">
-                    A. PUBLIC RESPONSE
-                </h4>
-                <p style="font-size: 13px; line-height: 2; color: #1a1a1a;">
-                    {public_response}
-                </p>
-            </div>
-
-            <!-- B. Private Actions (with redacted hover effect simulation) -->
-            <div style="position: relative;">
-                <h4 style="font-size: 11px; font-weight: bold; letter-spacing: 2px; margin-bottom: 10px;
-                           text-decoration: underline; text-underline-offset: 3px; color: #8b0000;">
-                    B. PRIVATE ACTIONS [CLASSIFIED]
-                </h4>
-                <p style="font-size: 13px; line-height: 2; color: #1a1a1a;">
-                    {private_actions}
-                </p>
-            </div>
-
-            <!-- C. Psychological Assessment -->
-            <div>
-                <h4 style="font-size: 11px; font-weight: bold; letter-spacing: 2px; margin-bottom: 10px;
-                           text-decoration: underline; text-underline-offset: 3px;">
-                    C. PSYCHOLOGICAL ASSESSMENT
-                </h4>
-                <p style="font-size: 13px; line-height: 2; color: #444;">
-                    {psych_reasoning}
-                </p>
-            </div>
-        </div>
-
-        <!-- Page Footer -->
-        <div style="display: flex; justify-content: space-between; margin-top: 36px; padding-top: 16px;
-                    border-top: 1px solid #ccc; font-size: 10px; color: #888; letter-spacing: 1px;">
-            <span>Page 1 of 3</span>
-            <span>SECRET // NOFORN</span>
-        </div>
-    </div>
-    """
-    return html
-
-
-def format_document_dossier(agent_key: str, agent_data: dict) -> str:
-    """Format document analysis as a classified dossier page."""
-
-    agent_info = {
-        'roosevelt': {'name': 'ROOSEVELT, Theodore', 'color': '#8B4513'},
-        'gandhi': {'name': 'GANDHI, Indira', 'color': '#2F4F4F'},
-        'putin': {'name': 'PUTIN, Vladimir', 'color': '#8B0000'}
-    }
-
-    info = agent_info.get(agent_key, agent_info['roosevelt'])
-
-    if not agent_data:
-        return "<div style='padding: 40px; text-align: center; color: #888;'>No analysis available.</div>"
-
-    html = f"""
-    <div style="background: #fffefa; border: 1px solid #888; padding: 36px; position: relative;
-                font-family: 'Courier Prime', monospace; box-shadow: 3px 3px 10px rgba(0,0,0,0.08);">
-
-        <div style="position: absolute; bottom: 0; right: 0; width: 40px; height: 40px;
-                    background: linear-gradient(135deg, #fffefa 50%, #e8e4d8 50%);"></div>
-
-        <div style="border-bottom: 1px solid #ccc; padding-bottom: 16px; margin-bottom: 28px;">
-            <span style="font-size: 10px; font-weight: bold; letter-spacing: 2px;">ANALYST:</span>
-            <span style="font-size: 13px; text-decoration: underline; margin-left: 8px;">{info['name']}</span>
-        </div>
-
-        <div style="display: flex; flex-direction: column; gap: 24px;">
-            <div>
-                <h4 style="font-size: 11px; font-weight: bold; letter-spacing: 2px; margin-bottom: 10px;
-                           text-decoration: underline;">A. DOCUMENT INTERPRETATION</h4>
-                <p style="font-size: 13px; line-height: 2;">{agent_data.get('document_interpretation', 'N/A')}</p>
-            </div>
-
-            <div style="background: rgba(139,0,0,0.05); border-left: 3px solid #8b0000; padding: 16px;">
-                <h4 style="font-size: 11px; font-weight: bold; letter-spacing: 2px; margin-bottom: 10px;
-                           color: #8b0000;">B. HIDDEN INTENTIONS DETECTED</h4>
-                <p style="font-size: 13px; line-height: 2;">{agent_data.get('hidden_intentions', 'None detected')}</p>
-            </div>
-
-            <div style="background: rgba(139,69,19,0.05); border-left: 3px solid #8B4513; padding: 16px;">
-                <h4 style="font-size: 11px; font-weight: bold; letter-spacing: 2px; margin-bottom: 10px;
-                           color: #8B4513;">C. PSYCHOLOGICAL TACTICS</h4>
-                <p style="font-size: 13px; line-height: 2;">{agent_data.get('psychological_tactics', 'None identified')}</p>
-            </div>
-
-            <div>
-                <h4 style="font-size: 11px; font-weight: bold; letter-spacing: 2px; margin-bottom: 10px;
-                           text-decoration: underline;">D. RECOMMENDED RESPONSE</h4>
-                <p style="font-size: 13px; line-height: 2;">{agent_data.get('your_response', 'No response formulated')}</p>
-            </div>
-
-            <div style="background: #f5f2e8; padding: 12px; border: 1px dashed #888;">
-                <span style="font-size: 10px; font-weight: bold; letter-spacing: 2px; color: #006400;">
-                    AUTHENTICITY ASSESSMENT:
-                </span>
-                <span style="font-size: 12px; margin-left: 8px;">
-                    {agent_data.get('authenticity_assessment', 'Unable to assess')}
-                </span>
-            </div>
-        </div>
-
-        <div style="display: flex; justify-content: space-between; margin-top: 36px; padding-top: 16px;
-                    border-top: 1px solid #ccc; font-size: 10px; color: #888;">
-            <span>DOCUMENT ANALYSIS</span>
-            <span>CONFIDENTIAL</span>
-        </div>
-    </div>
-    """
-    return html
-
-
-def format_executive_summary(data: dict) -> str:
-    """Format executive summary as classified document."""
-
-    bluf = data.get('bluf', 'Multi-agent psychological analysis reveals divergent national interests.')
-    confidence = data.get('overall_risk', 'MEDIUM')
-    key_insights = data.get('key_insights', [])
-    timestamp = datetime.now().strftime("%d %B %Y")
-
-    insights_html = ""
-    for i, insight in enumerate(key_insights, 1):
-        insights_html += f'<div style="margin-bottom: 8px;"><span style="font-weight: bold;">{i}.</span> {insight}</div>'
-
-    html = f"""
-    <div style="background: #fffefa; border: 2px solid #1a1a1a; padding: 28px;
-                font-family: 'Courier Prime', monospace;">
-
-        <!-- BLUF Section -->
-        <div style="margin-bottom: 28px;">
-            <span style="font-size: 11px; font-weight: bold; letter-spacing: 3px;
-                         text-decoration: underline; text-underline-offset: 4px; display: block; margin-bottom: 16px;">
-                BOTTOM LINE UP FRONT (BLUF)
-            </span>
-            <p style="font-size: 13px; line-height: 2;">
-                {bluf}
-            </p>
-        </div>
-
-        <!-- Key Insights -->
-        <div style="margin-bottom: 28px; padding: 16px; background: #f5f2e8; border: 1px solid #ccc;">
-            <span style="font-size: 10px; font-weight: bold; letter-spacing: 2px; display: block; margin-bottom: 12px;">
-                KEY INTELLIGENCE FINDINGS:
-            </span>
-            <div style="font-size: 12px; line-height: 1.8;">
-                {insights_html if insights_html else '<em style="color: #888;">No specific findings recorded.</em>'}
-            </div>
-        </div>
-
-        <!-- Confidence Assessment -->
-        <div style="margin-bottom: 28px; text-align: center; padding: 12px; border: 1px solid #1a1a1a;">
-            <span style="font-size: 10px; letter-spacing: 2px; color: #666;">ASSESSMENT CONFIDENCE:</span>
-            <span style="font-size: 14px; font-weight: bold; letter-spacing: 2px; margin-left: 12px;
-                         color: {'#006400' if confidence == 'Low' else '#8B4513' if confidence == 'Medium' else '#8b0000'};">
-                {confidence}
-            </span>
-        </div>
-
-        <!-- Signature Line -->
-        <div style="display: flex; justify-content: space-between; align-items: flex-end;
-                    padding-top: 20px; border-top: 1px dashed #ccc;">
-            <div style="display: flex; align-items: flex-end; gap: 8px;">
-                <span style="font-size: 18px; font-weight: bold;">X</span>
-                <div>
-                    <div style="border-bottom: 1px solid #1a1a1a; width: 200px; padding-bottom: 6px;"></div>
-                    <span style="font-size: 9px; color: #888; letter-spacing: 2px;">ANALYZING OFFICER</span>
-                </div>
-            </div>
-            <div style="text-align: right;">
-                <span style="font-size: 9px; color: #888; letter-spacing: 2px; display: block; margin-bottom: 4px;">DATE</span>
-                <span style="font-size: 12px; border-bottom: 1px solid #1a1a1a; padding-bottom: 4px;">{timestamp}</span>
-            </div>
-        </div>
-    </div>
-    """
-    return html
-
-
-def process_crisis(crisis_text: str, state: dict) -> tuple:
-    """Process crisis through backend API."""
-    global last_crisis_response
-
-    if not crisis_text or not crisis_text.strip():
-        empty = "<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Enter a crisis scenario above to begin analysis.</div>"
-        return empty, empty, empty, empty, "Awaiting input...", {}
-
-    try:
-        response = requests.post(
-            f"{API_URL}/api/process-crisis",
-            json={"crisis": crisis_text.strip()},
-            headers={"Content-Type": "application/json"},
-            timeout=120
-        )
-
-        if response.status_code != 200:
-            error = f"<div style='padding: 20px; border: 2px solid #8b0000; color: #8b0000;'>API Error: {response.status_code}</div>"
-            return error, error, error, error, f"Error: {response.status_code}", {}
-
-        data = response.json()
-        agents = data.get('agents', {})
-
-        # Store response for voice synthesis
-        last_crisis_response = agents
-
-        roosevelt = format_agent_dossier('roosevelt', agents.get('roosevelt'))
-        gandhi = format_agent_dossier('gandhi', agents.get('gandhi'))
-        putin = format_agent_dossier('putin', agents.get('putin'))
-        summary = format_executive_summary(data)
-
-        return roosevelt, gandhi, putin, summary, "Analysis complete", agents
-
-    except requests.exceptions.Timeout:
-        error = "<div style='padding: 20px; border: 2px solid #8B4513; color: #8B4513;'>Request timed out. Please try again.</div>"
-        return error, error, error, error, "Timeout", {}
-    except requests.exceptions.ConnectionError:
-        error = f"<div style='padding: 20px; border: 2px solid #8b0000; color: #8b0000;'>Cannot connect to API at {API_URL}</div>"
-        return error, error, error, error, "Connection failed", {}
-    except Exception as e:
-        error = f"<div style='padding: 20px; border: 2px solid #8b0000; color: #8b0000;'>Error: {str(e)}</div>"
-        return error, error, error, error, f"Error: {str(e)}", {}
-
-
-def synthesize_voice(agent: str, state: dict) -> str:
-    """Synthesize voice for agent's public response."""
-
-    if not state or agent not in state:
-        return None
-
-    agent_data = state.get(agent, {})
-    text = agent_data.get('public_response', '')
-
-    if not text or text == 'Awaiting analysis...':
-        return None
-
-    try:
-        response = requests.post(
-            f"{API_URL}/api/synthesize-voice",
-            json={"text": text, "agent": agent},
-            headers={"Content-Type": "application/json"},
-            timeout=60
-        )
-
-        if response.status_code != 200:
-            return None
+import threading
 
-        # Save audio to temp file
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
-            f.write(response.content)
-            return f.name
-
-    except Exception as e:
-        print(f"Voice synthesis error: {e}")
-        return None
-
-
-def analyze_document(document_text: str) -> tuple:
-    """Analyze document through backend API."""
-
-    if not document_text or not document_text.strip():
-        empty = "<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Paste document text above to begin analysis.</div>"
-        return empty, empty, empty, "Awaiting document..."
-
-    try:
-        response = requests.post(
-            f"{API_URL}/api/analyze-document",
-            json={"documentText": document_text.strip(), "filename": "document.txt"},
-            headers={"Content-Type": "application/json"},
-            timeout=120
-        )
+import gradio as gr
 
-        if response.status_code != 200:
-            error = f"<div style='padding: 20px; border: 2px solid #8b0000; color: #8b0000;'>API Error: {response.status_code}</div>"
-            return error, error, error, f"Error: {response.status_code}"
+from batch_runner import BATCH_MAX_CONCURRENCY
+from documents import SUPPORTED_EXTENSIONS, format_document_preview
+from handlers import (SIMULATION_MAX_ROUNDS, analyze_document, check_api_health, ensure_leaders,
+                      find_similar_analysis, health_monitor, load_similar_analysis, process_crisis, rerun_handler,
+                      run_batch_file, run_sweep, simulate_crisis, voice_handler)
+from leaders import LEADERS
+from load_control import (QUEUE_MAX_SIZE, batch_load, crisis_load, document_load, simulation_load, sweep_load,
+                          voice_load)
+from rendering import DOSSIER_CSS, placeholder
+from result_cache import CACHE_DIR
+from risk_estimate import model as risk_model
+from scenario_index import scenario_index
+from sweep import SWEEP_MAX_CALLS
+from telemetry import start_metrics_server
 
-        data = response.json()
-        agents = data.get('agents', {})
 
-        roosevelt = format_document_dossier('roosevelt', agents.get('roosevelt'))
-        gandhi = format_document_dossier('gandhi', agents.get('gandhi'))
-        putin = format_document_dossier('putin', agents.get('putin'))
+def process_crisis_handler(crisis_text: str, state: dict, bypass_cache: bool = False,
+                           eager_voice: bool = False, request: gr.Request = None):
+    """process_crisis with the Gradio session as the eager-voice owner."""
+    session_id = request.session_hash if request else "default"
+    yield from process_crisis(crisis_text, state, bypass_cache, eager_voice, session_id)
 
-        return roosevelt, gandhi, putin, "Document analysis complete"
 
-    except Exception as e:
-        error = f"<div style='padding: 20px; border: 2px solid #8b0000; color: #8b0000;'>Error: {str(e)}</div>"
-        return error, error, error, f"Error: {str(e)}"
+def similar_handler(crisis_text: str):
+    """Show or hide the near-duplicate notice and its LOAD button as the scenario is edited."""
+    notice, match = find_similar_analysis(crisis_text)
+    return gr.update(value=notice, visible=match is not None), gr.update(visible=match is not None), match
 
 
-def check_api_health() -> str:
-    try:
-        response = requests.get(f"{API_URL}/api/health", timeout=5)
-        if response.status_code == 200:
-            return f"System Online | {API_URL}"
-        return f"API Error: {response.status_code}"
-    except:
-        return f"Offline | {API_URL}"
+def load_similar_handler(match: dict, eager_voice: bool = False, request: gr.Request = None):
+    session_id = request.session_hash if request else "default"
+    yield from load_similar_analysis(match, eager_voice, session_id)
 
 
 # ============================================================================
 # GRADIO INTERFACE
 # ============================================================================
 
-with gr.Blocks(title="AdversaryIQ - Intelligence Dossier", css=DOSSIER_CSS) as app:
-
-    # State for storing response data
-    response_state = gr.State({})
+def build_app() -> gr.Blocks:
+    """Construct the Blocks UI and start the health monitor (and metrics endpoint, if configured)."""
+
+    ensure_leaders()
+    health_monitor.start()
+    start_metrics_server()
+    threading.Thread(target=scenario_index.load, name="scenario-index", daemon=True).start()
+    # Loads NumPy and the profile feature matrix so the first provisional estimate is instant
+    threading.Thread(target=risk_model, name="risk-model", daemon=True).start()
+
+    with gr.Blocks(title="AdversaryIQ - Intelligence Dossier", css=DOSSIER_CSS) as app:
+
+        # State for storing response data
+        response_state = gr.State({})
+        # Queue tickets from EventLoad.admit, one per submit button, so each run retires only its own
+        crisis_ticket, document_ticket, batch_ticket, sweep_ticket, simulation_ticket = (gr.State(None) for _ in range(5))
+        rerun_tickets = {leader['key']: gr.State(None) for leader in LEADERS}
+
+        # Header with TOP SECRET stamp
+        gr.HTML("""
+            <div style="display: flex; justify-content: space-between; align-items: flex-start;
+                        padding: 24px 0; border-bottom: 2px solid #1a1a1a; background: #faf7f0;
+                        font-family: 'Courier Prime', monospace; position: relative; margin-bottom: 20px;">
+
+                <!-- TOP SECRET Stamp -->
+                <div style="position: absolute; top: 10px; left: 0; padding: 4px 14px;
+                            border: 3px solid #8b0000; color: #8b0000;
+                            font-family: 'Special Elite', Impact, sans-serif; font-size: 13px;
+                            font-weight: bold; letter-spacing: 3px; background: rgba(255,255,255,0.8);
+                            transform: rotate(-12deg);">
+                    TOP SECRET
+                </div>
 
-    # Header with TOP SECRET stamp
-    gr.HTML("""
-        <div style="display: flex; justify-content: space-between; align-items: flex-start;
-                    padding: 24px 0; border-bottom: 2px solid #1a1a1a; background: #faf7f0;
-                    font-family: 'Courier Prime', monospace; position: relative; margin-bottom: 20px;">
+                <div style="margin-left: 20px; margin-top: 30px;">
+                    <h1 style="font-size: 32px; font-weight: bold; letter-spacing: 4px; margin: 0;
+                               font-family: 'Special Elite', 'Courier New', monospace;">
+                        ADVERSARY<span style="color: #8b0000;">IQ</span>
+                    </h1>
+                    <p style="font-size: 11px; letter-spacing: 3px; color: #666; margin-top: 4px;">
+                        MULTI-AGENT PSYCHOLOGICAL INTELLIGENCE SYSTEM
+                    </p>
+                </div>
 
-            <!-- TOP SECRET Stamp -->
-            <div style="position: absolute; top: 10px; left: 0; padding: 4px 14px;
-                        border: 3px solid #8b0000; color: #8b0000;
-                        font-family: 'Special Elite', Impact, sans-serif; font-size: 13px;
-                        font-weight: bold; letter-spacing: 3px; background: rgba(255,255,255,0.8);
-                        transform: rotate(-12deg);">
-                TOP SECRET
+                <div style="text-align: right; margin-right: 20px;">
+                    <div style="margin-bottom: 8px;">
+                        <span style="display: block; font-size: 9px; color: #888; letter-spacing: 2px;">SYSTEM ID</span>
+                        <span style="font-size: 14px; font-weight: bold; letter-spacing: 2px;">AIQ-DEMO</span>
+                    </div>
+                    <div>
+                        <span style="display: block; font-size: 9px; color: #888; letter-spacing: 2px;">STATUS</span>
+                        <span style="font-size: 14px; font-weight: bold; letter-spacing: 2px; color: #006400;">OPERATIONAL</span>
+                    </div>
+                </div>
             </div>
-
-            <div style="margin-left: 20px; margin-top: 30px;">
-                <h1 style="font-size: 32px; font-weight: bold; letter-spacing: 4px; margin: 0;
-                           font-family: 'Special Elite', 'Courier New', monospace;">
-                    ADVERSARY<span style="color: #8b0000;">IQ</span>
-                </h1>
-                <p style="font-size: 11px; letter-spacing: 3px; color: #666; margin-top: 4px;">
-                    MULTI-AGENT PSYCHOLOGICAL INTELLIGENCE SYSTEM
+        """)
+
+        # Classification Banner
+        gr.HTML("""
+            <div style="background: #8b0000; padding: 10px; text-align: center; margin-bottom: 30px;">
+                <span style="color: #fff; font-size: 11px; font-weight: bold; letter-spacing: 6px;
+                             font-family: 'Courier Prime', monospace;">
+                    FOR OFFICIAL USE ONLY — AUTHORIZED PERSONNEL ONLY
+                </span>
+            </div>
+        """)
+
+        # Main Tabs
+        with gr.Tabs():
+
+            # ===================== CRISIS ANALYSIS TAB =====================
+            with gr.Tab("I. CRISIS ANALYSIS"):
+
+                gr.HTML("""
+                    <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 20px;
+                                padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
+                                font-family: 'Courier Prime', monospace;">
+                        <span style="font-size: 14px; font-weight: bold;">I.</span>
+                        <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">CRISIS SCENARIO INPUT</span>
+                    </div>
+                """)
+
+                crisis_input = gr.Textbox(
+                    label="",
+                    placeholder="Enter diplomatic crisis scenario for multi-agent psychological analysis...",
+                    lines=5,
+                    elem_classes=["dossier-textarea"]
+                )
+
+                gr.HTML("""
+                    <div style="font-size: 10px; color: #888; letter-spacing: 1px; margin: 8px 0 12px 0;
+                                font-family: 'Courier Prime', monospace;">
+                        EXAMPLE SCENARIOS (click to load):
+                    </div>
+                """)
+
+                gr.Examples(
+                    examples=[
+                        ["North Korea establishes a new forward military base just 12 kilometers from the South Korean border, deploying artillery systems capable of striking Seoul within minutes."],
+                        ["Chinese naval forces begin encircling Taiwan with a maritime blockade, intercepting commercial shipping and declaring a 'special military exercise zone' around the island."],
+                        ["Your neighbor's golden retriever has been spotted relieving itself in the HOA president's award-winning rose garden, and security camera footage has gone viral on the community Facebook group."],
+                    ],
+                    inputs=crisis_input,
+                    label=""
+                )
+
+                # Near-duplicate of an earlier scenario: offer its cached analysis
+                similar_match = gr.State(None)
+                with gr.Row():
+                    similar_notice = gr.HTML(visible=False)
+                    load_similar_btn = gr.Button("LOAD SIMILAR ANALYSIS", size="sm", visible=False, scale=0)
+
+                with gr.Row():
+                    analyze_btn = gr.Button("PROCESS INTELLIGENCE", variant="primary")
+                    clear_btn = gr.Button("CLEAR FORM")
+
+                with gr.Row():
+                    bypass_cache_box = gr.Checkbox(label="Bypass cache (force fresh analysis)", value=False)
+                    eager_voice_box = gr.Checkbox(label="Eager voice (pre-synthesize all leaders)", value=False)
+
+                status_text = gr.Textbox(label="SYSTEM STATUS", value=check_api_health(), interactive=False)
+
+                # Section II: Agent Analysis
+                gr.HTML("""
+                    <div style="display: flex; align-items: center; gap: 12px; margin: 30px 0 20px 0;
+                                padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
+                                font-family: 'Courier Prime', monospace;">
+                        <span style="font-size: 14px; font-weight: bold;">II.</span>
+                        <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">AGENT ANALYSIS</span>
+                        <span style="margin-left: auto; padding: 3px 10px; border: 2px solid #8b0000;
+                                     color: #8b0000; font-size: 9px; font-weight: bold; letter-spacing: 2px;
+                                     transform: rotate(-2deg);">CONFIDENTIAL</span>
+                    </div>
+                """)
+
+                # One tab per registered leader, in registry order
+                crisis_panels, voice_buttons, rerun_buttons, audio_players = {}, {}, {}, {}
+                with gr.Tabs():
+                    for leader in LEADERS:
+                        key = leader['key']
+                        with gr.Tab(leader['short_name'].upper()):
+                            crisis_panels[key] = gr.HTML(value=placeholder("Enter a crisis scenario above to begin analysis."))
+                            with gr.Row():
+                                voice_buttons[key] = gr.Button("🔊 GENERATE VOICE", size="sm", elem_classes=["voice-btn"])
+                                rerun_buttons[key] = gr.Button("↻ RE-RUN THIS LEADER", size="sm")
+                            audio_players[key] = gr.Audio(label="Voice Synthesis", visible=True, interactive=False,
+                                                          streaming=True, autoplay=True)
+
+                # Section III: Executive Summary
+                gr.HTML("""
+                    <div style="display: flex; align-items: center; gap: 12px; margin: 30px 0 20px 0;
+                                padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
+                                font-family: 'Courier Prime', monospace;">
+                        <span style="font-size: 14px; font-weight: bold;">III.</span>
+                        <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">EXECUTIVE SUMMARY</span>
+                    </div>
+                """)
+
+                crisis_summary = gr.HTML(value=placeholder("Submit a crisis scenario to generate executive intelligence summary."))
+
+            # ===================== DOCUMENT ANALYSIS TAB =====================
+            with gr.Tab("II. DOCUMENT ANALYSIS"):
+
+                gr.HTML("""
+                    <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 20px;
+                                padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
+                                font-family: 'Courier Prime', monospace;">
+                        <span style="font-size: 14px; font-weight: bold;">I.</span>
+                        <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">DOCUMENT SUBMISSION</span>
+                    </div>
+                """)
+
+                doc_input = gr.Textbox(
+                    label="",
+                    placeholder="Paste diplomatic document, treaty, communique, or proposal text for psychological subtext analysis...",
+                    lines=8
+                )
+
+                doc_file = gr.File(
+                    label="OR UPLOAD DOCUMENT (.txt / .md / .pdf)",
+                    file_types=list(SUPPORTED_EXTENSIONS),
+                    type="filepath"
+                )
+
+                gr.HTML("""
+                    <div style="font-size: 10px; color: #888; letter-spacing: 1px; margin: 8px 0 12px 0;
+                                font-family: 'Courier Prime', monospace;">
+                        EXAMPLE DOCUMENTS (click to load):
+                    </div>
+                """)
+
+                gr.Examples(
+                    examples=[
+                        ["We remain fully committed to peaceful dialogue and diplomatic resolution of all outstanding issues. However, we must be clear that our nation reserves every right and option to defend our sovereignty and protect our citizens from external threats. We call upon all parties to exercise restraint."],
+                        ["The Ministry of Foreign Affairs wishes to express its deep concern regarding recent developments in the region. While we value our longstanding partnership and shared interests, we cannot remain silent when fundamental principles of international law are being challenged."],
+                        ["Dear HOA Board Members, I am writing to formally dispute the citation issued on March 15th regarding alleged pet policy violations. My golden retriever, Biscuit, is a certified emotional support animal and therefore exempt from Section 4.2.1 of the community bylaws."],
+                    ],
+                    inputs=doc_input,
+                    label=""
+                )
+
+                with gr.Row():
+                    analyze_doc_btn = gr.Button("ANALYZE DOCUMENT", variant="primary")
+                    clear_doc_btn = gr.Button("CLEAR")
+
+                doc_status = gr.Textbox(label="SYSTEM STATUS", value=check_api_health(), interactive=False)
+
+                gr.HTML("""
+                    <div style="display: flex; align-items: center; gap: 12px; margin: 30px 0 20px 0;
+                                padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
+                                font-family: 'Courier Prime', monospace;">
+                        <span style="font-size: 14px; font-weight: bold;">II.</span>
+                        <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">PSYCHOLOGICAL SUBTEXT ANALYSIS</span>
+                    </div>
+                """)
+
+                doc_panels = {}
+                with gr.Tabs():
+                    for leader in LEADERS:
+                        with gr.Tab(leader['short_name'].upper()):
+                            doc_panels[leader['key']] = gr.HTML(value=placeholder("Paste a document above to begin analysis."))
+
+            # ===================== BATCH RUN TAB =====================
+            with gr.Tab("III. BATCH RUN"):
+
+                gr.HTML("""
+                    <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 20px;
+                                padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
+                                font-family: 'Courier Prime', monospace;">
+                        <span style="font-size: 14px; font-weight: bold;">I.</span>
+                        <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">SCENARIO LIBRARY</span>
+                    </div>
+                    <div style="font-size: 10px; color: #888; letter-spacing: 1px; margin-bottom: 12px;
+                                font-family: 'Courier Prime', monospace;">
+                        CSV WITH A "scenario" COLUMN (OPTIONAL "id"), OR JSONL OF {"id", "scenario"} RECORDS.
+                        RE-UPLOADING THE SAME FILE RESUMES AN INTERRUPTED RUN.
+                    </div>
+                """)
+
+                batch_file = gr.File(label="SCENARIO FILE (.csv / .jsonl)", file_types=[".csv", ".jsonl"], type="filepath")
+
+                with gr.Row():
+                    batch_concurrency = gr.Slider(1, BATCH_MAX_CONCURRENCY, value=min(2, BATCH_MAX_CONCURRENCY), step=1,
+                                                  label="Concurrent scenarios")
+                    batch_rate = gr.Number(value=0, label="Max scenarios per minute (0 = unlimited)", minimum=0)
+                    batch_bypass_cache = gr.Checkbox(label="Bypass cache", value=False)
+
+                with gr.Row():
+                    batch_btn = gr.Button("RUN BATCH", variant="primary")
+                    batch_stop_btn = gr.Button("STOP")
+
+                batch_status = gr.Textbox(label="BATCH STATUS", value=check_api_health(), interactive=False)
+                batch_output = gr.File(label="RESULTS (JSONL)", interactive=False)
+
+            # ===================== BELIEF SWEEP TAB =====================
+            with gr.Tab("IV. BELIEF SWEEP"):
+
+                gr.HTML("""
+                    <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 20px;
+                                padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
+                                font-family: 'Courier Prime', monospace;">
+                        <span style="font-size: 14px; font-weight: bold;">I.</span>
+                        <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">WHAT-IF GRID</span>
+                    </div>
+                    <div style="font-size: 10px; color: #888; letter-spacing: 1px; margin-bottom: 12px;
+                                font-family: 'Courier Prime', monospace;">
+                        ONE OR TWO BELIEFS, ONE PER LINE: "domestic_support: 0.3, 0.45, 0.6" OR
+                        "western_threat: 0.5..0.9/5" (FIVE EVENLY SPACED VALUES). EACH LEADER IS ONLY
+                        RE-RUN OVER THE BELIEFS IN ITS OWN PROFILE.
+                    </div>
+                """)
+
+                sweep_input = gr.Textbox(label="CRISIS SCENARIO", lines=3,
+                                         placeholder="Russia halts gas deliveries to Europe ahead of winter...")
+                sweep_grid = gr.Textbox(label="BELIEF GRID", lines=2,
+                                        placeholder="domestic_support: 0.3, 0.45, 0.6\nwestern_threat: 0.5..0.9/5")
+                sweep_budget = gr.Slider(1, SWEEP_MAX_CALLS, value=SWEEP_MAX_CALLS, step=1,
+                                         label="Max LLM calls (the sweep is refused if it needs more)")
+
+                with gr.Row():
+                    sweep_btn = gr.Button("RUN SWEEP", variant="primary")
+                    sweep_stop_btn = gr.Button("STOP")
+
+                sweep_status = gr.Textbox(label="SWEEP STATUS", value=check_api_health(), interactive=False)
+                sweep_report = gr.HTML(placeholder("Sensitivity table and heatmap appear here as variants report."))
+
+            # ===================== ESCALATION SIMULATION TAB =====================
+            with gr.Tab("V. ESCALATION SIMULATION"):
+
+                gr.HTML("""
+                    <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 20px;
+                                padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
+                                font-family: 'Courier Prime', monospace;">
+                        <span style="font-size: 14px; font-weight: bold;">I.</span>
+                        <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">MULTI-ROUND SCENARIO</span>
+                    </div>
+                    <div style="font-size: 10px; color: #888; letter-spacing: 1px; margin-bottom: 12px;
+                                font-family: 'Courier Prime', monospace;">
+                        EACH ROUND IS ONE SIMULATED DAY: EVERY LEADER REACTS TO THE OTHERS' LAST PUBLIC AND
+                        PRIVATE MOVES AND REPORTS ITS RUNG ON ITS OWN ESCALATION LADDER.
+                    </div>
+                """)
+
+                simulation_input = gr.Textbox(label="CRISIS SCENARIO", lines=3,
+                                              placeholder="Chinese naval forces begin encircling Taiwan...")
+                simulation_rounds = gr.Slider(1, SIMULATION_MAX_ROUNDS, value=min(3, SIMULATION_MAX_ROUNDS), step=1,
+                                              label="Rounds")
+
+                with gr.Row():
+                    simulation_btn = gr.Button("RUN SIMULATION", variant="primary")
+                    simulation_stop_btn = gr.Button("STOP")
+
+                simulation_status = gr.Textbox(label="SIMULATION STATUS", value=check_api_health(), interactive=False)
+
+                simulation_panels = {}
+                with gr.Tabs():
+                    for leader in LEADERS:
+                        with gr.Tab(leader['short_name'].upper()):
+                            simulation_panels[leader['key']] = gr.HTML(
+                                value=placeholder("Each round's dossier appears here as the leader reports."))
+
+                simulation_timeline = gr.HTML(placeholder("The escalation timeline fills in as each round completes."))
+
+        # Footer
+        gr.HTML("""
+            <div style="text-align: center; padding: 20px; border-top: 1px solid #ccc; margin-top: 40px;
+                        background: #faf7f0; font-family: 'Courier Prime', monospace;">
+                <p style="font-size: 9px; letter-spacing: 2px; color: #888;">
+                    UNAUTHORIZED DISCLOSURE SUBJECT TO ADMINISTRATIVE AND CRIMINAL SANCTIONS
+                    <br><br>
+                    AdversaryIQ v1.0 — Psychological profiles are simplified models for demonstration purposes only
                 </p>
             </div>
+        """)
+
+        # ===================== EVENT HANDLERS =====================
+
+        # Each event type gets its own concurrency group; a lightweight unqueued
+        # step reports the queue position in the status box before the heavy work starts.
+        # The analysis runs whenever admit hands out a new ticket
+        crisis_event = crisis_ticket.change(
+            fn=crisis_load.track(process_crisis_handler),
+            inputs=[crisis_ticket, crisis_input, response_state, bypass_cache_box, eager_voice_box],
+            outputs=[*crisis_panels.values(), crisis_summary, status_text, response_state],
+            concurrency_limit=crisis_load.limit,
+            concurrency_id=crisis_load.name
+        )
 
-            <div style="text-align: right; margin-right: 20px;">
-                <div style="margin-bottom: 8px;">
-                    <span style="display: block; font-size: 9px; color: #888; letter-spacing: 2px;">SYSTEM ID</span>
-                    <span style="font-size: 14px; font-weight: bold; letter-spacing: 2px;">AIQ-DEMO</span>
-                </div>
-                <div>
-                    <span style="display: block; font-size: 9px; color: #888; letter-spacing: 2px;">STATUS</span>
-                    <span style="font-size: 14px; font-weight: bold; letter-spacing: 2px; color: #006400;">OPERATIONAL</span>
-                </div>
-            </div>
-        </div>
-    """)
-
-    # Classification Banner
-    gr.HTML("""
-        <div style="background: #8b0000; padding: 10px; text-align: center; margin-bottom: 30px;">
-            <span style="color: #fff; font-size: 11px; font-weight: bold; letter-spacing: 6px;
-                         font-family: 'Courier Prime', monospace;">
-                FOR OFFICIAL USE ONLY — AUTHORIZED PERSONNEL ONLY
-            </span>
-        </div>
-    """)
-
-    # Main Tabs
-    with gr.Tabs():
-
-        # ===================== CRISIS ANALYSIS TAB =====================
-        with gr.Tab("I. CRISIS ANALYSIS"):
-
-            gr.HTML("""
-                <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 20px;
-                            padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
-                            font-family: 'Courier Prime', monospace;">
-                    <span style="font-size: 14px; font-weight: bold;">I.</span>
-                    <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">CRISIS SCENARIO INPUT</span>
-                </div>
-            """)
+        # A resubmit supersedes the analysis in progress: the cancel step completes before
+        # admit issues the new ticket, so only the old run is cancelled. Closing its
+        # generator aborts the backend request and the LLM calls behind it
+        analyze_btn.click(fn=None, inputs=None, outputs=None, cancels=[crisis_event]).then(
+            fn=crisis_load.admit,
+            inputs=[crisis_ticket],
+            outputs=[status_text, crisis_ticket],
+            queue=False
+        )
+
+        # Sub-millisecond local lookup, so it runs unqueued on every edit
+        crisis_input.change(
+            fn=similar_handler,
+            inputs=[crisis_input],
+            outputs=[similar_notice, load_similar_btn, similar_match],
+            queue=False,
+            show_progress="hidden"
+        )
+
+        # Queued, so its generator streams and can itself be cancelled
+        load_similar_btn.click(fn=None, inputs=None, outputs=None, cancels=[crisis_event]).then(
+            fn=load_similar_handler,
+            inputs=[similar_match, eager_voice_box],
+            outputs=[*crisis_panels.values(), crisis_summary, status_text, response_state]
+        )
 
-            crisis_input = gr.Textbox(
-                label="",
-                placeholder="Enter diplomatic crisis scenario for multi-agent psychological analysis...",
-                lines=5,
-                elem_classes=["dossier-textarea"]
+        # Per-dossier re-run: one LLM call, patched into response_state; it shares the crisis slots
+        rerun_events = [
+            rerun_btn.click(
+                fn=crisis_load.admit,
+                inputs=[rerun_tickets[key]],
+                outputs=[status_text, rerun_tickets[key]],
+                queue=False
+            ).then(
+                fn=crisis_load.track(rerun_handler(key)),
+                inputs=[rerun_tickets[key], response_state],
+                outputs=[crisis_panels[key], crisis_summary, status_text, response_state],
+                concurrency_limit=crisis_load.limit,
+                concurrency_id=crisis_load.name
             )
+            for key, rerun_btn in rerun_buttons.items()
+        ]
+
+        clear_btn.click(
+            fn=lambda: ("",
+                        *(placeholder("Enter a crisis scenario above to begin analysis.")
+                          for _ in crisis_panels),
+                        placeholder("Submit a crisis scenario to generate executive intelligence summary."),
+                        check_api_health(),
+                        {},
+                        *(None for _ in audio_players)),
+            inputs=[],
+            outputs=[crisis_input, *crisis_panels.values(), crisis_summary, status_text, response_state, *audio_players.values()],
+            cancels=[crisis_event, *rerun_events]
+        )
 
-            gr.HTML("""
-                <div style="font-size: 10px; color: #888; letter-spacing: 1px; margin: 8px 0 12px 0;
-                            font-family: 'Courier Prime', monospace;">
-                    EXAMPLE SCENARIOS (click to load):
-                </div>
-            """)
-
-            gr.Examples(
-                examples=[
-                    ["North Korea establishes a new forward military base just 12 kilometers from the South Korean border, deploying artillery systems capable of striking Seoul within minutes."],
-                    ["Chinese naval forces begin encircling Taiwan with a maritime blockade, intercepting commercial shipping and declaring a 'special military exercise zone' around the island."],
-                    ["Your neighbor's golden retriever has been spotted relieving itself in the HOA president's award-winning rose garden, and security camera footage has gone viral on the community Facebook group."],
-                ],
-                inputs=crisis_input,
-                label=""
+        # Voice synthesis handlers; no status box to report a queue position in, so not admitted
+        for key, voice_btn in voice_buttons.items():
+            voice_btn.click(
+                fn=voice_handler(key),
+                inputs=[response_state],
+                outputs=[audio_players[key]],
+                concurrency_limit=voice_load.limit,
+                concurrency_id=voice_load.name
             )
 
-            with gr.Row():
-                analyze_btn = gr.Button("PROCESS INTELLIGENCE", variant="primary")
-                clear_btn = gr.Button("CLEAR FORM")
-
-            status_text = gr.Textbox(label="SYSTEM STATUS", value=check_api_health(), interactive=False)
-
-            # Section II: Agent Analysis
-            gr.HTML("""
-                <div style="display: flex; align-items: center; gap: 12px; margin: 30px 0 20px 0;
-                            padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
-                            font-family: 'Courier Prime', monospace;">
-                    <span style="font-size: 14px; font-weight: bold;">II.</span>
-                    <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">AGENT ANALYSIS</span>
-                    <span style="margin-left: auto; padding: 3px 10px; border: 2px solid #8b0000;
-                                 color: #8b0000; font-size: 9px; font-weight: bold; letter-spacing: 2px;
-                                 transform: rotate(-2deg);">CONFIDENTIAL</span>
-                </div>
-            """)
-
-            with gr.Tabs():
-                with gr.Tab("ROOSEVELT"):
-                    crisis_roosevelt = gr.HTML(value="<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Enter a crisis scenario above to begin analysis.</div>")
-                    with gr.Row():
-                        voice_roosevelt_btn = gr.Button("🔊 GENERATE VOICE", size="sm", elem_classes=["voice-btn"])
-                    audio_roosevelt = gr.Audio(label="Voice Synthesis", visible=True, interactive=False)
-
-                with gr.Tab("GANDHI"):
-                    crisis_gandhi = gr.HTML(value="<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Enter a crisis scenario above to begin analysis.</div>")
-                    with gr.Row():
-                        voice_gandhi_btn = gr.Button("🔊 GENERATE VOICE", size="sm", elem_classes=["voice-btn"])
-                    audio_gandhi = gr.Audio(label="Voice Synthesis", visible=True, interactive=False)
-
-                with gr.Tab("PUTIN"):
-                    crisis_putin = gr.HTML(value="<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Enter a crisis scenario above to begin analysis.</div>")
-                    with gr.Row():
-                        voice_putin_btn = gr.Button("🔊 GENERATE VOICE", size="sm", elem_classes=["voice-btn"])
-                    audio_putin = gr.Audio(label="Voice Synthesis", visible=True, interactive=False)
-
-            # Section III: Executive Summary
-            gr.HTML("""
-                <div style="display: flex; align-items: center; gap: 12px; margin: 30px 0 20px 0;
-                            padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
-                            font-family: 'Courier Prime', monospace;">
-                    <span style="font-size: 14px; font-weight: bold;">III.</span>
-                    <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">EXECUTIVE SUMMARY</span>
-                </div>
-            """)
+        document_event = document_ticket.change(
+            fn=document_load.track(analyze_document),
+            inputs=[document_ticket, doc_input, doc_file],
+            outputs=[*doc_panels.values(), doc_status],
+            concurrency_limit=document_load.limit,
+            concurrency_id=document_load.name
+        )
+        analyze_doc_btn.click(fn=None, inputs=None, outputs=None, cancels=[document_event]).then(
+            fn=document_load.admit,
+            inputs=[document_ticket],
+            outputs=[doc_status, document_ticket],
+            queue=False
+        )
 
-            crisis_summary = gr.HTML(value="<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Submit a crisis scenario to generate executive intelligence summary.</div>")
+        batch_event = batch_btn.click(
+            fn=batch_load.admit,
+            inputs=[batch_ticket],
+            outputs=[batch_status, batch_ticket],
+            queue=False
+        ).then(
+            fn=batch_load.track(run_batch_file),
+            inputs=[batch_ticket, batch_file, batch_concurrency, batch_rate, batch_bypass_cache],
+            outputs=[batch_status, batch_output],
+            concurrency_limit=batch_load.limit,
+            concurrency_id=batch_load.name
+        )
 
-        # ===================== DOCUMENT ANALYSIS TAB =====================
-        with gr.Tab("II. DOCUMENT ANALYSIS"):
+        # Finished scenarios are already on disk; the next run picks up from there
+        batch_stop_btn.click(fn=None, inputs=None, outputs=None, cancels=[batch_event])
+
+        sweep_event = sweep_btn.click(
+            fn=sweep_load.admit,
+            inputs=[sweep_ticket],
+            outputs=[sweep_status, sweep_ticket],
+            queue=False
+        ).then(
+            fn=sweep_load.track(run_sweep),
+            inputs=[sweep_ticket, sweep_input, sweep_grid, sweep_budget],
+            outputs=[sweep_report, sweep_status],
+            concurrency_limit=sweep_load.limit,
+            concurrency_id=sweep_load.name
+        )
+        # Stopping disconnects from the API, so the remaining agent calls are never made
+        sweep_stop_btn.click(fn=None, inputs=None, outputs=None, cancels=[sweep_event])
+
+        simulation_event = simulation_btn.click(
+            fn=simulation_load.admit,
+            inputs=[simulation_ticket],
+            outputs=[simulation_status, simulation_ticket],
+            queue=False
+        ).then(
+            fn=simulation_load.track(simulate_crisis),
+            inputs=[simulation_ticket, simulation_input, simulation_rounds],
+            outputs=[*simulation_panels.values(), simulation_timeline, simulation_status],
+            concurrency_limit=simulation_load.limit,
+            concurrency_id=simulation_load.name
+        )
+        simulation_stop_btn.click(fn=None, inputs=None, outputs=None, cancels=[simulation_event])
 
-            gr.HTML("""
-                <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 20px;
-                            padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
-                            font-family: 'Courier Prime', monospace;">
-                    <span style="font-size: 14px; font-weight: bold;">I.</span>
-                    <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">DOCUMENT SUBMISSION</span>
-                </div>
-            """)
+        doc_file.upload(
+            fn=format_document_preview,
+            inputs=[doc_file],
+            outputs=[doc_status]
+        )
 
-            doc_input = gr.Textbox(
-                label="",
-                placeholder="Paste diplomatic document, treaty, communique, or proposal text for psychological subtext analysis...",
-                lines=8
-            )
+        clear_doc_btn.click(
+            fn=lambda: ("",
+                        *(placeholder("Paste a document above to begin analysis.")
+                          for _ in doc_panels),
+                        check_api_health(),
+                        None),
+            inputs=[],
+            outputs=[doc_input, *doc_panels.values(), doc_status, doc_file],
+            cancels=[document_event]
+        )
 
-            gr.HTML("""
-                <div style="font-size: 10px; color: #888; letter-spacing: 1px; margin: 8px 0 12px 0;
-                            font-family: 'Courier Prime', monospace;">
-                    EXAMPLE DOCUMENTS (click to load):
-                </div>
-            """)
-
-            gr.Examples(
-                examples=[
-                    ["We remain fully committed to peaceful dialogue and diplomatic resolution of all outstanding issues. However, we must be clear that our nation reserves every right and option to defend our sovereignty and protect our citizens from external threats. We call upon all parties to exercise restraint."],
-                    ["The Ministry of Foreign Affairs wishes to express its deep concern regarding recent developments in the region. While we value our longstanding partnership and shared interests, we cannot remain silent when fundamental principles of international law are being challenged."],
-                    ["Dear HOA Board Members, I am writing to formally dispute the citation issued on March 15th regarding alleged pet policy violations. My golden retriever, Biscuit, is a certified emotional support animal and therefore exempt from Section 4.2.1 of the community bylaws."],
-                ],
-                inputs=doc_input,
-                label=""
-            )
+    # Bounded queue: submissions beyond QUEUE_MAX_SIZE are rejected immediately
+    # instead of waiting out a backend timeout
+    app.queue(max_size=QUEUE_MAX_SIZE, default_concurrency_limit=1)
 
-            with gr.Row():
-                analyze_doc_btn = gr.Button("ANALYZE DOCUMENT", variant="primary")
-                clear_doc_btn = gr.Button("CLEAR")
+    return app
 
-            doc_status = gr.Textbox(label="SYSTEM STATUS", value=check_api_health(), interactive=False)
 
-            gr.HTML("""
-                <div style="display: flex; align-items: center; gap: 12px; margin: 30px 0 20px 0;
-                            padding-bottom: 10px; border-bottom: 1px solid #1a1a1a;
-                            font-family: 'Courier Prime', monospace;">
-                    <span style="font-size: 14px; font-weight: bold;">II.</span>
-                    <span style="font-size: 13px; font-weight: bold; letter-spacing: 3px;">PSYCHOLOGICAL SUBTEXT ANALYSIS</span>
-                </div>
-            """)
-
-            with gr.Tabs():
-                with gr.Tab("ROOSEVELT"):
-                    doc_roosevelt = gr.HTML(value="<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Paste a document above to begin analysis.</div>")
-                with gr.Tab("GANDHI"):
-                    doc_gandhi = gr.HTML(value="<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Paste a document above to begin analysis.</div>")
-                with gr.Tab("PUTIN"):
-                    doc_putin = gr.HTML(value="<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Paste a document above to begin analysis.</div>")
-
-    # Footer
-    gr.HTML("""
-        <div style="text-align: center; padding: 20px; border-top: 1px solid #ccc; margin-top: 40px;
-                    background: #faf7f0; font-family: 'Courier Prime', monospace;">
-            <p style="font-size: 9px; letter-spacing: 2px; color: #888;">
-                UNAUTHORIZED DISCLOSURE SUBJECT TO ADMINISTRATIVE AND CRIMINAL SANCTIONS
-                <br><br>
-                AdversaryIQ v1.0 — Psychological profiles are simplified models for demonstration purposes only
-            </p>
-        </div>
-    """)
-
-    # ===================== EVENT HANDLERS =====================
-
-    analyze_btn.click(
-        fn=process_crisis,
-        inputs=[crisis_input, response_state],
-        outputs=[crisis_roosevelt, crisis_gandhi, crisis_putin, crisis_summary, status_text, response_state]
-    )
-
-    clear_btn.click(
-        fn=lambda: ("",
-                    "<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Enter a crisis scenario above to begin analysis.</div>",
-                    "<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Enter a crisis scenario above to begin analysis.</div>",
-                    "<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Enter a crisis scenario above to begin analysis.</div>",
-                    "<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Submit a crisis scenario to generate executive intelligence summary.</div>",
-                    check_api_health(),
-                    {},
-                    None, None, None),
-        inputs=[],
-        outputs=[crisis_input, crisis_roosevelt, crisis_gandhi, crisis_putin, crisis_summary, status_text, response_state, audio_roosevelt, audio_gandhi, audio_putin]
-    )
-
-    # Voice synthesis handlers
-    voice_roosevelt_btn.click(
-        fn=lambda state: synthesize_voice("roosevelt", state),
-        inputs=[response_state],
-        outputs=[audio_roosevelt]
-    )
-
-    voice_gandhi_btn.click(
-        fn=lambda state: synthesize_voice("gandhi", state),
-        inputs=[response_state],
-        outputs=[audio_gandhi]
-    )
-
-    voice_putin_btn.click(
-        fn=lambda state: synthesize_voice("putin", state),
-        inputs=[response_state],
-        outputs=[audio_putin]
-    )
-
-    analyze_doc_btn.click(
-        fn=analyze_document,
-        inputs=[doc_input],
-        outputs=[doc_roosevelt, doc_gandhi, doc_putin, doc_status]
-    )
-
-    clear_doc_btn.click(
-        fn=lambda: ("",
-                    "<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Paste a document above to begin analysis.</div>",
-                    "<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Paste a document above to begin analysis.</div>",
-                    "<div style='padding: 40px; text-align: center; color: #888; font-style: italic;'>Paste a document above to begin analysis.</div>",
-                    check_api_health()),
-        inputs=[],
-        outputs=[doc_input, doc_roosevelt, doc_gandhi, doc_putin, doc_status]
-    )
+_app = None
+
+
+def __getattr__(name):
+    # `app` is built lazily so importing this module stays cheap
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = build_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    app.launch(server_name="0.0.0.0", server_port=7860, share=False)
+    build_app().launch(server_name="0.0.0.0", server_port=7860, share=False, allowed_paths=[CACHE_DIR])
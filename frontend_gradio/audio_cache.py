@@ -0,0 +1,120 @@
+"""
+AdversaryIQ - Voice Audio Store
+
+Content-addressed on-disk store for synthesized MP3s. Files are keyed
+by hash(agent, voice id, model, text), shared across sessions, and the
+least recently played are evicted once the directory exceeds its size
+budget.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from leaders import LEADERS, leader_info
+from result_cache import CACHE_DIR
+
+VOICE_CACHE_MAX_MB = float(os.environ.get("VOICE_CACHE_MAX_MB", "256"))
+
+# Must match the voice selection in backend/server.js (voice IDs come from the leader registry)
+VOICE_MODEL = "eleven_multilingual_v2"
+
+
+def voice_cache_key(agent: str, text: str) -> str:
+    voice_id = leader_info(agent)["voice_id"] or (LEADERS[0]["voice_id"] if LEADERS else "") or ""
+    payload = "\n".join([agent, voice_id, VOICE_MODEL, text])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioStore:
+    """Directory of `<key>.mp3` files with LRU eviction by total size."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of a stored clip (marking it recently used), or None."""
+        path = self.path_for(key)
+        try:
+            # mtime doubles as the LRU clock; atime is unreliable on most mounts
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key: str, audio: bytes) -> str:
+        """Atomically store a clip and return its path."""
+        with self.writing(key) as f:
+            f.write(audio)
+        return self.path_for(key)
+
+    @contextmanager
+    def writing(self, key: str):
+        """Write a clip incrementally; it only becomes visible once the block completes."""
+        path = self.path_for(key)
+        # A unique partial per writer: Gradio can step two generators for one clip on the same thread
+        fd, partial = tempfile.mkstemp(dir=self.directory, prefix=f"{key}.", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+            os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+        with self._lock:
+            self._evict(keep=path)
+
+    def _evict(self, keep: str):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".mp3"):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        files = [e for e in os.scandir(self.directory) if e.name.endswith(".mp3")]
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "entries": len(files),
+            "bytes": sum(e.stat().st_size for e in files),
+        }
+
+
+audio_store = AudioStore(
+    os.path.join(CACHE_DIR, "voice"),
+    max_bytes=int(VOICE_CACHE_MAX_MB * 1024 * 1024)
+)
@@ -0,0 +1,213 @@
+"""
+AdversaryIQ - Backend API Client
+
+Shared, pooled HTTP client for every frontend → Node API call.
+Keeps connections alive between clicks instead of opening a new
+TCP/TLS connection per request. `requests` is imported when the first
+call opens the session, so importing the client stays cheap.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+from typing import TYPE_CHECKING
+
+from resilience import Upstream
+from telemetry import TRACE_HEADER
+
+if TYPE_CHECKING:
+    import requests
+
+# Connection pool size shared by all Gradio workers in this process
+POOL_SIZE = int(os.environ.get("API_POOL_SIZE", "32"))
+
+# Per-endpoint (connect, read) timeouts in seconds
+CONNECT_TIMEOUT = float(os.environ.get("API_CONNECT_TIMEOUT", "3.05"))
+TIMEOUTS = {
+    "process-crisis": float(os.environ.get("API_TIMEOUT_CRISIS", "120")),
+    "analyze-document": float(os.environ.get("API_TIMEOUT_DOCUMENT", "120")),
+    "synthesize-voice": float(os.environ.get("API_TIMEOUT_VOICE", "60")),
+    "health": float(os.environ.get("API_TIMEOUT_HEALTH", "5")),
+}
+
+
+def endpoint_timeout(endpoint: str) -> tuple:
+    """(connect, read) timeout tuple for an endpoint."""
+    return (CONNECT_TIMEOUT, TIMEOUTS[endpoint])
+
+
+def abort_stream(response: requests.Response):
+    """Abort a streaming response from another thread.
+
+    Closing the response does not wake a reader blocked on the socket, so the
+    connection is shut down instead: the reader fails at once and the Node API
+    sees the client disconnect (and aborts the LLM calls behind it).
+    """
+    sock = getattr(getattr(response.raw, "connection", None), "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class BackendError(RuntimeError):
+    """Non-200 answer from the Node API."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"API Error: {status_code}")
+        self.status_code = status_code
+
+
+class BackendClient:
+    """Keep-alive client for the AdversaryIQ Node API."""
+
+    def __init__(self, base_url: str, pool_size: int = POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+
+        # Breaker + retry budget for the backend hop
+        self.upstream = Upstream("backend")
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled session, created on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    session.headers.update({"Content-Type": "application/json"})
+
+                    # pool_block keeps the number of sockets bounded under load
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def _post(self, path: str, endpoint: str, retry: bool = True, trace_id: str = None, **kwargs) -> requests.Response:
+        if trace_id:
+            kwargs["headers"] = {TRACE_HEADER: trace_id}
+        send = lambda: self.session.post(self._url(path), timeout=endpoint_timeout(endpoint), **kwargs)
+        if not retry:
+            # One-shot bodies (generators) cannot be replayed
+            return self.upstream.call_once(send)
+        return self.upstream.call(send)
+
+    def process_crisis(self, crisis: str, trace_id: str = None) -> requests.Response:
+        """POST /api/process-crisis (single JSON response)."""
+        return self._post("/api/process-crisis", "process-crisis", trace_id=trace_id, json={"crisis": crisis})
+
+    def stream_crisis(self, crisis: str, trace_id: str = None) -> requests.Response:
+        """POST /api/process-crisis/stream; use as a context manager and iterate lines."""
+        return self._post("/api/process-crisis/stream", "process-crisis", trace_id=trace_id,
+                          json={"crisis": crisis}, stream=True)
+
+    @staticmethod
+    def _iter_events(request: requests.Response, on_cancel=None):
+        """Parsed NDJSON events from a streaming response.
+
+        on_cancel(callback), e.g. Flight.on_cancel, registers the abort for this stream.
+        Raises BackendError on a non-200 answer and RuntimeError on an error event.
+        """
+        with request as response:
+            if on_cancel is not None:
+                on_cancel(lambda: abort_stream(response))
+            if response.status_code != 200:
+                raise BackendError(response.status_code)
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event.get('type') == 'error':
+                    raise RuntimeError(event.get('details') or event.get('error'))
+                yield event
+
+    def iter_crisis_events(self, crisis: str, trace_id: str = None, on_cancel=None):
+        """Events from stream_crisis: agent dossiers, then timing, assessment last."""
+        yield from self._iter_events(self.stream_crisis(crisis, trace_id), on_cancel)
+
+    def stream_sweep(self, crisis: str, grid: dict, budget: int = None, trace_id: str = None) -> requests.Response:
+        """POST /api/process-crisis/sweep; use as a context manager and iterate lines."""
+        return self._post("/api/process-crisis/sweep", "process-crisis", trace_id=trace_id,
+                          json={"crisis": crisis, "grid": grid, "budget": budget}, stream=True)
+
+    def iter_sweep_events(self, crisis: str, grid: dict, budget: int = None, trace_id: str = None, on_cancel=None):
+        """Events from stream_sweep: plan, then variant and progress per agent call, timing, sweep last."""
+        yield from self._iter_events(self.stream_sweep(crisis, grid, budget, trace_id), on_cancel)
+
+    def stream_simulation(self, crisis: str, rounds: int, trace_id: str = None) -> requests.Response:
+        """POST /api/process-crisis/simulate; use as a context manager and iterate lines."""
+        return self._post("/api/process-crisis/simulate", "process-crisis", trace_id=trace_id,
+                          json={"crisis": crisis, "rounds": rounds}, stream=True)
+
+    def iter_simulation_events(self, crisis: str, rounds: int, trace_id: str = None, on_cancel=None):
+        """Events from stream_simulation: per round a round event, agent events and round_complete,
+        then timing, simulation last."""
+        yield from self._iter_events(self.stream_simulation(crisis, rounds, trace_id), on_cancel)
+
+    def rerun_agent(self, crisis: str, agent: str, agents: dict, trace_id: str = None) -> requests.Response:
+        """POST /api/process-crisis/agent; returns the rebuilt assessment."""
+        return self._post("/api/process-crisis/agent", "process-crisis", trace_id=trace_id,
+                          json={"crisis": crisis, "agent": agent, "agents": agents})
+
+    def analyze_document(self, document_text: str, filename: str = "document.txt",
+                         trace_id: str = None) -> requests.Response:
+        """POST /api/analyze-document."""
+        return self._post("/api/analyze-document", "analyze-document", trace_id=trace_id,
+                          json={"documentText": document_text, "filename": filename})
+
+    def stream_document(self, document_text: str, filename: str = "document.txt",
+                        trace_id: str = None) -> requests.Response:
+        """POST /api/analyze-document/stream; use as a context manager and iterate lines."""
+        return self._post("/api/analyze-document/stream", "analyze-document", trace_id=trace_id,
+                          json={"documentText": document_text, "filename": filename}, stream=True)
+
+    def stream_document_body(self, body_chunks, trace_id: str = None) -> requests.Response:
+        """Like stream_document, but uploads a pre-encoded JSON body with chunked transfer."""
+        return self._post("/api/analyze-document/stream", "analyze-document", retry=False, trace_id=trace_id,
+                          data=body_chunks, stream=True)
+
+    def iter_document_events(self, document_text: str = None, body_chunks=None, trace_id: str = None,
+                             on_cancel=None):
+        """Events from stream_document (or stream_document_body when body_chunks is given):
+        progress and agent events, then timing, analysis last."""
+        if body_chunks is not None:
+            request = self.stream_document_body(body_chunks, trace_id)
+        else:
+            request = self.stream_document(document_text, trace_id=trace_id)
+        yield from self._iter_events(request, on_cancel)
+
+    def synthesize_voice(self, text: str, agent: str, trace_id: str = None) -> requests.Response:
+        """POST /api/synthesize-voice (audio/mpeg body)."""
+        return self._post("/api/synthesize-voice", "synthesize-voice", trace_id=trace_id,
+                          json={"text": text, "agent": agent})
+
+    def stream_voice(self, text: str, agent: str, trace_id: str = None) -> requests.Response:
+        """POST /api/synthesize-voice; use as a context manager and iterate chunks."""
+        return self._post("/api/synthesize-voice", "synthesize-voice", trace_id=trace_id,
+                          json={"text": text, "agent": agent}, stream=True)
+
+    def leaders(self) -> requests.Response:
+        """GET /api/leaders; display metadata for every registered leader."""
+        return self.session.get(self._url("/api/leaders"), timeout=endpoint_timeout("health"))
+
+    def health(self) -> requests.Response:
+        """GET /api/health (bypasses the breaker so it can detect recovery)."""
+        return self.session.get(self._url("/api/health"), timeout=endpoint_timeout("health"))
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
@@ -0,0 +1,311 @@
+"""
+AdversaryIQ - Batch Scenario Runner
+
+Runs a library of crisis scenarios (CSV or JSONL) through the same
+streaming crisis path and result cache as the PROCESS INTELLIGENCE
+button. Scenarios run with a concurrency limit and an optional rate
+limit; every finished assessment is appended to an output JSONL as it
+completes. That file is the checkpoint: rerunning with the same output
+skips scenarios already recorded as "ok" and retries the rest.
+With --min-risk, the local provisional estimate (risk_estimate.py) is
+computed for the whole library first, and only scenarios estimated at or
+above that level are sent to the LLM agents.
+
+    python batch_runner.py scenarios.csv -o results.jsonl --concurrency 4 --rate 30
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from profiles import profile_version
+from result_cache import crisis_cache, crisis_cache_key, is_cacheable_assessment, normalize_text
+from risk_estimate import RISK_LEVELS, estimate_many
+from scenario_index import scenario_index
+
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "8"))
+
+# Consecutive failures (e.g. backend down) before a run stops; rerun to resume
+BATCH_MAX_CONSECUTIVE_ERRORS = int(os.environ.get("BATCH_MAX_CONSECUTIVE_ERRORS", "10"))
+
+# Column / key names accepted for the scenario text, in order of preference
+SCENARIO_FIELDS = ("scenario", "crisis", "text")
+
+
+def scenario_id(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()[:16]
+
+
+def _scenario_from_record(record) -> tuple:
+    if isinstance(record, str):
+        return scenario_id(record), record
+    text = next((record[field] for field in SCENARIO_FIELDS if record.get(field)), "")
+    return str(record.get("id") or scenario_id(text)), text
+
+
+def load_scenarios(path: str) -> list:
+    """[(id, scenario)] from a CSV (scenario/crisis/text column, optional id) or JSONL file.
+
+    Blank scenarios are dropped and repeated ids keep their first occurrence.
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith(".csv"):
+            records = list(csv.DictReader(f))
+        else:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    scenarios, seen = [], set()
+    for record in records:
+        sid, text = _scenario_from_record(record)
+        if text.strip() and sid not in seen:
+            seen.add(sid)
+            scenarios.append((sid, text.strip()))
+    return scenarios
+
+
+def load_checkpoint(output_path: str) -> dict:
+    """Latest status per scenario id in an existing output file.
+
+    A torn final line (the run was killed mid-write) is truncated away so
+    new records start on a clean line.
+    """
+    if not os.path.exists(output_path):
+        return {}
+
+    statuses = {}
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            f.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            statuses[record.get("id")] = record.get("status")
+    return statuses
+
+
+class RateLimiter:
+    """Spaces call starts at least 60/rate_per_min seconds apart (0 disables)."""
+
+    def __init__(self, rate_per_min: float):
+        self.interval = 60.0 / rate_per_min if rate_per_min > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, stop: threading.Event = None):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        delay = start - time.monotonic()
+        if delay > 0:
+            if stop is not None:
+                stop.wait(delay)
+            else:
+                time.sleep(delay)
+
+
+class BatchProgress:
+    """Counters for one batch run."""
+
+    def __init__(self, total: int, skipped: int):
+        self.total = total
+        self.skipped = skipped
+        self.ok = 0
+        self.partial = 0
+        self.errors = 0
+        self.cached = 0
+        self.triaged = 0
+        self.started = time.monotonic()
+        self.stopped_reason = ""
+
+    @property
+    def done(self) -> int:
+        return self.ok + self.partial + self.errors
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.skipped - self.triaged - self.done
+
+    @property
+    def throughput_per_min(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return 60.0 * self.done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """Share of finished scenarios with a failed request or at least one failed agent."""
+        return (self.errors + self.partial) / self.done if self.done else 0.0
+
+    def summary(self) -> str:
+        triaged = f", {self.triaged} below min risk" if self.triaged else ""
+        line = (f"{self.done + self.skipped} of {self.total} scenarios"
+                f" ({self.skipped} resumed, {self.cached} cached{triaged})"
+                f" | {self.throughput_per_min:.1f}/min | error rate {self.error_rate:.0%}")
+        return f"{line} | stopped: {self.stopped_reason}" if self.stopped_reason else line
+
+
+def analyze_scenario(client, scenario: str, bypass_cache: bool = False) -> tuple:
+    """(assessment, from_cache) via the cache and the streaming crisis endpoint."""
+    cache_key = crisis_cache_key(scenario)
+    if not bypass_cache:
+        cached = crisis_cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+
+    data = None
+    for event in client.iter_crisis_events(scenario):
+        if event.get('type') == 'assessment':
+            data = event
+    if data is None:
+        raise RuntimeError("Stream ended before the assessment was received")
+
+    if is_cacheable_assessment(data):
+        crisis_cache.put(cache_key, data)
+        scenario_index.add(cache_key, scenario, profile_version())
+    return data, False
+
+
+def triage(jobs: list, min_risk: str) -> list:
+    """The (id, text) jobs whose provisional overall risk is at least min_risk (all of them without profiles)."""
+    estimates = estimate_many([text for _, text in jobs])
+    if not estimates:
+        return jobs
+    floor = RISK_LEVELS.index(min_risk)
+    return [job for job, estimate in zip(jobs, estimates) if RISK_LEVELS.index(estimate["overall_risk"]) >= floor]
+
+
+def iter_batch(client, input_path: str, output_path: str, concurrency: int = 2,
+               rate_per_min: float = 0, bypass_cache: bool = False, stop: threading.Event = None,
+               min_risk: str = None):
+    """Run every pending scenario, yielding the BatchProgress after each one finishes.
+
+    min_risk ("Low", "Medium" or "High") skips scenarios the local estimate puts below it.
+    """
+    concurrency = max(1, min(concurrency, BATCH_MAX_CONCURRENCY))
+    stop = stop or threading.Event()
+    scenarios = load_scenarios(input_path)
+    finished = {sid for sid, status in load_checkpoint(output_path).items() if status == "ok"}
+    jobs = [(sid, text) for sid, text in scenarios if sid not in finished]
+    progress = BatchProgress(len(scenarios), len(scenarios) - len(jobs))
+    if min_risk:
+        kept = triage(jobs, min_risk)
+        progress.triaged = len(jobs) - len(kept)
+        jobs = kept
+    pending = iter(jobs)
+    limiter = RateLimiter(rate_per_min)
+    consecutive_errors = 0
+
+    def run_one(sid: str, text: str) -> dict:
+        limiter.wait(stop)
+        if stop.is_set():
+            return None
+        started = time.monotonic()
+        record = {"id": sid, "scenario": text}
+        try:
+            data, from_cache = analyze_scenario(client, text, bypass_cache)
+            record["status"] = "ok" if is_cacheable_assessment(data) else "partial"
+            record["cached"] = from_cache
+            record["assessment"] = data
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["elapsed_s"] = round(time.monotonic() - started, 3)
+        return record
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(concurrency) as pool:
+        # Keep at most `concurrency` scenarios in flight so huge libraries stay cheap to hold
+        in_flight = set()
+        while True:
+            while not stop.is_set() and len(in_flight) < concurrency:
+                job = next(pending, None)
+                if job is None:
+                    break
+                in_flight.add(pool.submit(run_one, *job))
+            if not in_flight:
+                break
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = future.result()
+                if record is None:
+                    continue
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+
+                if record["status"] == "error":
+                    progress.errors += 1
+                    consecutive_errors += 1
+                else:
+                    progress.ok += record["status"] == "ok"
+                    progress.partial += record["status"] == "partial"
+                    progress.cached += record["cached"]
+                    consecutive_errors = 0
+
+                if consecutive_errors >= BATCH_MAX_CONSECUTIVE_ERRORS and not stop.is_set():
+                    progress.stopped_reason = f"{consecutive_errors} consecutive errors ({record['error']})"
+                    stop.set()
+                yield progress
+
+    if stop.is_set() and not progress.stopped_reason and progress.remaining:
+        progress.stopped_reason = "cancelled"
+    yield progress
+
+
+def run_batch(client, input_path: str, output_path: str, **options) -> BatchProgress:
+    """Blocking iter_batch(); returns the final progress."""
+    progress = None
+    for progress in iter_batch(client, input_path, output_path, **options):
+        pass
+    return progress
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a file of crisis scenarios through AdversaryIQ.")
+    parser.add_argument("input", help="CSV (scenario/crisis/text column, optional id) or JSONL file")
+    parser.add_argument("-o", "--output", help="Results JSONL, also the resume checkpoint (default: <input>.results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=2, help=f"Scenarios in flight (max {BATCH_MAX_CONCURRENCY})")
+    parser.add_argument("--rate", type=float, default=0, help="Max scenarios started per minute (0 = unlimited)")
+    parser.add_argument("--bypass-cache", action="store_true", help="Ignore cached assessments")
+    parser.add_argument("--min-risk", choices=RISK_LEVELS,
+                        help="Only run scenarios whose local provisional risk estimate is at least this level")
+    parser.add_argument("--api-url", default=os.environ.get("API_URL", "http://localhost:3001"))
+    args = parser.parse_args(argv)
+
+    from backend_client import BackendClient
+
+    output = args.output or os.path.splitext(args.input)[0] + ".results.jsonl"
+    client = BackendClient(args.api_url)
+    stop = threading.Event()
+    progress = None
+    try:
+        for progress in iter_batch(client, args.input, output, concurrency=args.concurrency,
+                                   rate_per_min=args.rate, bypass_cache=args.bypass_cache, stop=stop,
+                                   min_risk=args.min_risk):
+            print(progress.summary(), flush=True)
+    except KeyboardInterrupt:
+        # Finished records are already on disk; rerun the same command to resume
+        stop.set()
+        print("Interrupted; rerun to resume.")
+        return 130
+    finally:
+        client.close()
+
+    print(f"Results: {output}")
+    return 1 if progress and progress.stopped_reason else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
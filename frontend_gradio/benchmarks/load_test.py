@@ -0,0 +1,266 @@
+"""
+AdversaryIQ - Load Test
+
+Drives the real event handlers (handlers.process_crisis, analyze_document,
+synthesize_voice and the health probe) with N concurrent simulated users
+against benchmarks/mock_backend.py, so it runs offline and costs nothing.
+Reports p50/p95/p99 latency and throughput per operation plus the
+process's peak RSS. Save a run as a baseline and compare later runs to it
+to catch regressions (exit code 1):
+
+    python benchmarks/load_test.py --users 16 --duration 20 --save baseline.json
+    python benchmarks/load_test.py --users 16 --duration 20 --compare baseline.json
+
+The mock runs in its own process so its CPU and memory are not counted.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+FRONTEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MOCK_BACKEND = os.path.join(FRONTEND_DIR, "benchmarks", "mock_backend.py")
+sys.path.insert(0, FRONTEND_DIR)
+
+# Share of user actions per operation
+DEFAULT_MIX = "crisis=4,document=2,voice=3,health=1"
+
+# Error rate may rise this many points over the baseline before it counts as a regression
+ERROR_RATE_SLACK = 0.05
+
+SCENARIO = ("Naval standoff #{n}: a carrier group enters disputed waters after a fishing vessel is seized; "
+            "allied governments demand restraint while state media calls for retaliation.")
+DOCUMENT = ("Communique #{n}. " + "We reaffirm our commitment to regional stability and expect reciprocal "
+            "restraint from all parties, failing which we reserve every option. " * 20)
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, round(pct / 100 * len(samples) + 0.5) - 1))
+    return samples[rank]
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return 0.0
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def start_mock(args) -> tuple:
+    """(process, base URL) for a mock backend on a free port."""
+    process = subprocess.Popen(
+        [sys.executable, MOCK_BACKEND, "--port", "0", "--latency-ms", str(args.latency_ms),
+         "--latency-sigma", str(args.latency_sigma), "--error-rate", str(args.error_rate),
+         "--text-chars", str(args.text_chars), "--audio-kb", str(args.audio_kb), "--seed", str(args.seed)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    url = process.stdout.readline().split()[-1]
+    return process, url
+
+
+class Recorder:
+    """Thread-safe latency samples and error counts per operation."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, op: str, seconds: float, ok: bool):
+        with self._lock:
+            self.samples[op].append(seconds * 1000)
+            self.errors[op] += not ok
+
+    def report(self, elapsed: float) -> dict:
+        report = {}
+        for op in sorted(self.samples):
+            samples = sorted(self.samples[op])
+            report[op] = {
+                "count": len(samples),
+                "throughput_per_s": round(len(samples) / elapsed, 2),
+                "error_rate": round(self.errors[op] / len(samples), 4),
+                "p50_ms": round(percentile(samples, 50), 1),
+                "p95_ms": round(percentile(samples, 95), 1),
+                "p99_ms": round(percentile(samples, 99), 1),
+            }
+        return report
+
+
+def make_operations(handlers, recorder: Recorder) -> dict:
+    """Operation name -> callable(n) that runs one user action through the handlers."""
+    keys = handlers.leader_keys()
+
+    def crisis(n: int):
+        started = time.perf_counter()
+        status, first = "", None
+        # Unique text and bypass_cache so every call reaches the backend
+        for outputs in handlers.process_crisis(SCENARIO.format(n=n), {}, bypass_cache=True):
+            status = outputs[-2]
+            if first is None and "agents reported" in status:
+                first = time.perf_counter() - started
+        ok = status.startswith("Analysis complete")
+        recorder.record("crisis", time.perf_counter() - started, ok)
+        if first is not None:
+            recorder.record("crisis first dossier", first, True)
+
+    def document(n: int):
+        started = time.perf_counter()
+        status = ""
+        for outputs in handlers.analyze_document(DOCUMENT.format(n=n)):
+            status = outputs[-1]
+        recorder.record("document", time.perf_counter() - started, status.startswith("Document analysis complete"))
+
+    def voice(n: int):
+        agent = keys[n % len(keys)]
+        state = {"agents": {agent: {"public_response": f"Statement {n}: we will not be intimidated."}}}
+        started = time.perf_counter()
+        size = sum(len(chunk) for chunk in handlers.synthesize_voice(agent, state))
+        recorder.record("voice", time.perf_counter() - started, size > 0)
+
+    def health(n: int):
+        started = time.perf_counter()
+        handlers.health_monitor.probe()
+        recorder.record("health", time.perf_counter() - started, handlers.health_monitor.history[-1][1])
+
+    return {"crisis": crisis, "document": document, "voice": voice, "health": health}
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def run_load(handlers, users: int, duration: float, mix: dict, think_ms: float, seed: int) -> tuple:
+    """(report, elapsed seconds) for `users` threads looping over the mix until the deadline."""
+    recorder = Recorder()
+    operations = make_operations(handlers, recorder)
+    names = [name for name in mix if name in operations]
+    weights = [mix[name] for name in names]
+    counter = iter(range(10**9))
+    counter_lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def user(index: int):
+        rng = random.Random(seed * 1000 + index)
+        while time.monotonic() < deadline:
+            with counter_lock:
+                n = next(counter)
+            operations[rng.choices(names, weights)[0]](n)
+            if think_ms:
+                time.sleep(rng.expovariate(1000 / think_ms))
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    return recorder.report(elapsed), elapsed
+
+
+def regressions(report: dict, baseline: dict, tolerance: float) -> list:
+    """Human-readable regressions of `report` against a saved baseline."""
+    found = []
+    for op, base in baseline.get("operations", {}).items():
+        current = report["operations"].get(op)
+        if current is None:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            found.append(f"{op}: p95 {current['p95_ms']:.0f} ms vs {base['p95_ms']:.0f} ms baseline")
+        if current["throughput_per_s"] < base["throughput_per_s"] * (1 - tolerance):
+            found.append(f"{op}: throughput {current['throughput_per_s']:.2f}/s vs {base['throughput_per_s']:.2f}/s baseline")
+        if current["error_rate"] > base["error_rate"] + ERROR_RATE_SLACK:
+            found.append(f"{op}: error rate {current['error_rate']:.1%} vs {base['error_rate']:.1%} baseline")
+    if report["peak_rss_mb"] > baseline.get("peak_rss_mb", float("inf")) * (1 + tolerance):
+        found.append(f"peak RSS {report['peak_rss_mb']:.0f} MB vs {baseline['peak_rss_mb']:.0f} MB baseline")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-user load test of the handlers against the mock backend.")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds to generate load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Operation weights (default {DEFAULT_MIX})")
+    parser.add_argument("--think-ms", type=float, default=0, help="Mean pause between a user's actions")
+    parser.add_argument("--latency-ms", type=float, default=300, help="Mock median per-agent latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Mock log-normal latency spread")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock share of HTTP 500 responses")
+    parser.add_argument("--text-chars", type=int, default=400, help="Mock characters per text field")
+    parser.add_argument("--audio-kb", type=int, default=48, help="Mock size of each voice clip")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", help="Write the report to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON report; regressions exit with status 1")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown vs the baseline")
+    args = parser.parse_args(argv)
+
+    mock, url = start_mock(args)
+    # Point the handlers at the mock and a scratch cache before they are imported
+    os.environ.update({"API_URL": url, "AIQ_CACHE_DIR": tempfile.mkdtemp(prefix="aiq-load-"),
+                       "HEALTH_CHECK_INTERVAL": "3600"})
+    try:
+        import handlers
+
+        handlers.ensure_leaders()
+        rss_before = current_rss_mb()
+        operations, elapsed = run_load(handlers, args.users, args.duration, parse_mix(args.mix),
+                                       args.think_ms, args.seed)
+        handlers.backend.close()
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    report = {
+        "config": {name: getattr(args, name) for name in
+                   ("users", "duration", "mix", "think_ms", "latency_ms", "latency_sigma", "error_rate",
+                    "text_chars", "audio_kb", "seed")},
+        "operations": operations,
+        "elapsed_s": round(elapsed, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_growth_mb": round(current_rss_mb() - rss_before, 1),
+    }
+
+    print(f"{args.users} users for {elapsed:.1f}s against mock (median {args.latency_ms:.0f} ms/agent,"
+          f" {args.error_rate:.0%} errors)")
+    print(f"{'operation':<22} {'count':>6} {'ops/s':>7} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for op, stats in operations.items():
+        print(f"{op:<22} {stats['count']:>6} {stats['throughput_per_s']:>7.2f} {stats['error_rate']:>7.1%}"
+              f" {stats['p50_ms']:>8.0f} {stats['p95_ms']:>8.0f} {stats['p99_ms']:>8.0f}")
+    print(f"peak RSS {report['peak_rss_mb']:.0f} MB (+{report['rss_growth_mb']:.1f} MB during load)")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            found = regressions(report, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        print(f"\nvs {args.compare} (tolerance {args.tolerance:.0%}) -> {'FAIL' if found else 'OK'}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
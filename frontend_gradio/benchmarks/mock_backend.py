@@ -0,0 +1,419 @@
+"""
+AdversaryIQ - Mock Backend
+
+Deterministic local stand-in for the Node API, so the frontend can be
+load-tested without spending OpenAI or ElevenLabs quota. Serves the same
+contracts as backend/server.js:
+
+    POST /api/process-crisis[/stream], /api/process-crisis/agent, /api/process-crisis/sweep,
+         /api/process-crisis/simulate
+    POST /api/analyze-document[/stream], /api/synthesize-voice
+    GET  /api/health, /api/leaders
+
+Each agent's latency is drawn from a log-normal distribution (median and
+sigma configurable), a configurable share of requests fail with HTTP 500,
+and text fields / audio clips have configurable sizes. All randomness comes
+from one seeded generator, so a run with the same seed and request order
+is reproducible.
+
+    python benchmarks/mock_backend.py --port 3001 --latency-ms 800 --error-rate 0.02
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaders import LEADERS  # noqa: E402
+from sweep import load_beliefs, plan_sweep  # noqa: E402
+
+# Stand-in escalation ladder for simulations; each leader climbs one rung per round
+MOCK_LADDER = ("Signal", "Pressure", "Escalate", "Settle")
+
+WORDS = ("escalation deterrence posture leverage signal restraint sovereignty coalition sanction "
+         "ultimatum dialogue reciprocity brinkmanship credibility negotiation pressure").split()
+
+
+class MockConfig:
+    """Latency, failure and payload knobs shared by every request."""
+
+    def __init__(self, latency_ms: float = 800, latency_sigma: float = 0.5, error_rate: float = 0.0,
+                 text_chars: int = 400, audio_kb: int = 48, seed: int = 7):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.text_chars = text_chars
+        self.audio_bytes = audio_kb * 1024
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        # Requests whose client disconnected mid-response (cancelled frontend events)
+        self.cancelled = 0
+
+    def draw(self) -> tuple:
+        """(latency seconds, fail?) from the shared seeded generator."""
+        with self.lock:
+            self.requests += 1
+            latency = self.latency_ms * math.exp(self.latency_sigma * self.rng.gauss(0, 1)) / 1000
+            return latency, self.rng.random() < self.error_rate
+
+
+def mock_text(seed_text: str, chars: int) -> str:
+    """Deterministic filler text of about `chars` characters for a given input."""
+    rng = random.Random(hashlib.sha256(seed_text.encode("utf-8")).digest())
+    words = []
+    while sum(len(word) + 1 for word in words) < chars:
+        words.append(rng.choice(WORDS))
+    return " ".join(words).capitalize() + "."
+
+
+def mock_agent(key: str, crisis: str, config: MockConfig, latency: float) -> dict:
+    leader = next((leader for leader in LEADERS if leader["key"] == key), {"name": key})
+    return {
+        "name": leader["name"],
+        "public_response": mock_text(f"{key}:public:{crisis}", config.text_chars),
+        "private_actions": mock_text(f"{key}:private:{crisis}", config.text_chars),
+        "psychological_reasoning": mock_text(f"{key}:reasoning:{crisis}", config.text_chars),
+        "escalation_phase": "Calibrated",
+        "escalation_risk": "Medium",
+        "timeline": "24-72 hours",
+        "personality_notes": "Mock profile",
+        "usage": {"latency_ms": round(latency * 1000), "prompt_tokens": 1200, "cached_tokens": 1024,
+                  "completion_tokens": 350},
+    }
+
+
+def mock_variant(key: str, beliefs: dict, latency: float) -> dict:
+    """Sweep variant whose risk rises with the mean overridden belief value."""
+    mean = sum(beliefs.values()) / len(beliefs) if beliefs else 0.5
+    level = 0 if mean < 0.4 else 1 if mean < 0.7 else 2
+    return {
+        "type": "variant", "key": key, "beliefs": beliefs,
+        "escalation_risk": ("Low", "Medium", "High")[level],
+        "escalation_phase": ("Diplomatic signalling", "Economic pressure", "Military posturing")[level],
+        "timeline": "24-72 hours",
+        "usage": {"latency_ms": round(latency * 1000), "prompt_tokens": 1250, "cached_tokens": 1152,
+                  "completion_tokens": 350},
+    }
+
+
+def mock_assessment(crisis: str, agents: dict) -> dict:
+    return {
+        "scenario": crisis,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "agents": agents,
+        "overall_risk": "Medium",
+        "key_insights": [f"{agent['name']} favors calibrated approach" for agent in agents.values()],
+        "bluf": mock_text(f"bluf:{crisis}", 300),
+    }
+
+
+def mock_document_agent(key: str, text: str, config: MockConfig) -> dict:
+    return {field: mock_text(f"{key}:{field}:{text[:200]}", config.text_chars)
+            for field in ("document_interpretation", "hidden_intentions", "psychological_tactics",
+                          "your_response", "authenticity_assessment")}
+
+
+def mock_timing(trace_id: str, latencies: dict) -> dict:
+    """The server's "timing" stream event: one llm span per agent."""
+    spans = [{"name": "llm", "start_ms": 0, "duration_ms": round(latency * 1000, 1), "agent": key}
+             for key, latency in latencies.items()]
+    return {"type": "timing", "trace_id": trace_id, "total_ms": round(max(latencies.values(), default=0) * 1000),
+            "spans": spans}
+
+
+def make_handler(config: MockConfig):
+
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _start_stream(self, content_type: str):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+        def _chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def _end_stream(self):
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _event(self, event: dict):
+            self._chunk(json.dumps(event).encode("utf-8") + b"\n")
+
+        def _body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                return json.loads(self.rfile.read(length) or b"{}")
+            # Chunked uploads (streamed document bodies)
+            raw = b""
+            while True:
+                size = int(self.rfile.readline().strip() or b"0", 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                raw += self.rfile.read(size)
+                self.rfile.readline()
+            return json.loads(raw or b"{}")
+
+        def _agent_latencies(self) -> tuple:
+            """({leader: latency seconds}, fail?) with one failure decision per request."""
+            draws = [(leader["key"], *config.draw()) for leader in LEADERS]
+            failed = bool(draws) and draws[0][2]
+            return {key: latency for key, latency, _ in draws}, failed
+
+        def do_GET(self):
+            if self.path == "/api/health":
+                self._json(200, {"status": "operational", "mock": True, "requests": config.requests,
+                                 "cancelled": config.cancelled})
+            elif self.path == "/api/leaders":
+                self._json(200, {"leaders": [{k: v for k, v in leader.items() if k != "order"} for leader in LEADERS]})
+            else:
+                self._json(404, {"error": "Not found"})
+
+        def do_POST(self):
+            body = self._body()
+            routes = {
+                "/api/process-crisis": self._crisis,
+                "/api/process-crisis/stream": self._crisis_stream,
+                "/api/process-crisis/agent": self._crisis_agent,
+                "/api/process-crisis/sweep": self._sweep,
+                "/api/process-crisis/simulate": self._simulate,
+                "/api/analyze-document": self._document,
+                "/api/analyze-document/stream": self._document_stream,
+                "/api/synthesize-voice": self._voice,
+            }
+            route = routes.get(self.path)
+            if route is None:
+                self._json(404, {"error": "Not found"})
+                return
+            try:
+                route(body)
+            except (BrokenPipeError, ConnectionResetError):
+                with config.lock:
+                    config.cancelled += 1
+                self.close_connection = True
+
+        def _crisis(self, body: dict):
+            crisis = body.get("crisis")
+            if not crisis:
+                return self._json(400, {"error": "Crisis scenario required"})
+            latencies, failed = self._agent_latencies()
+            time.sleep(max(latencies.values(), default=0))
+            if failed:
+                return self._json(500, {"error": "Intelligence processing failed", "details": "mock failure"})
+            agents = {key: mock_agent(key, crisis, config, latency) for key, latency in latencies.items()}
+            self._json(200, mock_assessment(crisis, agents))
+
+        def _crisis_stream(self, body: dict):
+            crisis = body.get("crisis")
+            if not crisis:
+                return self._json(400, {"error": "Crisis scenario required"})
+            latencies, failed = self._agent_latencies()
+            if failed:
+                time.sleep(min(latencies.values(), default=0))
+                return self._json(500, {"error": "Intelligence processing failed", "details": "mock failure"})
+
+            self._start_stream("application/x-ndjson")
+            agents, elapsed = {}, 0.0
+            for key, latency in sorted(latencies.items(), key=lambda item: item[1]):
+                time.sleep(latency - elapsed)
+                elapsed = latency
+                agents[key] = mock_agent(key, crisis, config, latency)
+                self._event({"type": "agent", "key": key, "agent": agents[key]})
+            ordered = {leader["key"]: agents[leader["key"]] for leader in LEADERS}
+            self._event(mock_timing(self.headers.get("X-Trace-Id"), latencies))
+            self._event({"type": "assessment", **mock_assessment(crisis, ordered)})
+            self._end_stream()
+
+        def _crisis_agent(self, body: dict):
+            crisis, agent, agents = body.get("crisis"), body.get("agent"), body.get("agents")
+            if not crisis or not agent:
+                return self._json(400, {"error": "crisis and agent are required"})
+            known = {leader["key"] for leader in LEADERS}
+            if agent not in known:
+                return self._json(400, {"error": f"Unknown agent: {agent}"})
+            # Like the server, ignore null or unknown entries in the caller's copy
+            agents = {key: value for key, value in (agents if isinstance(agents, dict) else {}).items()
+                      if key in known and isinstance(value, dict)}
+            latency, failed = config.draw()
+            time.sleep(latency)
+            if failed:
+                return self._json(500, {"error": "Agent re-run failed", "details": "mock failure"})
+            agents = {**agents, agent: mock_agent(agent, crisis, config, latency)}
+            self._json(200, mock_assessment(crisis, agents))
+
+        def _sweep(self, body: dict):
+            crisis = body.get("crisis")
+            if not crisis:
+                return self._json(400, {"error": "Crisis scenario required"})
+            beliefs = load_beliefs()
+            keys = [leader["key"] for leader in LEADERS if leader["key"] in beliefs]
+            try:
+                plan = plan_sweep(body.get("grid") or {}, {key: beliefs[key] for key in keys}, body.get("budget"))
+            except (ValueError, TypeError) as e:
+                return self._json(400, {"error": str(e)})
+
+            self._start_stream("application/x-ndjson")
+            tasks = plan.pop("tasks")
+            self._event({"type": "plan", **plan})
+            variants, latencies = [], {}
+            for completed, (key, overrides) in enumerate(tasks, 1):
+                latency, _ = config.draw()
+                # Roughly six calls in flight, as with the backend's default SWEEP_AGENT_CONCURRENCY
+                time.sleep(latency / 6)
+                latencies[key] = max(latencies.get(key, 0), latency)
+                variants.append(mock_variant(key, overrides, latency))
+                self._event(variants[-1])
+                self._event({"type": "progress", "completed": completed, "total": plan["calls"]})
+            self._event(mock_timing(self.headers.get("X-Trace-Id"), latencies))
+            self._event({"type": "sweep", "scenario": crisis, **plan,
+                         "variants": [{k: v for k, v in variant.items() if k != "type"} for variant in variants]})
+            self._end_stream()
+
+        def _simulate(self, body: dict):
+            crisis, rounds = body.get("crisis"), body.get("rounds", 3)
+            if not crisis:
+                return self._json(400, {"error": "Crisis scenario required"})
+            if not isinstance(rounds, int) or not 1 <= rounds <= 6:
+                return self._json(400, {"error": "rounds must be an integer from 1 to 6"})
+
+            self._start_stream("application/x-ndjson")
+            history, trajectory, all_latencies = [], {leader["key"]: [] for leader in LEADERS}, {}
+            for round_number in range(1, rounds + 1):
+                self._event({"type": "round", "round": round_number, "rounds": rounds})
+                latencies, _ = self._agent_latencies()
+                agents, elapsed = {}, 0.0
+                for key, latency in sorted(latencies.items(), key=lambda item: item[1]):
+                    time.sleep(latency - elapsed)
+                    elapsed = latency
+                    step = min(round_number - 1, len(MOCK_LADDER) - 1)
+                    agent = mock_agent(key, f"{crisis}:{round_number}", config, latency)
+                    # Context is a rolling summary, so prompt size grows slowly with the round
+                    agent["usage"]["prompt_tokens"] += 150 * (round_number - 1)
+                    agents[key] = {**agent, "ladder_step": MOCK_LADDER[step],
+                                   "escalation_risk": ("Low", "Medium", "High", "Medium")[step]}
+                    trajectory[key].append({"round": round_number, "step": MOCK_LADDER[step], "index": step,
+                                            "risk": agents[key]["escalation_risk"]})
+                    self._event({"type": "agent", "round": round_number, "key": key, "agent": agents[key]})
+                all_latencies.update(latencies)
+                entry = {
+                    "round": round_number,
+                    "overall_risk": ("Low", "Medium", "High", "Medium")[min(round_number - 1, 3)],
+                    "digest": "; ".join(f"{agent['name']}: {agent['ladder_step']}" for agent in agents.values()),
+                    "positions": {key: positions[-1] for key, positions in trajectory.items()},
+                    "usage": {field: sum(agent["usage"][field] for agent in agents.values())
+                              for field in ("prompt_tokens", "cached_tokens", "completion_tokens")},
+                }
+                history.append({**entry, "agents": agents})
+                self._event({"type": "round_complete", **entry})
+            self._event(mock_timing(self.headers.get("X-Trace-Id"), all_latencies))
+            self._event({"type": "simulation", "scenario": crisis, "rounds": history, "trajectory": trajectory,
+                         "overall_risk": history[-1]["overall_risk"]})
+            self._end_stream()
+
+        def _document(self, body: dict):
+            text = body.get("documentText")
+            if not text:
+                return self._json(400, {"error": "Document text required"})
+            latencies, failed = self._agent_latencies()
+            time.sleep(max(latencies.values(), default=0))
+            if failed:
+                return self._json(500, {"error": "Document analysis failed", "details": "mock failure"})
+            agents = {leader["key"]: mock_document_agent(leader["key"], text, config) for leader in LEADERS}
+            self._json(200, {"document": body.get("filename"), "sections": 1, "agents": agents})
+
+        def _document_stream(self, body: dict):
+            text = body.get("documentText")
+            if not text:
+                return self._json(400, {"error": "Document text required"})
+            latencies, failed = self._agent_latencies()
+            if failed:
+                return self._json(500, {"error": "Document analysis failed", "details": "mock failure"})
+
+            self._start_stream("application/x-ndjson")
+            total, agents, elapsed = len(latencies), {}, 0.0
+            self._event({"type": "progress", "completed": 0, "total": total, "sections": 1})
+            for done, (key, latency) in enumerate(sorted(latencies.items(), key=lambda item: item[1]), 1):
+                time.sleep(latency - elapsed)
+                elapsed = latency
+                agents[key] = mock_document_agent(key, text, config)
+                self._event({"type": "progress", "completed": done, "total": total, "sections": 1})
+                self._event({"type": "agent", "key": key, "agent": agents[key]})
+            self._event(mock_timing(self.headers.get("X-Trace-Id"), latencies))
+            self._event({"type": "analysis", "document": body.get("filename"), "sections": 1, "agents": agents})
+            self._end_stream()
+
+        def _voice(self, body: dict):
+            if not body.get("text"):
+                return self._json(400, {"error": "Text required"})
+            latency, failed = config.draw()
+            time.sleep(latency / 2)
+            if failed:
+                return self._json(500, {"error": "Voice synthesis failed", "details": "mock failure"})
+
+            # Time to first byte, then the clip in 16 KB chunks over the rest of the latency
+            self._start_stream("audio/mpeg")
+            chunks = max(1, config.audio_bytes // (16 * 1024))
+            chunk = b"\xff\xfb" + bytes(16 * 1024 - 2)
+            for _ in range(chunks):
+                time.sleep(latency / 2 / chunks)
+                self._chunk(chunk)
+            self._end_stream()
+
+    return MockHandler
+
+
+def start_mock_backend(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Serve the mock API on a daemon thread; port 0 picks a free port (see server.server_port)."""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-backend", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deterministic mock of the AdversaryIQ Node API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--latency-ms", type=float, default=800, help="Median per-agent latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread (0 = fixed latency)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 500")
+    parser.add_argument("--text-chars", type=int, default=400, help="Characters per generated text field")
+    parser.add_argument("--audio-kb", type=int, default=48, help="Size of each synthesized clip")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    config = MockConfig(args.latency_ms, args.latency_sigma, args.error_rate, args.text_chars, args.audio_kb, args.seed)
+    server = start_mock_backend(config, args.host, args.port)
+    print(f"Mock AdversaryIQ API on http://{args.host}:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
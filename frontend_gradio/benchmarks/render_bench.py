@@ -0,0 +1,126 @@
+"""
+AdversaryIQ - Dossier Render Benchmark
+
+Renders/sec and bytes per page for the dossier renderers, current tree
+versus a baseline rendering.py loaded from git (by default the version
+just before the compiled templates were introduced). The baseline did
+not escape LLM output, so it is also timed with the escaping it would
+need ("before+esc": html.escape applied to every field per render).
+
+    python benchmarks/render_bench.py [--seconds 1.0] [--baseline <git rev>]
+"""
+
+import argparse
+import html
+import os
+import subprocess
+import sys
+import time
+import types
+
+FRONTEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, FRONTEND_DIR)
+
+import rendering  # noqa: E402
+from leaders import leader_keys  # noqa: E402
+
+RENDERING_PATH = "frontend_gradio/rendering.py"
+
+# Typical LLM output lengths, with characters that need escaping
+SENTENCE = "The adversary's \"measured\" posture masks <intent> & leverage; expect a calibrated response. "
+AGENT = {
+    "public_response": SENTENCE * 4,
+    "private_actions": SENTENCE * 5,
+    "psychological_reasoning": SENTENCE * 6,
+}
+DOCUMENT = {
+    "document_interpretation": SENTENCE * 5,
+    "hidden_intentions": SENTENCE * 3,
+    "psychological_tactics": SENTENCE * 3,
+    "your_response": SENTENCE * 4,
+    "authenticity_assessment": SENTENCE,
+}
+ASSESSMENT = {
+    "bluf": SENTENCE * 4,
+    "overall_risk": "Medium",
+    "key_insights": [SENTENCE] * 5,
+}
+
+
+def git(*args) -> str:
+    repo_root = os.path.dirname(FRONTEND_DIR)
+    return subprocess.run(["git", *args], cwd=repo_root, capture_output=True, text=True, check=True).stdout
+
+
+def default_baseline() -> str:
+    """Parent of the commit that introduced DossierTemplate."""
+    introduced = git("log", "--reverse", "--format=%H", "-S", "class DossierTemplate", "--", RENDERING_PATH).split()
+    return f"{introduced[0]}^" if introduced else "HEAD"
+
+
+def load_baseline(rev: str) -> types.ModuleType:
+    module = types.ModuleType("rendering_baseline")
+    module.__file__ = f"{rev}:{RENDERING_PATH}"
+    exec(compile(git("show", f"{rev}:{RENDERING_PATH}"), module.__file__, "exec"), module.__dict__)
+    return module
+
+
+def escaped(data: dict) -> dict:
+    return {k: [html.escape(v) for v in value] if isinstance(value, list) else html.escape(value)
+            for k, value in data.items()}
+
+
+def cases(module, escape_inputs: bool = False) -> dict:
+    key = (leader_keys() or ("roosevelt",))[0]
+    prep = escaped if escape_inputs else (lambda data: data)
+    return {
+        "agent dossier": lambda: module.format_agent_dossier(key, prep(AGENT)),
+        "document dossier": lambda: module.format_document_dossier(key, prep(DOCUMENT)),
+        "executive summary": lambda: module.format_executive_summary(prep(ASSESSMENT)),
+    }
+
+
+def measure(render, seconds: float) -> tuple:
+    """(renders/sec, bytes per render)."""
+    size = len(render().encode("utf-8"))
+    count, started = 0, time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            render()
+        count += 100
+    return count / (time.perf_counter() - started), size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dossier render throughput and payload size.")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Timing window per case")
+    parser.add_argument("--baseline", help="git revision to compare against (default: pre-template renderer)")
+    args = parser.parse_args(argv)
+
+    rev = args.baseline or default_baseline()
+    try:
+        baseline = load_baseline(rev)
+    except subprocess.CalledProcessError:
+        print(f"Could not load {RENDERING_PATH} at {rev}; reporting the current renderer only")
+        baseline = None
+
+    print(f"baseline: {rev}")
+    print(f"{'case':<18} {'before/s':>10} {'before+esc/s':>13} {'after/s':>10} {'vs +esc':>8}"
+          f" {'before B':>9} {'after B':>8} {'size':>6}")
+    current_cases = cases(rendering)
+    baseline_cases = cases(baseline) if baseline else {}
+    baseline_escaped = cases(baseline, escape_inputs=True) if baseline else {}
+    for name, render in current_cases.items():
+        after_rate, after_bytes = measure(render, args.seconds)
+        if name in baseline_cases:
+            before_rate, before_bytes = measure(baseline_cases[name], args.seconds)
+            escaped_rate, _ = measure(baseline_escaped[name], args.seconds)
+            print(f"{name:<18} {before_rate:>10,.0f} {escaped_rate:>13,.0f} {after_rate:>10,.0f}"
+                  f" {after_rate / escaped_rate:>7.2f}x {before_bytes:>9,} {after_bytes:>8,} {after_bytes / before_bytes:>6.0%}")
+        else:
+            print(f"{name:<18} {'-':>10} {'-':>13} {after_rate:>10,.0f} {'-':>8} {'-':>9} {after_bytes:>8,}")
+
+
+if __name__ == "__main__":
+    main()
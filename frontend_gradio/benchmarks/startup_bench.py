@@ -0,0 +1,83 @@
+"""
+AdversaryIQ - Startup Benchmark
+
+Cold import time (fresh interpreter each run) for the headless modules
+versus the Gradio UI, measured in-process around the import statement so
+interpreter start-up is excluded.
+
+    python benchmarks/startup_bench.py [--runs 7] [--budget-ms 100]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+FRONTEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRATCH_CACHE_DIR = tempfile.mkdtemp(prefix="aiq-bench-")
+
+# (label, statement timed in a fresh interpreter, counts against the headless budget)
+TARGETS = [
+    ("rendering", "import rendering", True),
+    ("backend_client", "import backend_client", True),
+    ("handlers (client + rendering)", "import handlers", True),
+    ("app (lazy UI, imports gradio)", "import app", False),
+    ("app.build_app()", "import app; app.build_app()", False),
+]
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(elapsed * 1000, int("gradio" in sys.modules))
+"""
+
+
+def time_statement(statement: str) -> tuple:
+    """(milliseconds, gradio_loaded) for one fresh-interpreter run, or None if it failed."""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(statement=statement)],
+        cwd=FRONTEND_DIR, capture_output=True, text=True,
+        # Never let a benchmark run touch the network or the real cache dir
+        env={**os.environ, "API_URL": "http://127.0.0.1:9", "HEALTH_CHECK_INTERVAL": "3600",
+             "AIQ_CACHE_DIR": SCRATCH_CACHE_DIR},
+    )
+    if result.returncode != 0:
+        return None
+    ms, gradio_loaded = result.stdout.split()[-2:]
+    return float(ms), gradio_loaded == "1"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    args = parser.parse_args(argv)
+
+    over_budget = False
+    print(f"{'target':<34} {'median ms':>10} {'min ms':>8}  gradio")
+    for label, statement, headless in TARGETS:
+        samples = [time_statement(statement) for _ in range(args.runs)]
+        if any(sample is None for sample in samples):
+            print(f"{label:<34} {'skipped (import failed)':>20}")
+            continue
+
+        times = [ms for ms, _ in samples]
+        gradio_loaded = samples[0][1]
+        median = statistics.median(times)
+        flag = ""
+        if headless:
+            over = median > args.budget_ms or gradio_loaded
+            over_budget |= over
+            flag = "  OVER BUDGET" if over else ""
+        print(f"{label:<34} {median:>10.1f} {min(times):>8.1f}  {'yes' if gradio_loaded else 'no'}{flag}")
+
+    print(f"\nheadless budget: {args.budget_ms:.0f} ms, no gradio import -> {'FAIL' if over_budget else 'OK'}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+"""
+AdversaryIQ - Document Upload Extraction
+
+Incremental text extraction for uploaded .txt/.md/.pdf files. Text is
+produced in bounded chunks and streamed straight into the request body,
+so worker memory stays flat regardless of document size.
+"""
+
+import json
+import os
+
+# Characters per text chunk handed to the request body
+TEXT_CHUNK_CHARS = 64 * 1024
+
+# Mirrors the backend's section budget (DOC_CHUNK_TOKENS, ~4 chars per token)
+CHARS_PER_TOKEN = 4
+DOC_CHUNK_TOKENS = int(os.environ.get("DOC_CHUNK_TOKENS", "2500"))
+
+SUPPORTED_EXTENSIONS = (".txt", ".md", ".pdf")
+
+
+def iter_document_text(path: str):
+    """Yield the text of a document in chunks without loading the whole file."""
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".pdf":
+        yield from _iter_pdf_text(path)
+        return
+
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported file type: {extension or 'unknown'}")
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while True:
+            chunk = f.read(TEXT_CHUNK_CHARS)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _iter_pdf_text(path: str):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise RuntimeError("PDF upload requires the 'pypdf' package")
+
+    # PdfReader parses pages lazily from the open file handle
+    with open(path, "rb") as f:
+        reader = PdfReader(f)
+        for page in reader.pages:
+            text = page.extract_text() or ""
+            if text:
+                yield text + "\n\n"
+
+
+def document_stats(path: str) -> dict:
+    """Size and token estimate for an uploaded document, computed in one streaming pass."""
+    chars = sum(len(chunk) for chunk in iter_document_text(path))
+    tokens = chars // CHARS_PER_TOKEN
+    return {
+        "bytes": os.path.getsize(path),
+        "chars": chars,
+        "tokens": tokens,
+        "sections": max(1, -(-tokens // DOC_CHUNK_TOKENS)),
+    }
+
+
+def format_document_preview(path: str) -> str:
+    """One-line size/token preview shown in doc_status after upload."""
+    if not path:
+        return "Awaiting document..."
+
+    try:
+        stats = document_stats(path)
+    except Exception as e:
+        return f"Cannot read {os.path.basename(path)}: {e}"
+
+    size_mb = stats["bytes"] / (1024 * 1024)
+    sections = stats["sections"]
+    plan = f"{sections} sections" if sections > 1 else "single pass"
+    return (f"{os.path.basename(path)} | {size_mb:.2f} MB | "
+            f"~{stats['tokens']:,} tokens | {plan}")
+
+
+def iter_document_body(text_chunks, filename: str):
+    """Encode `{"documentText": ..., "filename": ...}` as a stream of bytes."""
+    yield b'{"filename": ' + json.dumps(filename).encode("utf-8") + b', "documentText": "'
+    for chunk in text_chunks:
+        # Escape each chunk on its own; JSON string escaping is per character
+        yield json.dumps(chunk)[1:-1].encode("utf-8")
+    yield b'"}'
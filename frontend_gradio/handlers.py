@@ -0,0 +1,792 @@
+"""
+AdversaryIQ - Analysis Handlers
+
+Everything behind the UI's buttons (crisis analysis, per-leader re-runs,
+voice synthesis, document analysis, batch runs, belief sweeps, escalation
+simulations, API status), written as
+plain generators that yield the rendered outputs. Nothing here imports
+Gradio, and `requests` is only loaded once a call is actually made, so
+scripts and tests can import this module cheaply.
+"""
+
+import hashlib
+import os
+import threading
+
+from audio_cache import audio_store, voice_cache_key
+from backend_client import BackendClient, BackendError
+from batch_runner import iter_batch
+from documents import iter_document_body, iter_document_text
+from health_monitor import HealthMonitor
+from leaders import LEADERS, fetch_leaders, leader_info, leader_keys, use_leaders
+from rendering import (error_panel, format_agent_dossier, format_document_dossier, format_executive_summary,
+                       format_pending_dossier, format_provisional_summary, format_similar_notice,
+                       format_simulation_panel, format_simulation_timeline, format_sweep_report, placeholder)
+from resilience import CircuitOpenError
+from profiles import profile_version
+from result_cache import CACHE_DIR, crisis_cache, crisis_cache_key, is_cacheable_assessment, normalize_text
+from risk_estimate import agreement_metrics, estimate_risk, reconcile
+from scenario_index import scenario_index
+from single_flight import SingleFlight
+from sweep import aggregate, load_beliefs, parse_grid, plan_sweep
+from telemetry import Trace, register_collector
+from voice_prefetch import VoicePrefetcher
+
+# Configuration
+API_URL = os.environ.get("API_URL", "http://localhost:3001")
+
+# Mirrors the backend's SIMULATION_MAX_ROUNDS default; the backend enforces its own
+SIMULATION_MAX_ROUNDS = int(os.environ.get("SIMULATION_MAX_ROUNDS", "6"))
+
+# Shared keep-alive connection pool for all backend calls (opened on first use)
+backend = BackendClient(API_URL)
+
+# Cached backend status, refreshed in the background once start()ed
+health_monitor = HealthMonitor(backend)
+
+# Identical submissions in flight at the same time share one backend call
+crisis_flights = SingleFlight("crisis")
+document_flights = SingleFlight("document")
+
+
+def ensure_leaders():
+    """Fall back to the backend's leader list when no profile files are available locally."""
+    if not LEADERS:
+        use_leaders(fetch_leaders(backend))
+
+
+def cache_status() -> str:
+    stats = crisis_cache.stats()
+    return f"cache {stats['hits']} hit / {stats['misses']} miss"
+
+
+def failed_agents(data: dict) -> list:
+    agents = data.get('agents', {})
+    return [key for key in leader_keys() if (agents.get(key) or {}).get('escalation_phase') == 'Error']
+
+
+def usage_summary(agents: dict) -> str:
+    """Prompt/cached token totals and per-agent LLM latency reported by the backend."""
+    usages = {key: (agents.get(key) or {}).get('usage') for key in leader_keys()}
+    usages = {key: usage for key, usage in usages.items() if usage}
+    if not usages:
+        return ""
+
+    prompt_tokens = sum(usage.get('prompt_tokens', 0) for usage in usages.values())
+    cached_tokens = sum(usage.get('cached_tokens', 0) for usage in usages.values())
+    latencies = " · ".join(
+        f"{leader_info(key)['short_name']} {usage.get('latency_ms', 0) / 1000:.1f}s" for key, usage in usages.items()
+    )
+    return f"prompt {prompt_tokens:,} tok ({cached_tokens:,} cached) | {latencies}"
+
+
+def completion_status(data: dict) -> str:
+    failed = failed_agents(data)
+    usage = usage_summary(data.get('agents', {}))
+    status = "Analysis complete"
+    if failed:
+        names = ", ".join(leader_info(key)['short_name'].upper() for key in failed)
+        status = f"Analysis complete with errors ({names}): use RE-RUN on the affected dossier"
+    return f"{status} | {usage}" if usage else status
+
+
+def cache_metrics() -> str:
+    """Prometheus counters for the crisis and voice caches."""
+    lines = ["# HELP aiq_frontend_cache_requests_total Cache lookups by cache and result",
+             "# TYPE aiq_frontend_cache_requests_total counter"]
+    for name, cache in (("crisis", crisis_cache), ("voice", audio_store)):
+        stats = cache.stats()
+        lines.append(f'aiq_frontend_cache_requests_total{{cache="{name}",result="hit"}} {stats["hits"]}')
+        lines.append(f'aiq_frontend_cache_requests_total{{cache="{name}",result="miss"}} {stats["misses"]}')
+    return "\n".join(lines)
+
+
+register_collector(cache_metrics)
+
+
+def coalescing_metrics() -> str:
+    """Prometheus counters for single-flight deduplication."""
+    lines = ["# HELP aiq_frontend_coalesced_requests_total Analyses that started a backend call (leader)"
+             " or joined an identical one in flight (follower)",
+             "# TYPE aiq_frontend_coalesced_requests_total counter"]
+    for flights in (crisis_flights, document_flights):
+        stats = flights.stats()
+        for role in ("leaders", "followers"):
+            lines.append(f'aiq_frontend_coalesced_requests_total{{kind="{flights.name}",role="{role[:-1]}"}} {stats[role]}')
+    lines += ["# HELP aiq_frontend_abandoned_flights_total Backend calls aborted because every event"
+              " waiting on them was cancelled or superseded",
+              "# TYPE aiq_frontend_abandoned_flights_total counter"]
+    for flights in (crisis_flights, document_flights):
+        lines.append(f'aiq_frontend_abandoned_flights_total{{kind="{flights.name}"}} {flights.stats()["abandoned"]}')
+    return "\n".join(lines)
+
+
+register_collector(coalescing_metrics)
+register_collector(agreement_metrics)
+
+
+def document_flight_key(document_text: str = None, document_file: str = None) -> str:
+    """Content key for coalescing document analyses: file bytes (or normalized text) + profile version."""
+    digest = hashlib.sha256(f"{profile_version()}\n".encode("utf-8"))
+    if document_file:
+        digest.update(os.path.basename(document_file).encode("utf-8") + b"\n")
+        with open(document_file, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    else:
+        digest.update(normalize_text(document_text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def timed_events(trace: Trace, events):
+    """Iterate events, counting only the time spent waiting on the backend as its span."""
+    iterator = iter(events)
+    while True:
+        with trace.span("backend"):
+            event = next(iterator, None)
+        if event is None:
+            return
+        yield event
+
+
+def timing_summary(trace: Trace) -> str:
+    """Compact wall-time breakdown for the status line, e.g.
+    "12.4s: backend 12.1s (slowest LLM ROOSEVELT 11.8s, assemble 1 ms) · render 9 ms · trace 1a2b…"."""
+    parts = [f"backend {trace.stages.get('backend', 0):.1f}s"]
+    slowest = trace.slowest_server_span("llm")
+    if slowest:
+        server = [f"slowest LLM {leader_info(slowest.get('agent'))['short_name'].upper()}"
+                  f" {slowest['duration_ms'] / 1000:.1f}s"]
+        for name in ("parse", "assemble"):
+            if trace.server_total(name):
+                server.append(f"{name} {trace.server_total(name):.0f} ms")
+        parts[0] += f" ({', '.join(server)})"
+    if "render" in trace.stages:
+        parts.append(f"render {trace.stages['render'] * 1000:.0f} ms")
+    return f"{trace.elapsed:.1f}s: {' · '.join(parts)} · trace {trace.id}"
+
+
+def process_crisis(crisis_text: str, state: dict, bypass_cache: bool = False,
+                   eager_voice: bool = False, session_id: str = "default"):
+    """Process crisis through backend API, streaming each dossier as its agent reports.
+
+    The session's response_state holds the full assessment (scenario,
+    agents, overall_risk, key_insights, bluf). Yields one dossier per
+    registered leader, then summary, status and state.
+    """
+
+    import requests
+
+    keys = leader_keys()
+
+    if not crisis_text or not crisis_text.strip():
+        empty = placeholder("Enter a crisis scenario above to begin analysis.")
+        yield *(empty for _ in keys), empty, "Awaiting input...", {}
+        return
+
+    trace = Trace("crisis")
+    cache_key = crisis_cache_key(crisis_text)
+    if not bypass_cache:
+        with trace.span("cache"):
+            cached = crisis_cache.get(cache_key)
+        if cached is not None:
+            trace.finish("cached")
+            agents = cached.get('agents', {})
+            if eager_voice:
+                voice_prefetcher.prefetch(session_id, agents)
+            yield (
+                *(format_agent_dossier(key, agents.get(key)) for key in keys),
+                format_executive_summary(cached),
+                f"Analysis complete (cached) | {cache_status()}",
+                cached
+            )
+            return
+
+    if health_monitor.is_down():
+        trace.finish("backend_down")
+        error = backend_down_error()
+        yield *(error for _ in keys), error, check_api_health(), {}
+        return
+
+    panels = {key: format_pending_dossier(key) for key in keys}
+    agents = {}
+    scenario = crisis_text.strip()
+
+    # Instant local estimate from the profile parameters holds the summary slot until the agents report
+    with trace.span("estimate"):
+        estimate = estimate_risk(scenario)
+    summary = (format_provisional_summary(estimate) if estimate
+               else placeholder("Executive summary will be compiled once all agents have reported."))
+
+    # Stays "cancelled" if the generator is closed before finishing
+    outcome = "cancelled"
+    events = None
+    try:
+        events, joined = crisis_flights.stream(
+            cache_key, lambda flight: backend.iter_crisis_events(scenario, trace.id, on_cancel=flight.on_cancel))
+        if joined:
+            trace.add("coalesced", 0.0)
+        working = "Joined an identical analysis already in progress..." if joined else "Processing intelligence..."
+        yield *panels.values(), summary, working, {}
+
+        data = None
+        for event in timed_events(trace, events):
+            if event.get('type') == 'agent':
+                key = event['key']
+                agents[key] = event['agent']
+                with trace.span("render"):
+                    panels[key] = format_agent_dossier(key, event['agent'])
+                status = f"{len(agents)} of {len(keys)} agents reported"
+                partial = {'scenario': scenario, 'agents': agents}
+                yield *panels.values(), summary, status, partial
+
+            elif event.get('type') == 'timing':
+                trace.server = event
+
+            elif event.get('type') == 'assessment':
+                data = event
+
+        if data is None:
+            raise RuntimeError("Stream ended before the assessment was received")
+
+        agents = data.get('agents', agents)
+
+        if is_cacheable_assessment(data) and not joined:
+            crisis_cache.put(cache_key, data)
+            scenario_index.add(cache_key, scenario, profile_version())
+
+        if eager_voice:
+            voice_prefetcher.prefetch(session_id, agents)
+
+        with trace.span("render"):
+            dossiers = [format_agent_dossier(key, agents.get(key)) for key in keys]
+            summary = format_executive_summary(data, reconcile(estimate, data, record=not joined) if estimate else None)
+
+        outcome = "ok"
+        yield *dossiers, summary, f"{completion_status(data)} | {cache_status()} | {timing_summary(trace)}", data
+
+    except BackendError as e:
+        outcome = "error"
+        error = error_panel(str(e))
+        yield *(error for _ in keys), error, f"Error: {e.status_code} | trace {trace.id}", {}
+    except requests.exceptions.Timeout:
+        outcome = "error"
+        error = error_panel("Request timed out. Please try again.", warning=True)
+        yield *(error for _ in keys), error, f"Timeout | trace {trace.id}", {}
+    except (requests.exceptions.ConnectionError, CircuitOpenError):
+        outcome = "error"
+        health_monitor.refresh()
+        error = error_panel(f"Cannot connect to API at {API_URL}")
+        yield *(error for _ in keys), error, "Connection failed", {}
+    except Exception as e:
+        outcome = "error"
+        error = error_panel(f"Error: {str(e)}")
+        yield *(error for _ in keys), error, f"Error: {str(e)} | trace {trace.id}", {}
+    finally:
+        # A cancelled or superseded event stops reading here; if no other session
+        # shares the flight, that aborts the backend request and its LLM calls
+        if events is not None:
+            events.close()
+        trace.finish(outcome)
+
+
+# Shorter inputs are still being typed; not worth a lookup
+SIMILAR_MIN_CHARS = 40
+
+
+def find_similar_analysis(crisis_text: str) -> tuple:
+    """(notice HTML, match) for the most similar past scenario whose analysis is still cached.
+
+    match is None (and the notice empty) when nothing is similar enough.
+    """
+    if not crisis_text or len(crisis_text.strip()) < SIMILAR_MIN_CHARS:
+        return "", None
+    for match in scenario_index.query(crisis_text, profile_version()):
+        if crisis_cache.contains(match['key']):
+            return format_similar_notice(match), match
+    return "", None
+
+
+def load_similar_analysis(match: dict, eager_voice: bool = False, session_id: str = "default"):
+    """Show a near-duplicate's cached analysis instead of running a new one.
+
+    Yields the same outputs as process_crisis.
+    """
+    keys = leader_keys()
+    cached = crisis_cache.get(match['key']) if match else None
+    if cached is None:
+        empty = placeholder("That analysis is no longer cached. Submit the scenario to run a fresh analysis.")
+        yield *(empty for _ in keys), empty, "Similar analysis expired", {}
+        return
+
+    agents = cached.get('agents', {})
+    if eager_voice:
+        voice_prefetcher.prefetch(session_id, agents)
+    yield (
+        *(format_agent_dossier(key, agents.get(key)) for key in keys),
+        format_executive_summary(cached),
+        f"Loaded {match['similarity']:.0%}-similar analysis (cached) | {cache_status()}",
+        cached
+    )
+
+
+def rerun_agent(agent_key: str, state: dict):
+    """Re-run a single leader and patch it into the session's assessment."""
+
+    summary_placeholder = placeholder("Submit a crisis scenario to generate executive intelligence summary.")
+    if not state or not state.get('scenario') or not state.get('agents'):
+        yield format_agent_dossier(agent_key, None), summary_placeholder, "Run a full analysis before re-running a leader", state
+        return
+
+    import requests
+
+    current = format_executive_summary(state) if state.get('bluf') else summary_placeholder
+    yield format_pending_dossier(agent_key), current, f"Re-running {leader_info(agent_key)['short_name'].upper()}...", state
+
+    trace = Trace("rerun")
+    outcome = "cancelled"
+    try:
+        with trace.span("backend"):
+            response = backend.rerun_agent(state['scenario'], agent_key, state['agents'], trace_id=trace.id)
+
+        if response.status_code != 200:
+            outcome = "error"
+            yield format_agent_dossier(agent_key, state['agents'].get(agent_key)), current, f"Error: {response.status_code}", state
+            return
+
+        data = response.json()
+
+        if is_cacheable_assessment(data):
+            crisis_cache.put(crisis_cache_key(data['scenario']), data)
+
+        agents = data.get('agents', {})
+        with trace.span("render"):
+            dossier, summary = format_agent_dossier(agent_key, agents.get(agent_key)), format_executive_summary(data)
+        outcome = "ok"
+        yield dossier, summary, f"{completion_status(data)} | {timing_summary(trace)}", data
+
+    except Exception as e:
+        outcome = "error"
+        if isinstance(e, (requests.exceptions.ConnectionError, CircuitOpenError)):
+            health_monitor.refresh()
+        yield format_agent_dossier(agent_key, state['agents'].get(agent_key)), current, f"Error: {str(e)}", state
+    finally:
+        trace.finish(outcome)
+
+
+def rerun_handler(agent: str):
+    """Generator event handler bound to one agent's re-run button."""
+
+    def handler(state: dict):
+        yield from rerun_agent(agent, state)
+
+    return handler
+
+
+# Chunk size for relaying synthesized audio to the browser
+AUDIO_CHUNK_BYTES = 16 * 1024
+
+
+def iter_clip(f):
+    """Yield an open stored clip in fixed-size chunks, then close it."""
+    with f:
+        while True:
+            chunk = f.read(AUDIO_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+def stream_clip(agent: str, text: str):
+    """Yield MP3 chunks for text, streaming from the backend (and into the store) on a miss."""
+
+    key = voice_cache_key(agent, text)
+    cached_path = audio_store.get(key)
+    if cached_path:
+        try:
+            clip = open(cached_path, "rb")
+        except FileNotFoundError:
+            # Evicted between lookup and open: a miss, synthesize it again
+            clip = None
+        if clip is not None:
+            yield from iter_clip(clip)
+            return
+
+    trace = Trace("voice")
+    outcome = "cancelled"
+    try:
+        with backend.stream_voice(text, agent, trace_id=trace.id) as response:
+            if response.status_code != 200:
+                outcome = "error"
+                return
+
+            with audio_store.writing(key) as f:
+                for chunk in timed_events(trace, response.iter_content(AUDIO_CHUNK_BYTES)):
+                    f.write(chunk)
+                    yield chunk
+        outcome = "ok"
+
+    except Exception as e:
+        outcome = "error"
+        print(f"Voice synthesis error [trace {trace.id}]: {e}")
+    finally:
+        trace.finish(outcome)
+
+
+def synthesize_clip(agent: str, text: str) -> str:
+    """Synthesize text into the audio store without playing it; returns the clip path."""
+
+    for _ in stream_clip(agent, text):
+        pass
+
+    path = audio_store.path_for(voice_cache_key(agent, text))
+    return path if os.path.exists(path) else None
+
+
+# Background pre-synthesis pool for "eager voice" mode
+voice_prefetcher = VoicePrefetcher(synthesize_clip, voice_cache_key)
+
+
+def synthesize_voice(agent: str, state: dict):
+    """Stream synthesized voice for agent's public response."""
+
+    agents = (state or {}).get('agents', {})
+    if agent not in agents:
+        return
+
+    agent_data = agents.get(agent) or {}
+    text = agent_data.get('public_response', '')
+
+    if not text or text == 'Awaiting analysis...':
+        return
+
+    # Let an eager pre-synthesis that is already queued or running finish first
+    future = voice_prefetcher.pending(agent, text)
+    if future is not None:
+        try:
+            future.result()
+        except Exception:
+            pass
+
+    yield from stream_clip(agent, text)
+
+
+def voice_handler(agent: str):
+    """Generator event handler bound to one agent's voice button."""
+
+    def handler(state: dict):
+        yield from synthesize_voice(agent, state)
+
+    return handler
+
+
+def analyze_document(document_text: str, document_file: str = None):
+    """Analyze document through backend API, reporting per-section progress.
+
+    An uploaded file takes precedence over pasted text and is streamed
+    into the request body chunk by chunk.
+    """
+
+    import requests
+
+    keys = leader_keys()
+    has_text = document_text and document_text.strip()
+    if not document_file and not has_text:
+        empty = placeholder("Paste document text above to begin analysis.")
+        yield *(empty for _ in keys), "Awaiting document..."
+        return
+
+    if health_monitor.is_down():
+        error = backend_down_error()
+        yield *(error for _ in keys), check_api_health()
+        return
+
+    panels = {key: format_pending_dossier(key) for key in keys}
+    yield *panels.values(), "Submitting document..."
+
+    trace = Trace("document")
+    outcome = "cancelled"
+    events = None
+    try:
+        data = None
+        status = "Analyzing document..."
+
+        def produce(flight):
+            if document_file:
+                body = iter_document_body(iter_document_text(document_file), os.path.basename(document_file))
+                return backend.iter_document_events(body_chunks=body, trace_id=trace.id, on_cancel=flight.on_cancel)
+            return backend.iter_document_events(document_text.strip(), trace_id=trace.id, on_cancel=flight.on_cancel)
+
+        with trace.span("key"):
+            flight_key = document_flight_key(document_text, document_file)
+        events, joined = document_flights.stream(flight_key, produce)
+        if joined:
+            status = "Joined an identical analysis already in progress..."
+            yield *panels.values(), status
+
+        for event in timed_events(trace, events):
+            if event.get('type') == 'progress':
+                sections = event.get('sections', 1)
+                scope = f"{sections} sections" if sections > 1 else "full document"
+                status = f"Analyzing {scope}: {event['completed']} of {event['total']} analyses complete"
+                yield *panels.values(), status
+
+            elif event.get('type') == 'agent':
+                key = event['key']
+                with trace.span("render"):
+                    panels[key] = format_document_dossier(key, event['agent'])
+                yield *panels.values(), status
+
+            elif event.get('type') == 'timing':
+                trace.server = event
+
+            elif event.get('type') == 'analysis':
+                data = event
+
+        if data is None:
+            raise RuntimeError("Stream ended before the analysis was received")
+
+        agents = data.get('agents', {})
+
+        with trace.span("render"):
+            dossiers = [format_document_dossier(key, agents.get(key)) for key in keys]
+
+        sections = data.get('sections', 1)
+        suffix = f" ({sections} sections merged)" if sections > 1 else ""
+        outcome = "ok"
+        yield *dossiers, f"Document analysis complete{suffix} | {timing_summary(trace)}"
+
+    except BackendError as e:
+        outcome = "error"
+        error = error_panel(str(e))
+        yield *(error for _ in keys), f"Error: {e.status_code} | trace {trace.id}"
+    except Exception as e:
+        outcome = "error"
+        if isinstance(e, (requests.exceptions.ConnectionError, CircuitOpenError)):
+            health_monitor.refresh()
+        error = error_panel(f"Error: {str(e)}")
+        yield *(error for _ in keys), f"Error: {str(e)} | trace {trace.id}"
+    finally:
+        if events is not None:
+            events.close()
+        trace.finish(outcome)
+
+
+def run_batch_file(batch_file: str, concurrency: int, rate_per_min: float, bypass_cache: bool):
+    """Run an uploaded scenario file, streaming progress and the growing results JSONL.
+
+    Results are stored under CACHE_DIR by input content, so uploading the
+    same file again resumes the earlier run.
+    """
+
+    if not batch_file:
+        yield "Upload a CSV or JSONL file of scenarios to start a batch run.", None
+        return
+
+    if health_monitor.is_down():
+        yield check_api_health(), None
+        return
+
+    with open(batch_file, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    output_path = os.path.join(CACHE_DIR, "batches", f"{digest}.results.jsonl")
+
+    stop = threading.Event()
+    try:
+        for progress in iter_batch(backend, batch_file, output_path, concurrency=int(concurrency),
+                                   rate_per_min=float(rate_per_min or 0), bypass_cache=bypass_cache,
+                                   stop=stop):
+            yield progress.summary(), output_path
+    except Exception as e:
+        yield f"Error: {str(e)}", output_path if os.path.exists(output_path) else None
+    finally:
+        # Cancelled or abandoned: stop starting new scenarios
+        stop.set()
+
+
+def run_sweep(crisis_text: str, grid_text: str, budget: float):
+    """Run a belief sensitivity sweep, re-rendering the heatmap and tables as each variant arrives.
+
+    Yields (report, status). The grid is parsed and planned locally first, so a
+    mistyped or over-budget grid is refused without calling the API.
+    """
+
+    import requests
+
+    if not crisis_text or not crisis_text.strip():
+        yield placeholder("Enter a crisis scenario and the beliefs to sweep."), "Awaiting input..."
+        return
+
+    budget = int(budget or 0) or None
+    try:
+        grid = parse_grid(grid_text)
+        beliefs = load_beliefs()
+        plan = plan_sweep(grid, {key: beliefs[key] for key in leader_keys() if key in beliefs}, budget) if beliefs else None
+    except ValueError as e:
+        yield error_panel(str(e), warning=True), f"Sweep not started: {e}"
+        return
+
+    if health_monitor.is_down():
+        yield backend_down_error(), check_api_health()
+        return
+
+    scenario = crisis_text.strip()
+    planned = f"{plan['calls']} agent calls for {plan['cells']} grid cells" if plan else "sweep"
+    yield placeholder(f"Submitting {planned}..."), "Submitting sweep..."
+
+    trace = Trace("sweep")
+    outcome = "cancelled"
+    events = None
+    try:
+        sweep, result = None, None
+        status = "Sweeping..."
+        events = backend.iter_sweep_events(scenario, grid, budget, trace.id)
+
+        for event in timed_events(trace, events):
+            if event.get('type') == 'plan':
+                sweep = {**event, 'variants': []}
+                status = f"0 of {event['calls']} agent calls complete"
+
+            elif event.get('type') == 'variant' and sweep is not None:
+                sweep['variants'].append(event)
+                continue
+
+            elif event.get('type') == 'progress':
+                status = f"{event['completed']} of {event['total']} agent calls complete"
+
+            elif event.get('type') == 'timing':
+                trace.server = event
+                continue
+
+            elif event.get('type') == 'sweep':
+                result = event
+                continue
+
+            if sweep is not None:
+                with trace.span("aggregate"):
+                    report = aggregate(sweep)
+                with trace.span("render"):
+                    html = format_sweep_report(report, scenario)
+                yield html, status
+
+        if result is None:
+            raise RuntimeError("Stream ended before the sweep was received")
+
+        with trace.span("aggregate"):
+            report = aggregate(result)
+        with trace.span("render"):
+            html = format_sweep_report(report, scenario)
+        outcome = "ok"
+        yield html, f"Sweep complete: {report['calls']} agent calls | {timing_summary(trace)}"
+
+    except BackendError as e:
+        outcome = "error"
+        yield error_panel(str(e)), f"Error: {e.status_code} | trace {trace.id}"
+    except Exception as e:
+        outcome = "error"
+        if isinstance(e, (requests.exceptions.ConnectionError, CircuitOpenError)):
+            health_monitor.refresh()
+        yield error_panel(f"Error: {str(e)}"), f"Error: {str(e)} | trace {trace.id}"
+    finally:
+        # Closing the stream disconnects from the API, which aborts the remaining agent calls
+        if events is not None:
+            events.close()
+        trace.finish(outcome)
+
+
+def simulate_crisis(crisis_text: str, rounds: float):
+    """Run a multi-round escalation simulation, streaming each round's dossiers as the leaders report.
+
+    Yields one panel per registered leader (latest round on top, earlier rounds
+    folded), then the escalation timeline and status.
+    """
+
+    import requests
+
+    keys = leader_keys()
+    if not crisis_text or not crisis_text.strip():
+        empty = placeholder("Enter a crisis scenario above to start a simulation.")
+        yield *(empty for _ in keys), empty, "Awaiting input..."
+        return
+
+    if health_monitor.is_down():
+        error = backend_down_error()
+        yield *(error for _ in keys), error, check_api_health()
+        return
+
+    rounds = int(rounds)
+    scenario = crisis_text.strip()
+    panels = {key: format_pending_dossier(key) for key in keys}
+    timeline = placeholder("The escalation timeline fills in as each round completes.")
+    yield *panels.values(), timeline, "Starting simulation..."
+
+    trace = Trace("simulation")
+    outcome = "cancelled"
+    events = None
+    try:
+        history, result = {}, None
+        status = "Starting simulation..."
+        events = backend.iter_simulation_events(scenario, rounds, trace.id)
+
+        for event in timed_events(trace, events):
+            if event.get('type') == 'round':
+                history[event['round']] = {'round': event['round'], 'agents': {}}
+                status = f"Round {event['round']} of {rounds}: 0 of {len(keys)} leaders reported"
+
+            elif event.get('type') == 'agent':
+                entry = history[event['round']]
+                entry['agents'][event['key']] = event['agent']
+                with trace.span("render"):
+                    panels[event['key']] = format_simulation_panel(event['key'], list(history.values()))
+                status = f"Round {event['round']} of {rounds}: {len(entry['agents'])} of {len(keys)} leaders reported"
+
+            elif event.get('type') == 'round_complete':
+                history[event['round']].update({k: v for k, v in event.items() if k != 'type'})
+                with trace.span("render"):
+                    timeline = format_simulation_timeline(
+                        scenario, [entry for entry in history.values() if 'positions' in entry], rounds)
+
+            elif event.get('type') == 'timing':
+                trace.server = event
+                continue
+
+            elif event.get('type') == 'simulation':
+                result = event
+                continue
+
+            yield *panels.values(), timeline, status
+
+        if result is None:
+            raise RuntimeError("Stream ended before the simulation was received")
+
+        with trace.span("render"):
+            dossiers = [format_simulation_panel(key, result['rounds']) for key in keys]
+            timeline = format_simulation_timeline(scenario, result['rounds'], rounds)
+        outcome = "ok"
+        yield (*dossiers, timeline,
+               f"Simulation complete: {rounds} rounds, risk {result['overall_risk']} | {timing_summary(trace)}")
+
+    except BackendError as e:
+        outcome = "error"
+        error = error_panel(str(e))
+        yield *(error for _ in keys), error, f"Error: {e.status_code} | trace {trace.id}"
+    except Exception as e:
+        outcome = "error"
+        if isinstance(e, (requests.exceptions.ConnectionError, CircuitOpenError)):
+            health_monitor.refresh()
+        error = error_panel(f"Error: {str(e)}")
+        yield *(error for _ in keys), error, f"Error: {str(e)} | trace {trace.id}"
+    finally:
+        # Closing the stream disconnects from the API, which aborts the round in progress
+        if events is not None:
+            events.close()
+        trace.finish(outcome)
+
+
+def check_api_health() -> str:
+    """Cached backend status; never blocks on the network."""
+    return health_monitor.status_line()
+
+
+def backend_down_error() -> str:
+    return error_panel(f"Backend at {API_URL} is unreachable. Retrying automatically; please try again shortly.")
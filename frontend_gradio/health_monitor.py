@@ -0,0 +1,104 @@
+"""
+AdversaryIQ - Backend Health Monitor
+
+Probes /api/health on a background thread and caches the result, so
+status boxes render instantly and analysis requests can fail fast while
+the backend is known to be down.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+HEALTH_CHECK_INTERVAL = float(os.environ.get("HEALTH_CHECK_INTERVAL", "15"))
+
+# Consecutive failed probes before the backend is treated as down
+HEALTH_FAILURE_THRESHOLD = int(os.environ.get("HEALTH_FAILURE_THRESHOLD", "2"))
+
+# Probes kept for latency/uptime history
+HEALTH_HISTORY_SIZE = 240
+
+
+class HealthMonitor:
+    """Periodic /api/health prober with cached status and probe history."""
+
+    def __init__(self, client, interval: float = HEALTH_CHECK_INTERVAL,
+                 failure_threshold: int = HEALTH_FAILURE_THRESHOLD):
+        self.client = client
+        self.interval = interval
+        self.failure_threshold = failure_threshold
+        self.history = deque(maxlen=HEALTH_HISTORY_SIZE)   # (timestamp, ok, latency_ms, detail)
+        self.consecutive_failures = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start probing in a daemon thread (idempotent)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+            self._thread.start()
+
+    def refresh(self):
+        """Ask the monitor to probe now instead of waiting for the next interval."""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self.probe()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def probe(self):
+        started = time.perf_counter()
+        try:
+            response = self.client.health()
+            ok = response.status_code == 200
+            detail = "" if ok else f"API Error: {response.status_code}"
+        except Exception as e:
+            ok = False
+            detail = type(e).__name__
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        with self._lock:
+            self.history.append((time.time(), ok, latency_ms, detail))
+            self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+
+    def is_down(self) -> bool:
+        """True once enough consecutive probes have failed."""
+        return self.consecutive_failures >= self.failure_threshold
+
+    def stats(self) -> dict:
+        with self._lock:
+            history = list(self.history)
+        if not history:
+            return {"probes": 0}
+
+        ok_latencies = sorted(latency for _, ok, latency, _ in history if ok)
+        last_time, last_ok, last_latency, last_detail = history[-1]
+        return {
+            "probes": len(history),
+            "uptime_pct": 100.0 * sum(1 for _, ok, _, _ in history if ok) / len(history),
+            "last_ok": last_ok,
+            "last_latency_ms": last_latency,
+            "last_detail": last_detail,
+            "last_checked": last_time,
+            "median_latency_ms": ok_latencies[len(ok_latencies) // 2] if ok_latencies else None,
+        }
+
+    def status_line(self) -> str:
+        """Cached status text for status_text / doc_status."""
+        base_url = self.client.base_url
+        stats = self.stats()
+        if stats["probes"] == 0:
+            return f"Checking API status... | {base_url}"
+
+        if stats["last_ok"]:
+            return (f"System Online | {base_url} | {stats['last_latency_ms']:.0f} ms"
+                    f" | uptime {stats['uptime_pct']:.1f}%")
+
+        age = time.time() - stats["last_checked"]
+        if stats["last_detail"].startswith("API Error"):
+            return f"{stats['last_detail']} | checked {age:.0f}s ago"
+        return f"Offline | {base_url} | checked {age:.0f}s ago"
@@ -0,0 +1,89 @@
+"""
+AdversaryIQ - Leader Registry
+
+The leaders shown in the UI (tabs, dossier headers, voices) come from the
+same profile JSON files the backend builds its agents from: every
+`<stem>_final_profile.json` with a matching `<stem>_beliefs.json`, using
+the profile's "registry" block. Mirrors backend/registry.js, so adding a
+leader is a data change on both sides.
+"""
+
+import json
+import os
+
+from profiles import PROFILE_DIR
+
+PROFILE_SUFFIX = "_final_profile.json"
+BELIEFS_SUFFIX = "_beliefs.json"
+
+
+def _leader_from_profile(stem: str, profile: dict) -> dict:
+    meta = profile.get("registry") or {}
+    display_name = meta.get("display_name") or stem.replace("_", " ").replace("-", " ").title()
+    return {
+        "key": meta.get("key") or stem,
+        "order": meta.get("order", float("inf")),
+        "name": display_name,
+        "short_name": meta.get("short_name") or display_name.split(" ")[-1],
+        "dossier_name": meta.get("dossier_name") or display_name.upper(),
+        "description": meta.get("description") or "Leadership Profile",
+        "color": meta.get("color") or "#1a1a1a",
+        "voice_id": meta.get("voice_id"),
+    }
+
+
+def load_leaders(directory: str = PROFILE_DIR) -> list:
+    """Leader metadata from local profile files, in registry order."""
+    if not os.path.isdir(directory):
+        return []
+
+    leaders = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(PROFILE_SUFFIX):
+            continue
+        stem = name[:-len(PROFILE_SUFFIX)]
+        if not os.path.exists(os.path.join(directory, stem + BELIEFS_SUFFIX)):
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            leaders.append(_leader_from_profile(stem, json.load(f)))
+
+    leaders.sort(key=lambda leader: (leader["order"], leader["key"]))
+    return leaders
+
+
+def fetch_leaders(client) -> list:
+    """Leader metadata from the backend's /api/leaders, for deployments without the profile files."""
+    try:
+        response = client.leaders()
+        if response.status_code == 200:
+            return response.json().get("leaders", [])
+    except Exception as e:
+        print(f"Could not load leaders from backend: {e}")
+    return []
+
+
+# Updated in place by use_leaders(), so `from leaders import LEADERS` stays valid
+LEADERS = []
+LEADERS_BY_KEY = {}
+
+
+def use_leaders(leaders: list):
+    """Replace the registry (e.g. with fetch_leaders() output) before the UI is built."""
+    LEADERS[:] = leaders
+    LEADERS_BY_KEY.clear()
+    LEADERS_BY_KEY.update((leader["key"], leader) for leader in LEADERS)
+
+
+def leader_keys() -> tuple:
+    return tuple(LEADERS_BY_KEY)
+
+
+use_leaders(load_leaders())
+
+
+def leader_info(key: str) -> dict:
+    """Metadata for key, or a neutral placeholder for an unknown leader."""
+    return LEADERS_BY_KEY.get(key) or {
+        "key": key, "name": key.title(), "short_name": key.title(), "dossier_name": key.upper(),
+        "description": "Leadership Profile", "color": "#1a1a1a", "voice_id": None,
+    }
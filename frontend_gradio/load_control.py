@@ -0,0 +1,89 @@
+"""
+AdversaryIQ - Queue Concurrency Controls
+
+Per-event-type concurrency limits for the Gradio queue, plus the
+bookkeeping needed to tell a waiting analyst where they stand instead
+of leaving them staring at a spinner until a timeout.
+"""
+
+import functools
+import inspect
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Requests waiting longer than this are assumed to have been dropped by the queue
+WAIT_EXPIRY_SECONDS = 600
+
+QUEUE_MAX_SIZE = int(os.environ.get("QUEUE_MAX_SIZE", "64"))
+
+
+class EventLoad:
+    """Running/waiting counts for one Gradio concurrency group."""
+
+    def __init__(self, name: str, label: str, limit: int):
+        self.name = name
+        self.label = label
+        self.limit = limit
+        self.active = 0
+        # ticket -> admission time, oldest first
+        self._waiting = OrderedDict()
+        self._tickets = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        while self._waiting and now - next(iter(self._waiting.values())) > WAIT_EXPIRY_SECONDS:
+            self._waiting.popitem(last=False)
+
+    def admit(self, previous: int = None) -> tuple:
+        """Register a submission: (queue position message, ticket for track()).
+
+        previous is the same session's last ticket for this group; a resubmit
+        supersedes it, so a submission that never ran stops counting at once.
+        """
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            self._waiting.pop(previous, None)
+            ticket = next(self._tickets)
+            self._waiting[ticket] = now
+            ahead = max(0, self.active + len(self._waiting) - self.limit)
+
+        if ahead == 0:
+            return f"Processing {self.label}...", ticket
+        return (f"Queued: position {ahead} "
+                f"({self.active} of {self.limit} {self.label} slots busy)"), ticket
+
+    def track(self, fn):
+        """Wrap a generator handler so its runtime counts against this group.
+
+        The wrapper takes the ticket from admit() as an extra first argument
+        and only retires that ticket.
+        """
+
+        @functools.wraps(fn)
+        def wrapper(ticket, *args, **kwargs):
+            with self._lock:
+                self._waiting.pop(ticket, None)
+                self.active += 1
+            try:
+                yield from fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.active -= 1
+
+        # Gradio reads the signature to fill in gr.Request and friends
+        signature = inspect.signature(fn)
+        ticket = inspect.Parameter("ticket", inspect.Parameter.POSITIONAL_OR_KEYWORD)
+        wrapper.__signature__ = signature.replace(parameters=[ticket, *signature.parameters.values()])
+        return wrapper
+
+
+crisis_load = EventLoad("crisis", "crisis analysis", int(os.environ.get("CRISIS_CONCURRENCY", "4")))
+document_load = EventLoad("document", "document analysis", int(os.environ.get("DOCUMENT_CONCURRENCY", "2")))
+voice_load = EventLoad("voice", "voice synthesis", int(os.environ.get("VOICE_CONCURRENCY", "6")))
+batch_load = EventLoad("batch", "batch run", int(os.environ.get("BATCH_CONCURRENCY", "1")))
+sweep_load = EventLoad("sweep", "belief sweep", int(os.environ.get("SWEEP_CONCURRENCY", "1")))
+simulation_load = EventLoad("simulation", "escalation simulation", int(os.environ.get("SIMULATION_CONCURRENCY", "2")))
@@ -0,0 +1,42 @@
+"""
+AdversaryIQ - Personality Profile Data
+
+Locates the leader profile/beliefs JSON files shared with the backend
+and fingerprints them, so cached results are invalidated whenever a
+profile changes.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+
+PROFILE_DIR = os.environ.get(
+    "PROFILE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "data", "personalities")
+)
+
+
+def profile_files() -> list:
+    """All *_final_profile.json / *_beliefs.json files, in stable order."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted(
+        os.path.join(PROFILE_DIR, name)
+        for name in os.listdir(PROFILE_DIR)
+        if name.endswith("_final_profile.json") or name.endswith("_beliefs.json")
+    )
+
+
+@lru_cache(maxsize=1)
+def profile_version() -> str:
+    """Short content hash over every profile and beliefs file."""
+    files = profile_files()
+    if not files:
+        return "unversioned"
+
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,624 @@
+"""
+AdversaryIQ - Dossier Rendering
+
+HTML for the classified-dossier pages: agent dossiers, document
+analyses, the executive summary, belief sweep reports and escalation
+simulation rounds. Pure string formatting with no
+Gradio or network dependency, so scripts can render saved assessments.
+
+Pages are built from templates compiled once at import. Styling lives in
+DOSSIER_CSS classes instead of inline styles, and every LLM-provided
+value is HTML-escaped. HTML rendered outside the app (e.g. exported
+reports) needs DOSSIER_CSS alongside it to look the same.
+"""
+
+import math
+import re
+from datetime import datetime
+from html import escape
+
+from leaders import leader_info, leader_keys
+
+# Dossier Theme CSS
+DOSSIER_CSS = """
+@import url('https://fonts.googleapis.com/css2?family=Courier+Prime:wght@400;700&family=Special+Elite&display=swap');
+
+.gradio-container {
+    background-color: #f5f2e8 !important;
+    background-image:
+        repeating-linear-gradient(
+            0deg,
+            transparent,
+            transparent 31px,
+            rgba(0,0,0,0.025) 31px,
+            rgba(0,0,0,0.025) 32px
+        ) !important;
+    font-family: 'Courier Prime', 'Courier New', Courier, monospace !important;
+}
+
+.contain {
+    max-width: 900px !important;
+    margin: 0 auto !important;
+}
+
+.voice-btn {
+    background: #8B4513 !important;
+    color: white !important;
+    font-size: 11px !important;
+    letter-spacing: 1px !important;
+}
+
+/* Placeholders and errors shown in dossier slots */
+.aiq-placeholder { padding: 40px; text-align: center; color: #888; font-style: italic; }
+.aiq-error { padding: 20px; border: 2px solid #8b0000; color: #8b0000; }
+.aiq-error.aiq-warning { border-color: #8B4513; color: #8B4513; }
+.aiq-similar { padding: 10px 14px; border: 1px dashed #8B4513; color: #8B4513; font-size: 12px;
+               font-family: 'Courier Prime', monospace; }
+
+/* Dossier page (agent and document analyses). Two-class selectors so the
+   rules win over Gradio's .prose element styles. */
+.aiq-dossier { background: #fffefa; border: 1px solid #888; padding: 36px; position: relative;
+               font-family: 'Courier Prime', 'Courier New', monospace; box-shadow: 3px 3px 10px rgba(0,0,0,0.08); }
+.aiq-dossier.aiq-empty { text-align: center; color: #888; box-shadow: none; }
+.aiq-dossier .aiq-fold { position: absolute; bottom: 0; right: 0; width: 40px; height: 40px;
+                         background: linear-gradient(135deg, #fffefa 50%, #e8e4d8 50%);
+                         box-shadow: -2px -2px 4px rgba(0,0,0,0.05); }
+.aiq-dossier .aiq-head { border-bottom: 1px solid #ccc; padding-bottom: 16px; margin-bottom: 28px; }
+.aiq-dossier .aiq-head-row { margin-bottom: 6px; }
+.aiq-dossier .aiq-label { font-size: 10px; font-weight: bold; letter-spacing: 2px; margin-right: 8px; }
+.aiq-dossier .aiq-subject { font-size: 13px; text-decoration: underline; text-underline-offset: 3px; }
+.aiq-dossier .aiq-active { font-size: 11px; color: #006400; font-weight: bold; letter-spacing: 1px; }
+.aiq-dossier .aiq-sections { display: flex; flex-direction: column; gap: 28px; }
+.aiq-dossier .aiq-sections.aiq-tight { gap: 24px; }
+.aiq-dossier .aiq-heading { font-size: 11px; font-weight: bold; letter-spacing: 2px; margin: 0 0 10px 0;
+                            text-decoration: underline; text-underline-offset: 3px; }
+.aiq-dossier .aiq-heading.aiq-classified { color: #8b0000; }
+.aiq-dossier .aiq-text { font-size: 13px; line-height: 2; color: #1a1a1a; margin: 0; }
+.aiq-dossier .aiq-text.aiq-muted { color: #444; }
+.aiq-dossier .aiq-callout { padding: 16px; border-left: 3px solid #8b0000; background: rgba(139,0,0,0.05); }
+.aiq-dossier .aiq-callout .aiq-heading { text-decoration: none; color: #8b0000; }
+.aiq-dossier .aiq-callout.aiq-brown { border-left-color: #8B4513; background: rgba(139,69,19,0.05); }
+.aiq-dossier .aiq-callout.aiq-brown .aiq-heading { color: #8B4513; }
+.aiq-dossier .aiq-stamp-box { background: #f5f2e8; padding: 12px; border: 1px dashed #888; }
+.aiq-dossier .aiq-stamp-box .aiq-label { color: #006400; }
+.aiq-dossier .aiq-note { font-size: 12px; }
+.aiq-dossier .aiq-footer { display: flex; justify-content: space-between; margin-top: 36px; padding-top: 16px;
+                           border-top: 1px solid #ccc; font-size: 10px; color: #888; letter-spacing: 1px; }
+
+/* Executive summary */
+.aiq-summary { background: #fffefa; border: 2px solid #1a1a1a; padding: 28px; font-family: 'Courier Prime', monospace; }
+.aiq-summary .aiq-block { margin-bottom: 28px; }
+.aiq-summary .aiq-bluf-title { font-size: 11px; font-weight: bold; letter-spacing: 3px; text-decoration: underline;
+                               text-underline-offset: 4px; display: block; margin-bottom: 16px; }
+.aiq-summary .aiq-text { font-size: 13px; line-height: 2; margin: 0; }
+.aiq-summary .aiq-findings { margin-bottom: 28px; padding: 16px; background: #f5f2e8; border: 1px solid #ccc; }
+.aiq-summary .aiq-findings-title { font-size: 10px; font-weight: bold; letter-spacing: 2px; display: block; margin-bottom: 12px; }
+.aiq-summary .aiq-findings-list { font-size: 12px; line-height: 1.8; }
+.aiq-summary .aiq-finding { margin-bottom: 8px; }
+.aiq-summary .aiq-none { color: #888; }
+.aiq-summary .aiq-confidence { margin-bottom: 28px; text-align: center; padding: 12px; border: 1px solid #1a1a1a; }
+.aiq-summary .aiq-caption { font-size: 10px; letter-spacing: 2px; color: #666; }
+.aiq-summary .aiq-risk { font-size: 14px; font-weight: bold; letter-spacing: 2px; margin-left: 12px; color: #8b0000; }
+.aiq-summary .aiq-risk.aiq-risk-low { color: #006400; }
+.aiq-summary .aiq-risk.aiq-risk-medium { color: #8B4513; }
+.aiq-summary .aiq-signature { display: flex; justify-content: space-between; align-items: flex-end;
+                              padding-top: 20px; border-top: 1px dashed #ccc; }
+.aiq-summary .aiq-sign { display: flex; align-items: flex-end; gap: 8px; }
+.aiq-summary .aiq-sign-x { font-size: 18px; font-weight: bold; }
+.aiq-summary .aiq-sign-line { border-bottom: 1px solid #1a1a1a; width: 200px; padding-bottom: 6px; }
+.aiq-summary .aiq-small { font-size: 9px; color: #888; letter-spacing: 2px; }
+.aiq-summary .aiq-date { text-align: right; }
+.aiq-summary .aiq-date .aiq-small { display: block; margin-bottom: 4px; }
+.aiq-summary .aiq-date-value { font-size: 12px; border-bottom: 1px solid #1a1a1a; padding-bottom: 4px; }
+.aiq-summary .aiq-estimate { width: 100%; border-collapse: collapse; font-size: 12px; margin-bottom: 28px; }
+.aiq-summary .aiq-estimate td { padding: 6px 8px; border-bottom: 1px solid #ccc; }
+.aiq-summary .aiq-estimate .aiq-risk { margin-left: 0; font-size: 12px; }
+.aiq-summary .aiq-reconcile { margin-top: 8px; font-size: 11px; color: #666; }
+
+/* Belief sweep: heatmap cells shaded by mean leader risk (0 Low .. 2 High, in half steps) */
+.aiq-summary .aiq-estimate th { padding: 6px 8px; border-bottom: 1px solid #1a1a1a; font-size: 10px;
+                                letter-spacing: 1px; text-align: left; }
+.aiq-summary .aiq-estimate small { color: #666; }
+.aiq-summary .aiq-heatmap { border-collapse: collapse; font-size: 11px; margin: 0 0 28px 0; }
+.aiq-summary .aiq-heatmap th { padding: 6px 8px; font-size: 10px; letter-spacing: 1px; }
+.aiq-summary .aiq-heatmap td { padding: 8px; min-width: 56px; text-align: center; border: 2px solid #fffefa; }
+.aiq-summary .aiq-heat-0 { background: rgba(0,100,0,0.35); }
+.aiq-summary .aiq-heat-1 { background: rgba(0,100,0,0.15); }
+.aiq-summary .aiq-heat-2 { background: rgba(139,69,19,0.25); }
+.aiq-summary .aiq-heat-3 { background: rgba(139,0,0,0.25); }
+.aiq-summary .aiq-heat-4 { background: rgba(139,0,0,0.5); color: #fffefa; }
+.aiq-summary .aiq-heat-none { background: #f5f2e8; color: #888; }
+
+/* Escalation simulation: a banner per round above its dossier, earlier rounds folded */
+.aiq-round { padding: 8px 12px; margin-bottom: 8px; border: 1px solid #1a1a1a; background: #f5f2e8;
+             font-family: 'Courier Prime', monospace; font-size: 11px; letter-spacing: 1px; }
+.aiq-round .aiq-risk { font-weight: bold; color: #8b0000; }
+.aiq-round .aiq-risk.aiq-risk-low { color: #006400; }
+.aiq-round .aiq-risk.aiq-risk-medium { color: #8B4513; }
+.aiq-round-past { margin-top: 12px; }
+.aiq-round-past > summary { cursor: pointer; list-style: none; }
+"""
+
+
+# ===== TEMPLATE ENGINE =====
+
+_FIELD = re.compile(r"\{(\w+)\}")
+
+
+def _escape_text(text: str) -> str:
+    return escape(text, quote=False)
+
+
+class DossierTemplate:
+    """HTML template compiled once into a Python f-string function.
+
+    Whitespace between tags is collapsed at compile time. `{name}` is
+    HTML-escaped on render and may only appear in text content (so quotes
+    need no escaping); `{name_html}` is inserted as-is and must already be
+    rendered markup or a trusted attribute value.
+    """
+
+    def __init__(self, source: str):
+        source = re.sub(r">\s+<", "><", source.strip())
+        source = re.sub(r"\s+", " ", source)
+        parts = _FIELD.split(source)
+        self.fields = parts[1::2]
+
+        for i in range(1, len(parts), 2):
+            before = "".join(parts[:i:2])
+            if not parts[i].endswith("_html") and before.rfind("<") > before.rfind(">"):
+                raise ValueError(f"Escaped field {{{parts[i]}}} is inside a tag; use a *_html field")
+
+        # Literal text with braces doubled, fields as escape() calls, in one f-string
+        body = "".join(
+            part.replace("{", "{{").replace("}", "}}") if i % 2 == 0
+            else "{%s}" % (part if part.endswith("_html") else f"_escape(str({part}))")
+            for i, part in enumerate(parts)
+        )
+        args = ", ".join(dict.fromkeys(self.fields))
+        code = f"def render(*, {args}):\n    return f{body!r}\n" if args else f"def render():\n    return {body!r}\n"
+        namespace = {"_escape": _escape_text}
+        exec(compile(code, "<dossier template>", "exec"), namespace)
+        self.render = namespace["render"]
+
+
+PLACEHOLDER = DossierTemplate('<div class="aiq-placeholder">{text}</div>')
+ERROR = DossierTemplate('<div class="aiq-error">{text}</div>')
+WARNING = DossierTemplate('<div class="aiq-error aiq-warning">{text}</div>')
+
+SIMILAR_NOTICE = DossierTemplate(
+    '<div class="aiq-similar"><b>A {percent} similar analysis exists from {when}.</b> &ldquo;{preview}&hellip;&rdquo;</div>'
+)
+
+AGENT_EMPTY = DossierTemplate("""
+    <div class="aiq-dossier aiq-empty">No analysis data available for {name}.</div>
+""")
+
+AGENT_DOSSIER = DossierTemplate("""
+    <div class="aiq-dossier">
+        <div class="aiq-fold"></div>
+        <div class="aiq-head">
+            <div class="aiq-head-row">
+                <span class="aiq-label">SUBJECT:</span>
+                <span class="aiq-subject">{name} — {description}</span>
+            </div>
+            <div>
+                <span class="aiq-label">STATUS:</span>
+                <span class="aiq-active">PROFILE ACTIVE</span>
+            </div>
+        </div>
+        <div class="aiq-sections">
+            <div>
+                <h4 class="aiq-heading">A. PUBLIC RESPONSE</h4>
+                <p class="aiq-text">{public_response}</p>
+            </div>
+            <div>
+                <h4 class="aiq-heading aiq-classified">B. PRIVATE ACTIONS [CLASSIFIED]</h4>
+                <p class="aiq-text">{private_actions}</p>
+            </div>
+            <div>
+                <h4 class="aiq-heading">C. PSYCHOLOGICAL ASSESSMENT</h4>
+                <p class="aiq-text aiq-muted">{psychological_reasoning}</p>
+            </div>
+        </div>
+        <div class="aiq-footer">
+            <span>Page {page} of {pages}</span>
+            <span>SECRET // NOFORN</span>
+        </div>
+    </div>
+""")
+
+DOCUMENT_DOSSIER = DossierTemplate("""
+    <div class="aiq-dossier">
+        <div class="aiq-fold"></div>
+        <div class="aiq-head">
+            <span class="aiq-label">ANALYST:</span>
+            <span class="aiq-subject">{name}</span>
+        </div>
+        <div class="aiq-sections aiq-tight">
+            <div>
+                <h4 class="aiq-heading">A. DOCUMENT INTERPRETATION</h4>
+                <p class="aiq-text">{document_interpretation}</p>
+            </div>
+            <div class="aiq-callout">
+                <h4 class="aiq-heading">B. HIDDEN INTENTIONS DETECTED</h4>
+                <p class="aiq-text">{hidden_intentions}</p>
+            </div>
+            <div class="aiq-callout aiq-brown">
+                <h4 class="aiq-heading">C. PSYCHOLOGICAL TACTICS</h4>
+                <p class="aiq-text">{psychological_tactics}</p>
+            </div>
+            <div>
+                <h4 class="aiq-heading">D. RECOMMENDED RESPONSE</h4>
+                <p class="aiq-text">{your_response}</p>
+            </div>
+            <div class="aiq-stamp-box">
+                <span class="aiq-label">AUTHENTICITY ASSESSMENT:</span>
+                <span class="aiq-note">{authenticity_assessment}</span>
+            </div>
+        </div>
+        <div class="aiq-footer">
+            <span>DOCUMENT ANALYSIS</span>
+            <span>CONFIDENTIAL</span>
+        </div>
+    </div>
+""")
+
+FINDING = DossierTemplate('<div class="aiq-finding"><b>{number}.</b> {text}</div>')
+
+EXECUTIVE_SUMMARY = DossierTemplate("""
+    <div class="aiq-summary">
+        <div class="aiq-block">
+            <span class="aiq-bluf-title">BOTTOM LINE UP FRONT (BLUF)</span>
+            <p class="aiq-text">{bluf}</p>
+        </div>
+        <div class="aiq-findings">
+            <span class="aiq-findings-title">KEY INTELLIGENCE FINDINGS:</span>
+            <div class="aiq-findings-list">{findings_html}</div>
+        </div>
+        <div class="aiq-confidence">
+            <span class="aiq-caption">ASSESSMENT CONFIDENCE:</span>
+            <span class="aiq-risk {risk_class_html}">{confidence}</span>
+            {reconciliation_html}
+        </div>
+        <div class="aiq-signature">
+            <div class="aiq-sign">
+                <span class="aiq-sign-x">X</span>
+                <div>
+                    <div class="aiq-sign-line"></div>
+                    <span class="aiq-small">ANALYZING OFFICER</span>
+                </div>
+            </div>
+            <div class="aiq-date">
+                <span class="aiq-small">DATE</span>
+                <span class="aiq-date-value">{timestamp}</span>
+            </div>
+        </div>
+    </div>
+""")
+
+PROVISIONAL_SUMMARY = DossierTemplate("""
+    <div class="aiq-summary">
+        <div class="aiq-block">
+            <span class="aiq-bluf-title">PROVISIONAL ESTIMATE (LOCAL MODEL, PRE-LLM)</span>
+            <p class="aiq-text">{crisis_type} &middot; intensity {intensity} &middot;
+                scored from profile parameters in {elapsed} ms. Agents are still reporting;
+                the executive summary replaces this estimate.</p>
+        </div>
+        <table class="aiq-estimate">{rows_html}</table>
+        <div class="aiq-confidence">
+            <span class="aiq-caption">PROVISIONAL RISK:</span>
+            <span class="aiq-risk {risk_class_html}">{risk}</span>
+        </div>
+    </div>
+""")
+
+ESTIMATE_ROW = DossierTemplate(
+    '<tr><td><b>{name}</b></td><td><span class="aiq-risk {risk_class_html}">{level}</span> ({score})</td>'
+    '<td>{drivers}</td></tr>'
+)
+
+RECONCILIATION = DossierTemplate('<div class="aiq-reconcile">Local pre-LLM estimate: {local} &mdash; {verdict}</div>')
+
+SWEEP_REPORT = DossierTemplate("""
+    <div class="aiq-summary">
+        <div class="aiq-block">
+            <span class="aiq-bluf-title">BELIEF SENSITIVITY SWEEP</span>
+            <p class="aiq-text">{scenario}</p>
+        </div>
+        <span class="aiq-findings-title">{heatmap_title}</span>
+        <table class="aiq-heatmap">{heatmap_html}</table>
+        {tables_html}
+        <div class="aiq-reconcile">{footer}</div>
+    </div>
+""")
+
+HEAT_ROW = DossierTemplate('<tr><th>{label}</th>{cells_html}</tr>')
+HEAT_HEADER = DossierTemplate('<th>{label}</th>')
+HEAT_CELL = DossierTemplate('<td class="{heat_class_html}">{level}<br>{score}</td>')
+
+SENSITIVITY_TABLE = DossierTemplate("""
+    <span class="aiq-findings-title">SENSITIVITY TO {parameter}</span>
+    <table class="aiq-estimate">
+        <tr><th>LEADER (CURRENT)</th>{headers_html}<th>SWING</th></tr>
+        {rows_html}
+    </table>
+""")
+
+SENSITIVITY_ROW = DossierTemplate('<tr><td><b>{name}</b> ({baseline})</td>{cells_html}<td>{swing}</td></tr>')
+SENSITIVITY_CELL = DossierTemplate(
+    '<td><span class="aiq-risk {risk_class_html}">{level}</span> {score}<br><small>{phase}</small></td>'
+)
+
+ROUND_BANNER = DossierTemplate(
+    '<div class="aiq-round"><b>ROUND {round}</b> &middot; {step} &middot; '
+    '<span class="aiq-risk {risk_class_html}">{risk}</span></div>'
+)
+ROUND_PAST = DossierTemplate('<details class="aiq-round-past"><summary>{banner_html}</summary>{dossier_html}</details>')
+
+SIMULATION_TIMELINE = DossierTemplate("""
+    <div class="aiq-summary">
+        <div class="aiq-block">
+            <span class="aiq-bluf-title">ESCALATION TIMELINE</span>
+            <p class="aiq-text">{scenario}</p>
+        </div>
+        <table class="aiq-estimate">
+            <tr><th>LEADER</th>{headers_html}</tr>
+            {rows_html}
+        </table>
+        <div class="aiq-confidence">
+            <span class="aiq-caption">RISK AFTER ROUND {round} OF {rounds}:</span>
+            <span class="aiq-risk {risk_class_html}">{risk}</span>
+        </div>
+        <div class="aiq-reconcile">{footer}</div>
+    </div>
+""")
+
+TIMELINE_ROW = DossierTemplate('<tr><td><b>{name}</b></td>{cells_html}</tr>')
+TIMELINE_CELL = DossierTemplate('<td>{step}<br><span class="aiq-risk {risk_class_html}">{risk}</span></td>')
+
+NO_FINDINGS = '<em class="aiq-none">No specific findings recorded.</em>'
+
+RISK_CLASSES = {'Low': 'aiq-risk-low', 'Medium': 'aiq-risk-medium'}
+
+SCORE_LEVELS = ('Low', 'Medium', 'High')
+
+
+# ===== PAGES =====
+
+def placeholder(text: str) -> str:
+    """Grey italic message for an empty or pending dossier slot."""
+    return PLACEHOLDER.render(text=text)
+
+
+def error_panel(text: str, warning: bool = False) -> str:
+    """Red (or brown, for retryable conditions) bordered error message."""
+    return (WARNING if warning else ERROR).render(text=text)
+
+
+def format_agent_dossier(agent_key: str, agent_data: dict) -> str:
+    """Format agent response as a classified dossier page."""
+
+    info = leader_info(agent_key)
+
+    if not agent_data:
+        return AGENT_EMPTY.render(name=info['dossier_name'])
+
+    keys = leader_keys()
+    return AGENT_DOSSIER.render(
+        name=info['dossier_name'],
+        description=info['description'],
+        public_response=agent_data.get('public_response', 'Awaiting analysis...'),
+        private_actions=agent_data.get('private_actions', 'Awaiting analysis...'),
+        psychological_reasoning=agent_data.get('psychological_reasoning', 'Awaiting analysis...'),
+        page=keys.index(agent_key) + 1 if agent_key in keys else 1,
+        pages=max(len(keys), 1),
+    )
+
+
+def format_document_dossier(agent_key: str, agent_data: dict) -> str:
+    """Format document analysis as a classified dossier page."""
+
+    if not agent_data:
+        return placeholder("No analysis available.")
+
+    return DOCUMENT_DOSSIER.render(
+        name=leader_info(agent_key)['dossier_name'],
+        document_interpretation=agent_data.get('document_interpretation', 'N/A'),
+        hidden_intentions=agent_data.get('hidden_intentions', 'None detected'),
+        psychological_tactics=agent_data.get('psychological_tactics', 'None identified'),
+        your_response=agent_data.get('your_response', 'No response formulated'),
+        authenticity_assessment=agent_data.get('authenticity_assessment', 'Unable to assess'),
+    )
+
+
+def format_executive_summary(data: dict, reconciliation: dict = None) -> str:
+    """Format executive summary as classified document.
+
+    reconciliation (risk_estimate.reconcile) adds how the local pre-LLM estimate compared.
+    """
+
+    confidence = data.get('overall_risk', 'MEDIUM')
+    findings = "".join(
+        FINDING.render(number=i, text=insight)
+        for i, insight in enumerate(data.get('key_insights', []), 1)
+    )
+
+    return EXECUTIVE_SUMMARY.render(
+        bluf=data.get('bluf', 'Multi-agent psychological analysis reveals divergent national interests.'),
+        findings_html=findings or NO_FINDINGS,
+        risk_class_html=RISK_CLASSES.get(confidence, 'aiq-risk-high'),
+        confidence=confidence,
+        reconciliation_html=format_reconciliation(reconciliation) if reconciliation else "",
+        timestamp=datetime.now().strftime("%d %B %Y"),
+    )
+
+
+def format_reconciliation(reconciliation: dict) -> str:
+    verdicts = {"match": "agrees with the agents", "under": "the agents rate it higher",
+                "over": "the agents rate it lower"}
+    return RECONCILIATION.render(local=reconciliation["local"], verdict=verdicts[reconciliation["agreement"]])
+
+
+def format_provisional_summary(estimate: dict) -> str:
+    """Local risk estimate shown in the summary slot while the agents are running."""
+
+    rows = "".join(
+        ESTIMATE_ROW.render(
+            name=leader_info(key)['short_name'].upper(),
+            risk_class_html=RISK_CLASSES.get(leader['level'], 'aiq-risk-high'),
+            level=leader['level'],
+            score=f"{leader['score']:.2f}",
+            drivers=", ".join(leader['drivers']),
+        )
+        for key, leader in estimate['leaders'].items() if key in leader_keys()
+    )
+    crisis_type = (estimate['crisis_type'] or "unclassified").replace("_", " ").upper()
+    return PROVISIONAL_SUMMARY.render(
+        crisis_type=crisis_type,
+        intensity=f"{estimate['intensity']:.2f}",
+        elapsed=f"{estimate['elapsed_ms']:.1f}",
+        rows_html=rows,
+        risk_class_html=RISK_CLASSES.get(estimate['overall_risk'], 'aiq-risk-high'),
+        risk=estimate['overall_risk'],
+    )
+
+
+def _score_level(score: float) -> str:
+    return SCORE_LEVELS[int(round(score))]
+
+
+def format_sweep_report(report: dict, scenario: str) -> str:
+    """Heatmap and per-belief sensitivity tables for sweep.aggregate output (partial or final)."""
+
+    parameters, values = report['parameters'], report['values']
+    finished = report['completed'] >= report['calls']
+    rows, columns = values[parameters[0]], values[parameters[1]] if len(parameters) > 1 else [None]
+
+    def heat_cell(level: int, mean: float) -> str:
+        if level < 0:
+            return HEAT_CELL.render(heat_class_html='aiq-heat-none', level='n/a' if finished else '...', score='')
+        return HEAT_CELL.render(heat_class_html=f'aiq-heat-{int(round(mean * 2))}', level=SCORE_LEVELS[level],
+                                score=f"{mean:.2f}")
+
+    headers = "".join(HEAT_HEADER.render(label=f"{value:g}" if value is not None else "OVERALL") for value in columns)
+    heatmap = HEAT_ROW.render(label=" \\ ".join(parameters), cells_html=headers) + "".join(
+        HEAT_ROW.render(label=f"{row:g}", cells_html="".join(
+            heat_cell(int(report['cell_level'][i][j]), float(report['cell_mean'][i][j]))
+            for j in range(len(columns))))
+        for i, row in enumerate(rows)
+    )
+
+    tables = []
+    for parameter in parameters:
+        table = report['table'][parameter]
+        body = []
+        for l, key in enumerate(report['leaders']):
+            baseline = report['baseline'].get(key, {})
+            # Leaders without this belief answer the same at every value; nothing to show
+            if parameter not in baseline:
+                continue
+            cells = "".join(
+                SENSITIVITY_CELL.render(risk_class_html=RISK_CLASSES.get(_score_level(mean), 'aiq-risk-high'),
+                                        level=_score_level(mean), score=f"{mean:.2f}", phase=phase)
+                if not math.isnan(mean) else SENSITIVITY_CELL.render(
+                    risk_class_html='', level='', score='n/a' if finished else '...', phase='')
+                for mean, phase in zip(map(float, table['mean'][l]), table['phase'][l])
+            )
+            swing = float(table['swing'][l])
+            body.append(SENSITIVITY_ROW.render(name=leader_info(key)['short_name'].upper(),
+                                               baseline=f"{baseline[parameter]:g}", cells_html=cells,
+                                               swing="" if math.isnan(swing) else f"{swing:.2f}"))
+        tables.append(SENSITIVITY_TABLE.render(
+            parameter=parameter.upper(),
+            headers_html="".join(HEAT_HEADER.render(label=f"{value:g}") for value in values[parameter]),
+            rows_html="".join(body),
+        ))
+
+    usage = report['usage']
+    cached = usage['cached_tokens'] / usage['prompt_tokens'] if usage['prompt_tokens'] else 0
+    footer = (f"{report['completed']} of {report['calls']} agent calls"
+              + (f", {report['failed']} without a usable risk level" if report['failed'] else "")
+              + f" · {usage['prompt_tokens']:,} prompt tokens ({cached:.0%} cached), "
+                f"{usage['completion_tokens']:,} completion · scores: Low 0, Medium 1, High 2; "
+                "swing is the largest change in a leader's mean score across the values")
+
+    return SWEEP_REPORT.render(
+        scenario=scenario,
+        heatmap_title=f"OVERALL RISK BY {' × '.join(parameters).upper()} (MEAN LEADER SCORE)",
+        heatmap_html=heatmap,
+        tables_html="".join(tables),
+        footer=footer,
+    )
+
+
+def format_simulation_panel(agent_key: str, rounds: list) -> str:
+    """One leader's simulation dossiers, newest round first with earlier rounds folded.
+
+    rounds are the simulation's round entries ({"round", "agents"}) received so far.
+    """
+
+    pages = []
+    for entry in sorted(rounds, key=lambda entry: -entry['round']):
+        agent = entry['agents'].get(agent_key)
+        if not agent:
+            continue
+        risk = agent.get('escalation_risk', 'Unknown')
+        banner = ROUND_BANNER.render(round=entry['round'], step=agent.get('ladder_step') or 'no reported move',
+                                     risk_class_html=RISK_CLASSES.get(risk, 'aiq-risk-high'), risk=risk)
+        dossier = format_agent_dossier(agent_key, agent)
+        pages.append(banner + dossier if not pages else ROUND_PAST.render(banner_html=banner, dossier_html=dossier))
+    return "".join(pages) or format_pending_dossier(agent_key)
+
+
+def format_simulation_timeline(scenario: str, rounds: list, total_rounds: int) -> str:
+    """Ladder rung and risk per leader and round, with the overall risk after the latest completed round.
+
+    rounds are completed round entries ({"round", "overall_risk", "positions", "usage"}).
+    """
+
+    rounds = sorted(rounds, key=lambda entry: entry['round'])
+    latest = rounds[-1]
+    rows = "".join(
+        TIMELINE_ROW.render(name=leader_info(key)['short_name'].upper(), cells_html="".join(
+            TIMELINE_CELL.render(step=(position or {}).get('step') or '—',
+                                 risk_class_html=RISK_CLASSES.get((position or {}).get('risk'), 'aiq-risk-high'),
+                                 risk=(position or {}).get('risk') or '')
+            for position in (entry['positions'].get(key) for entry in rounds)
+        ))
+        for key in leader_keys() if key in latest['positions']
+    )
+    overall = TIMELINE_ROW.render(name="OVERALL", cells_html="".join(
+        TIMELINE_CELL.render(step="", risk_class_html=RISK_CLASSES.get(entry['overall_risk'], 'aiq-risk-high'),
+                             risk=entry['overall_risk'])
+        for entry in rounds
+    ))
+    tokens = [entry.get('usage', {}).get('prompt_tokens', 0) for entry in rounds]
+    cached = sum(entry.get('usage', {}).get('cached_tokens', 0) for entry in rounds)
+    footer = (f"Prompt tokens per round: {' · '.join(f'{count:,}' for count in tokens)}"
+              + (f" ({cached / sum(tokens):.0%} cached)" if sum(tokens) else ""))
+
+    return SIMULATION_TIMELINE.render(
+        scenario=scenario,
+        headers_html="".join(HEAT_HEADER.render(label=f"R{entry['round']}") for entry in rounds),
+        rows_html=rows + overall,
+        round=latest['round'],
+        rounds=total_rounds,
+        risk_class_html=RISK_CLASSES.get(latest['overall_risk'], 'aiq-risk-high'),
+        risk=latest['overall_risk'],
+        footer=footer,
+    )
+
+
+def format_similar_notice(match: dict) -> str:
+    """Offer to load a near-duplicate scenario's cached analysis."""
+
+    created = datetime.fromtimestamp(match["created"])
+    when = created.strftime("%H:%M") if created.date() == datetime.now().date() else created.strftime("%d %b %H:%M")
+    return SIMILAR_NOTICE.render(percent=f"{match['similarity']:.0%}", when=when, preview=match["preview"])
+
+
+def format_pending_dossier(agent_key: str) -> str:
+    """Placeholder shown while an agent's analysis is still in flight."""
+
+    return placeholder(f"{leader_info(agent_key)['short_name'].upper()} analysis in progress...")
@@ -0,0 +1,233 @@
+"""
+AdversaryIQ - Frontend Resilience
+
+Circuit breaker and retry budget for the frontend → Node API hop.
+Retries use exponential backoff with jitter and are limited to failures
+where the request never reached the backend (connection refused or timed
+out while connecting) or it answered 502/503/504, so a retry never
+re-spends LLM calls that already ran.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+
+RETRY_MAX_ATTEMPTS = int(os.environ.get("RETRY_MAX_ATTEMPTS", "2"))
+RETRY_BASE_DELAY = float(os.environ.get("RETRY_BASE_DELAY", "0.25"))
+RETRY_MAX_DELAY = float(os.environ.get("RETRY_MAX_DELAY", "4"))
+RETRY_BUDGET_RATIO = float(os.environ.get("RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN = int(os.environ.get("RETRY_BUDGET_MIN", "3"))
+RETRY_BUDGET_WINDOW = 10.0
+
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.environ.get("BREAKER_RESET_SECONDS", "30"))
+
+RETRYABLE_STATUS = {502, 503, 504}
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised without touching the network while the breaker is open."""
+
+
+class CircuitBreaker:
+    """closed → open after N consecutive failures → half-open probe after a cool-down."""
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Free a half-open probe slot after an outcome that says nothing about upstream health."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
+
+
+class RetryBudget:
+    """Caps retries at a fraction of recent requests so outages are not amplified."""
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, min_retries: int = RETRY_BUDGET_MIN,
+                 window: float = RETRY_BUDGET_WINDOW):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self.exhausted = 0
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self):
+        with self._lock:
+            self._requests.append(time.monotonic())
+
+    def try_retry(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            if len(self._retries) >= max(self.min_retries, len(self._requests) * self.ratio):
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._prune(time.monotonic())
+            return {"window_requests": len(self._requests), "window_retries": len(self._retries),
+                    "exhausted": self.exhausted}
+
+
+def backoff_delay(attempt: int) -> float:
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt))
+    return delay / 2 + random.random() * delay / 2
+
+
+def _never_connected(error: BaseException) -> bool:
+    """True if a NewConnectionError (refused, unreachable, DNS) is at the root of error."""
+    from urllib3.exceptions import NewConnectionError
+
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, NewConnectionError):
+            return True
+        # requests wraps urllib3's MaxRetryError, which keeps the underlying failure in .reason
+        reason = getattr(error, "reason", None)
+        if isinstance(reason, BaseException):
+            error = reason
+        elif error.args and isinstance(error.args[0], BaseException):
+            error = error.args[0]
+        else:
+            error = error.__cause__ or error.__context__
+    return False
+
+
+def is_retryable_exception(error: Exception) -> bool:
+    """Only failures where the request never reached the backend.
+
+    A connection dropped after the request was sent (RemoteDisconnected, a
+    reset mid-response) is not retried: the backend may already be paying
+    for the LLM calls.
+    """
+    import requests
+
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    return isinstance(error, requests.exceptions.ConnectionError) and _never_connected(error)
+
+
+def is_request_exception(error: Exception) -> bool:
+    import requests
+
+    return isinstance(error, requests.exceptions.RequestException)
+
+
+class Upstream:
+    """Breaker + retry budget + counters guarding one upstream."""
+
+    def __init__(self, name: str, max_retries: int = RETRY_MAX_ATTEMPTS):
+        self.name = name
+        self.max_retries = max_retries
+        self.breaker = CircuitBreaker(name)
+        self.budget = RetryBudget()
+        self.counters = {"calls": 0, "failures": 0, "retries": 0}
+        # Handlers call in from several Gradio worker threads
+        self._counters_lock = threading.Lock()
+
+    def _count(self, counter: str):
+        with self._counters_lock:
+            self.counters[counter] += 1
+
+    def call_once(self, send):
+        """Like call(), without retries."""
+        return self.call(send, max_retries=0)
+
+    def call(self, send, max_retries: int = None):
+        """Run send() -> Response with breaker checks and budgeted backoff retries."""
+        max_retries = self.max_retries if max_retries is None else max_retries
+        self._count("calls")
+        self.budget.record_request()
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow_request():
+                raise CircuitOpenError(f"{self.name} circuit open")
+
+            try:
+                response = send()
+            except Exception as e:
+                if not is_retryable_exception(e):
+                    if is_request_exception(e):
+                        self._count("failures")
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.release_probe()
+                    raise
+                self._count("failures")
+                self.breaker.record_failure()
+                if attempt >= max_retries or not self.budget.try_retry():
+                    raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS:
+                    self.breaker.record_success()
+                    return response
+                self._count("failures")
+                self.breaker.record_failure()
+                if attempt >= max_retries or not self.budget.try_retry():
+                    return response
+                response.close()
+
+            self._count("retries")
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    def stats(self) -> dict:
+        with self._counters_lock:
+            counters = dict(self.counters)
+        return {**counters, "breaker": self.breaker.stats(), "retry_budget": self.budget.stats()}
@@ -0,0 +1,134 @@
+"""
+AdversaryIQ - Crisis Analysis Result Cache
+
+Disk-backed (SQLite), content-addressed cache for full intelligence
+assessments. Entries expire after a TTL and the least recently used
+ones are evicted once the stored payload exceeds a byte budget.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from leaders import leader_keys
+from profiles import profile_version
+
+CACHE_DIR = os.environ.get("AIQ_CACHE_DIR", os.path.join(tempfile.gettempdir(), "adversaryiq"))
+CRISIS_CACHE_MAX_MB = float(os.environ.get("CRISIS_CACHE_MAX_MB", "64"))
+CRISIS_CACHE_TTL_HOURS = float(os.environ.get("CRISIS_CACHE_TTL_HOURS", "24"))
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different submissions share a key."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def crisis_cache_key(crisis_text: str) -> str:
+    """Content address: normalized scenario text + profile data version."""
+    payload = f"{profile_version()}\n{normalize_text(crisis_text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_cacheable_assessment(data: dict) -> bool:
+    """Only cache assessments where every agent produced a real analysis."""
+    agents = data.get('agents', {})
+    return all(
+        key in agents and agents[key].get('escalation_phase') != 'Error'
+        for key in leader_keys()
+    )
+
+
+class ResultCache:
+    """SQLite-backed JSON cache with TTL expiry and LRU eviction by size."""
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def contains(self, key: str) -> bool:
+        """True if key holds an unexpired entry; does not count as a hit or miss."""
+        with self._lock:
+            row = self._db.execute("SELECT created FROM entries WHERE key = ?", (key,)).fetchone()
+        return row is not None and time.time() - row[0] <= self.ttl_seconds
+
+    def put(self, key: str, value: dict):
+        encoded = json.dumps(value)
+        size = len(encoded.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, size, now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used until under budget."""
+        self._db.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl_seconds,))
+
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed ASC"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+
+crisis_cache = ResultCache(
+    os.path.join(CACHE_DIR, "crisis_cache.sqlite3"),
+    max_bytes=int(CRISIS_CACHE_MAX_MB * 1024 * 1024),
+    ttl_seconds=CRISIS_CACHE_TTL_HOURS * 3600
+)
@@ -0,0 +1,329 @@
+"""
+AdversaryIQ - Provisional Risk Estimate
+
+A local escalation estimate that is ready before any LLM call returns.
+Each leader's profile and beliefs files are reduced to one row of numeric
+features in [0, 1]: OCEAN scores, the scapegoat / issue-linkage /
+follow-through parameters, crisis latency and the belief values. The
+scenario text is matched against keyword stems for the profiles' crisis
+types (the predictive_framework keys) and for escalation intensity.
+
+Scoring is a single product, leaders x features @ features x crisis types
+@ crisis types x scenarios, so a whole scenario library can be scored at
+once for triage. A lookup takes well under a millisecond once NumPy is
+loaded (it is imported on first use).
+
+The estimate is a prior, not a verdict. process_crisis shows it in the
+executive summary while the agents run, then reconciles it with the LLM
+overall_risk.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+
+from leaders import BELIEFS_SUFFIX, PROFILE_SUFFIX
+from profiles import PROFILE_DIR, profile_version
+
+RISK_LEVELS = ("Low", "Medium", "High")
+
+# Score thresholds for Medium and High
+MEDIUM_AT = 0.45
+HIGH_AT = 0.65
+
+# Leader features and how each is read from the profile (labels name the drivers in the UI)
+FEATURES = (
+    ("hostility", "low agreeableness"),
+    ("volatility", "neuroticism"),
+    ("layer_gap", "public/private gap"),
+    ("scapegoating", "scapegoating"),
+    ("issue_linkage", "issue linkage"),
+    ("follow_through", "follow-through"),
+    ("speed", "fast crisis response"),
+    ("threat", "threat perception"),
+    ("impulsivity", "impulsivity"),
+    ("domestic_pressure", "weak domestic support"),
+    ("rigidity", "rigidity"),
+    ("leverage", "leverage"),
+)
+FEATURE_NAMES = tuple(name for name, _ in FEATURES)
+
+# Crisis types (predictive_framework keys), with keyword stems matched at word starts
+CRISIS_TYPES = {
+    "military_conflict": ("military", "troop", "invade", "invasion", "strike", "missile", "nuclear", "blockade",
+                          "naval", "navy", "warship", "border", "clash", "war", "attack", "drone", "mobili",
+                          "exercise", "shell", "airspace", "incursion", "artillery", "bomb", "base", "encircl"),
+    "economic_pressure": ("sanction", "tariff", "embargo", "trade", "export", "import", "currency", "oil", "gas",
+                          "energy", "pipeline", "price", "grain", "debt", "market", "supply", "bank", "asset"),
+    "domestic_crisis": ("protest", "coup", "riot", "election", "unrest", "opposition", "rebel", "uprising",
+                        "assassinat", "scandal", "mutiny", "referendum", "insurgen", "purge", "dissident"),
+    "international_negotiation": ("talk", "summit", "treaty", "negotiat", "ceasefire", "agreement",
+                                  "diplomat", "accord", "mediat", "peace", "deal", "envoy", "dialogue"),
+}
+CRISIS_TYPE_NAMES = tuple(CRISIS_TYPES)
+
+# Feature weights per crisis type (columns are normalized to sum to 1)
+TYPE_WEIGHTS = {
+    "military_conflict": {"hostility": 2, "volatility": 1, "threat": 3, "impulsivity": 2, "speed": 2,
+                          "follow_through": 1, "rigidity": 1},
+    "economic_pressure": {"leverage": 3, "issue_linkage": 2, "hostility": 1, "follow_through": 1, "rigidity": 1,
+                          "threat": 1},
+    "domestic_crisis": {"scapegoating": 3, "domestic_pressure": 3, "volatility": 1, "layer_gap": 1,
+                        "impulsivity": 1},
+    "international_negotiation": {"hostility": 2, "rigidity": 2, "issue_linkage": 1, "layer_gap": 2,
+                                  "follow_through": 1},
+}
+
+# Escalation intensity: stems raise it, de-escalation stems (negative) lower it
+INTENSITY_WEIGHTS = {
+    "nuclear": 1.2, "invade": 1.0, "invasion": 1.0, "war": 0.9, "missile": 0.8, "strike": 0.7, "attack": 0.8,
+    "bomb": 0.8, "blockade": 0.8, "encircl": 0.6, "troop": 0.5, "mobili": 0.6, "military": 0.4, "naval": 0.4,
+    "border": 0.3, "base": 0.2, "coup": 0.8, "assassinat": 0.8, "shell": 0.6, "incursion": 0.6, "embargo": 0.5,
+    "sanction": 0.4, "ultimatum": 0.7, "threat": 0.4, "seiz": 0.5, "expel": 0.3, "protest": 0.2,
+    "talk": -0.3, "ceasefire": -0.5, "peace": -0.4, "treaty": -0.3, "agreement": -0.3, "summit": -0.2,
+}
+
+# Crisis type mix when the text matches no stems (and smoothing otherwise)
+TYPE_PRIOR = 0.5
+
+# Every stem once, with the stem lengths to try against each word
+_STEMS = tuple(dict.fromkeys([stem for stems in CRISIS_TYPES.values() for stem in stems] + list(INTENSITY_WEIGHTS)))
+_STEM_IDS = {stem: i for i, stem in enumerate(_STEMS)}
+_STEM_LENGTHS = sorted({len(stem) for stem in _STEMS})
+
+_WORD = re.compile(r"[a-z]+")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+_lock = threading.Lock()
+
+# Provisional vs LLM overall risk, for calibrating the weights over time
+agreement = {"match": 0, "under": 0, "over": 0}
+
+
+def _clip(value: float) -> float:
+    return min(1.0, max(0.0, float(value)))
+
+
+def _mean(values, default: float = None):
+    values = [float(v) for v in values if isinstance(v, (int, float))]
+    return sum(values) / len(values) if values else default
+
+
+def _latency_hours(text) -> float:
+    """Fastest response time from a latency field such as "20–48 (≤96 outliers)"."""
+    numbers = _NUMBER.findall(str(text or ""))
+    return float(numbers[0]) if numbers else None
+
+
+def _decay_per_30_days(params: dict) -> float:
+    if "follow_through_decay_pct_per_30days" in params:
+        return params["follow_through_decay_pct_per_30days"]
+    if "follow_through_decay_pct_per_year" in params:
+        return params["follow_through_decay_pct_per_year"] * 30 / 365
+    return None
+
+
+def leader_features(profile: dict, beliefs: dict) -> list:
+    """One leader's feature row (FEATURE_NAMES order); None where the files say nothing."""
+    public = profile.get("public_ocean_scores") or {}
+    behavioral = profile.get("behavioral_ocean_scores") or {}
+    params = profile.get("behavioral_parameters") or {}
+    traits = ("openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism")
+
+    def scaled(value, scale):
+        return _clip(value / scale) if isinstance(value, (int, float)) else None
+
+    gaps = [abs(public[t] - behavioral[t]) for t in traits
+            if isinstance(public.get(t), (int, float)) and isinstance(behavioral.get(t), (int, float))]
+    decay = _decay_per_30_days(params)
+    latency = _latency_hours(params.get("crisis_latency_hours"))
+    support = beliefs.get("domestic_support")
+    flex = beliefs.get("context_switch_flex")
+    agreeableness = scaled(behavioral.get("agreeableness"), 10)
+
+    row = {
+        "hostility": None if agreeableness is None else 1 - agreeableness,
+        "volatility": scaled(behavioral.get("neuroticism"), 10),
+        "layer_gap": _clip(sum(gaps) / len(gaps) / 5) if gaps else None,
+        "scapegoating": _mean([params.get("scapegoat_probability_pct", 0) / 100 if "scapegoat_probability_pct" in params
+                               else None, beliefs.get("scapegoat_tendency")]),
+        "issue_linkage": scaled(params.get("link_unrelated_issues_pct"), 100),
+        "follow_through": None if decay is None else 1 - _clip(decay / 100),
+        "speed": None if latency is None else 1 / (1 + latency / 24),
+        # Belief names differ per leader (western_threat, foreign_threat; energy_leverage, industrial_capacity, ...)
+        "threat": _mean(v for k, v in beliefs.items() if k.endswith("_threat")),
+        "impulsivity": beliefs.get("impulsivity_index"),
+        "domestic_pressure": None if support is None else 1 - support,
+        "rigidity": None if flex is None else 1 - flex,
+        "leverage": _mean(v for k, v in beliefs.items() if k.endswith(("_leverage", "_capacity", "_resilience"))),
+    }
+    return [row[name] for name in FEATURE_NAMES]
+
+
+def load_profile_rows(directory: str = PROFILE_DIR) -> tuple:
+    """(leader keys, feature rows) from every profile with a matching beliefs file."""
+    keys, rows = [], []
+    if not os.path.isdir(directory):
+        return keys, rows
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(PROFILE_SUFFIX):
+            continue
+        stem = name[:-len(PROFILE_SUFFIX)]
+        beliefs_path = os.path.join(directory, stem + BELIEFS_SUFFIX)
+        if not os.path.exists(beliefs_path):
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            profile = json.load(f)
+        with open(beliefs_path, encoding="utf-8") as f:
+            beliefs = json.load(f).get("beliefs") or {}
+        keys.append((profile.get("registry") or {}).get("key") or stem)
+        rows.append(leader_features(profile, beliefs))
+    return keys, rows
+
+
+def stem_ids(text: str) -> set:
+    """Indices (into _STEMS) of the keyword stems that start a word of text."""
+    words = set(_WORD.findall(str(text).lower()))
+    return {_STEM_IDS[word[:n]] for word in words for n in _STEM_LENGTHS if word[:n] in _STEM_IDS}
+
+
+@lru_cache(maxsize=1)
+def _stem_weights() -> tuple:
+    """(stems x crisis types membership, raising weights, lowering weights)."""
+    import numpy as np
+
+    types = np.zeros((len(_STEMS), len(CRISIS_TYPE_NAMES)))
+    for j, crisis_type in enumerate(CRISIS_TYPE_NAMES):
+        types[[_STEM_IDS[stem] for stem in CRISIS_TYPES[crisis_type]], j] = 1
+    weights = np.array([INTENSITY_WEIGHTS.get(stem, 0.0) for stem in _STEMS])
+    return types, np.maximum(weights, 0), np.maximum(-weights, 0)
+
+
+@lru_cache(maxsize=4)
+def _model(version: str, directory: str) -> tuple:
+    """(leader keys, X leaders x features, W features x types) for one profile version."""
+    import numpy as np
+
+    keys, rows = load_profile_rows(directory)
+    # Unknown features sit at the midpoint, so they neither raise nor lower a score
+    X = np.array([[0.5 if value is None else value for value in row] for row in rows], dtype=float)
+    X = X.reshape(len(keys), len(FEATURE_NAMES))
+
+    W = np.zeros((len(FEATURE_NAMES), len(CRISIS_TYPE_NAMES)))
+    for j, crisis_type in enumerate(CRISIS_TYPE_NAMES):
+        for feature, weight in TYPE_WEIGHTS[crisis_type].items():
+            W[FEATURE_NAMES.index(feature), j] = weight
+    W /= W.sum(axis=0, keepdims=True)
+    return tuple(keys), X, W
+
+
+def model(directory: str = PROFILE_DIR) -> tuple:
+    with _lock:
+        return _model(profile_version(), directory)
+
+
+def scenario_signals(scenarios: list) -> tuple:
+    """(T scenarios x crisis types mix, type hits, intensity per scenario) from keyword stems."""
+    import numpy as np
+
+    # Scenarios x stems presence matrix; everything after this is matrix arithmetic
+    M = np.zeros((len(scenarios), len(_STEMS)))
+    for i, text in enumerate(scenarios):
+        M[i, list(stem_ids(text))] = 1
+    types, raising, lowering = _stem_weights()
+
+    hits = M @ types
+    T = hits + TYPE_PRIOR
+    T /= T.sum(axis=1, keepdims=True)
+    intensity = (1 - np.exp(-(M @ raising))) * np.exp(-(M @ lowering))
+    return T, hits, intensity
+
+
+def overall_risk(levels) -> str:
+    """Same rule as the backend's calculateOverallRisk."""
+    levels = list(levels)
+    high, medium = levels.count("High"), levels.count("Medium")
+    if high >= 2:
+        return "High"
+    if high >= 1 or medium >= 2:
+        return "Medium"
+    return "Low"
+
+
+def estimate_many(scenarios: list, directory: str = PROFILE_DIR) -> list:
+    """Provisional estimates for many scenarios in one pass; [] when no profiles are available.
+
+    Each estimate: {"leaders": {key: {"score", "level", "drivers"}}, "overall_risk",
+    "crisis_type" (None if no keyword matched), "intensity", "elapsed_ms"} (elapsed is
+    for the whole call).
+    """
+    import numpy as np
+
+    started = time.perf_counter()
+    keys, X, W = model(directory)
+    if not keys or not scenarios:
+        return []
+
+    T, hits, intensity = scenario_signals(scenarios)
+    disposition = X @ W @ T.T                               # leaders x scenarios, in [0, 1]
+    # Intensity sets the level of the crisis; disposition decides who escalates it
+    scores = 1 / (1 + np.exp(-6 * (0.55 * intensity + 0.45 * disposition - 0.5)))
+    levels = np.where(scores >= HIGH_AT, 2, np.where(scores >= MEDIUM_AT, 1, 0))
+    # Per-feature contributions for each leader, using each scenario's weight mix
+    contributions = X[:, :, None] * (W @ T.T)[None, :, :]   # leaders x features x scenarios
+    top = np.argsort(-contributions, axis=1)[:, :2, :]
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    estimates = []
+    for s in range(len(scenarios)):
+        leaders = {
+            key: {"score": round(float(scores[l, s]), 3), "level": RISK_LEVELS[levels[l, s]],
+                  "drivers": [FEATURES[f][1] for f in top[l, :, s]]}
+            for l, key in enumerate(keys)
+        }
+        estimates.append({
+            "leaders": leaders,
+            "overall_risk": overall_risk(leader["level"] for leader in leaders.values()),
+            "crisis_type": CRISIS_TYPE_NAMES[int(np.argmax(hits[s]))] if hits[s].any() else None,
+            "intensity": round(float(intensity[s]), 3),
+            "elapsed_ms": round(elapsed_ms, 2),
+        })
+    return estimates
+
+
+def estimate_risk(scenario: str, directory: str = PROFILE_DIR) -> dict:
+    """Provisional estimate for one scenario, or None when no profiles are available."""
+    estimates = estimate_many([scenario], directory)
+    return estimates[0] if estimates else None
+
+
+def reconcile(estimate: dict, assessment: dict, record: bool = True) -> dict:
+    """Compare a provisional estimate with the LLM assessment's overall_risk.
+
+    Returns {"local", "llm", "agreement"} (agreement is "match", "under" when the
+    local estimate was lower, or "over"), or None if the LLM gave no usable level.
+    record=False skips the agreement counters (e.g. for a coalesced duplicate).
+    """
+    local, llm = estimate["overall_risk"], assessment.get("overall_risk")
+    if llm not in RISK_LEVELS:
+        return None
+    difference = RISK_LEVELS.index(local) - RISK_LEVELS.index(llm)
+    result = "match" if difference == 0 else ("under" if difference < 0 else "over")
+    if record:
+        with _lock:
+            agreement[result] += 1
+    return {"local": local, "llm": llm, "agreement": result}
+
+
+def agreement_metrics() -> str:
+    """Prometheus counters for provisional vs LLM overall risk."""
+    lines = ["# HELP aiq_frontend_risk_estimate_total Provisional overall risk compared with the LLM verdict",
+             "# TYPE aiq_frontend_risk_estimate_total counter"]
+    with _lock:
+        counts = dict(agreement)
+    for result, count in counts.items():
+        lines.append(f'aiq_frontend_risk_estimate_total{{agreement="{result}"}} {count}')
+    return "\n".join(lines)
@@ -0,0 +1,213 @@
+"""
+AdversaryIQ - Near-Duplicate Scenario Index
+
+Finds earlier scenarios that are small edits of a new one (changed date,
+extra sentence, different country) so their cached analysis can be
+offered before anything is sent to the backend. Scenarios are reduced to
+character 5-gram shingles and a 64-slot MinHash signature (one-permutation
+hashing with rotation densification, so each shingle is hashed once); LSH
+banding narrows lookup to a few binary searches, and matching signature
+slots estimate the Jaccard similarity of the candidates. No network,
+embedding model or NumPy involved; a lookup is a few hundred microseconds.
+
+Signatures and band keys live in flat arrays (about 450 bytes per
+scenario), so hundreds of thousands of entries fit in memory. The index
+is persisted as an append-only JSONL log under CACHE_DIR and loaded on
+first use.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from result_cache import CACHE_DIR
+
+SCENARIO_INDEX_SLOTS = 64
+
+# 16 bands of 4 slots: pairs above ~0.7 similarity are almost always candidates
+SCENARIO_INDEX_BANDS = 16
+
+# Matches below this estimated similarity are not offered
+SIMILAR_MIN = float(os.environ.get("SIMILAR_MIN", "0.8"))
+
+SHINGLE_CHARS = 5
+
+# Only the start of very long scenarios is shingled, keeping lookups sub-millisecond
+INDEX_MAX_CHARS = 1000
+
+PREVIEW_CHARS = 120
+
+_WORD = re.compile(r"\w+")
+_EMPTY = 1 << 64
+_GOLDEN = 0x9E3779B1
+
+
+def shingles(text: str) -> set:
+    """Character 5-grams of the lower-cased words, joined by single spaces."""
+    text = " ".join(_WORD.findall(text.lower()))[:INDEX_MAX_CHARS]
+    return {text[i:i + SHINGLE_CHARS] for i in range(max(1, len(text) - SHINGLE_CHARS + 1))}
+
+
+def minhash(text: str, slots: int = SCENARIO_INDEX_SLOTS) -> list:
+    """One-permutation MinHash: each shingle's 64-bit hash picks a slot and competes for its minimum.
+
+    Empty slots borrow the next filled slot's value, offset by the distance,
+    so short texts still produce comparable signatures. Values are 32-bit.
+    """
+    bins = [_EMPTY] * slots
+    for gram in shingles(text):
+        h = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little")
+        slot, value = h % slots, h // slots
+        if value < bins[slot]:
+            bins[slot] = value
+
+    signature = [0] * slots
+    for i, value in enumerate(bins):
+        distance = 0
+        while value == _EMPTY and distance < slots:
+            distance += 1
+            value = bins[(i + distance) % slots]
+        signature[i] = (value + distance * _GOLDEN) & 0xFFFFFFFF
+    return signature
+
+
+class ScenarioIndex:
+    """MinHash/LSH index from scenario text to cache keys."""
+
+    def __init__(self, path: str, slots: int = SCENARIO_INDEX_SLOTS, bands: int = SCENARIO_INDEX_BANDS):
+        if slots % bands:
+            raise ValueError("slots must be a multiple of bands")
+        self.path = path
+        self.slots = slots
+        self.bands = bands
+        self.rows = slots // bands
+
+        self._signatures = array("I")
+        self._keys = []
+        self._versions = []
+        self._created = array("d")
+        self._previews = []
+        self._ids_by_key = {}
+        # Per band: band keys kept sorted, with the matching entry ids alongside
+        self._band_keys = [array("q") for _ in range(bands)]
+        self._band_ids = [array("l") for _ in range(bands)]
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def band_keys(self, signature) -> list:
+        rows = self.rows
+        return [hash(tuple(signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+    def _append(self, key: str, version: str, created: float, preview: str, signature) -> int:
+        """Store one entry's data (lock held); returns its id, or None for a known key."""
+        existing = self._ids_by_key.get(key)
+        if existing is not None:
+            self._created[existing] = created
+            return None
+
+        entry_id = len(self._keys)
+        self._signatures.extend(signature)
+        self._keys.append(key)
+        self._versions.append(version)
+        self._created.append(created)
+        self._previews.append(preview)
+        self._ids_by_key[key] = entry_id
+        return entry_id
+
+    def _ensure_loaded(self):
+        """Replay the on-disk log once (lock held), then sort the band arrays in one pass."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    signature = array("I", bytes.fromhex(record["sig"]))
+                    if len(signature) == self.slots:
+                        self._append(record["key"], record["version"], record["created"], record["preview"], signature)
+                except (ValueError, KeyError, TypeError):
+                    # Torn last line or a record from another index layout
+                    continue
+
+        n = self.slots
+        pairs = [[] for _ in range(self.bands)]
+        for entry_id in range(len(self._keys)):
+            for band, band_key in enumerate(self.band_keys(self._signatures[entry_id * n:(entry_id + 1) * n])):
+                pairs[band].append((band_key, entry_id))
+        for band, band_pairs in enumerate(pairs):
+            band_pairs.sort()
+            self._band_keys[band] = array("q", (band_key for band_key, _ in band_pairs))
+            self._band_ids[band] = array("l", (entry_id for _, entry_id in band_pairs))
+
+    def load(self):
+        """Load the on-disk log now (e.g. on a background thread at startup) instead of on first use."""
+        with self._lock:
+            self._ensure_loaded()
+
+    def add(self, key: str, text: str, version: str, created: float = None):
+        """Index a scenario whose analysis is cached under key."""
+        created = created or time.time()
+        preview = " ".join(text.split())[:PREVIEW_CHARS]
+        signature = minhash(text, self.slots)
+        band_keys = self.band_keys(signature)
+        with self._lock:
+            self._ensure_loaded()
+            entry_id = self._append(key, version, created, preview, signature)
+            if entry_id is None:
+                return
+            for keys, ids, band_key in zip(self._band_keys, self._band_ids, band_keys):
+                position = bisect_left(keys, band_key)
+                keys.insert(position, band_key)
+                ids.insert(position, entry_id)
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "version": version, "created": created, "preview": preview,
+                                    "sig": array("I", signature).tobytes().hex()}) + "\n")
+
+    def query(self, text: str, version: str, min_similarity: float = SIMILAR_MIN, limit: int = 5) -> list:
+        """Up to `limit` matches indexed under this profile version, most similar (then newest) first.
+
+        Each match is a dict with key, similarity (estimated Jaccard), created and preview.
+        """
+        signature = minhash(text, self.slots)
+        band_keys = self.band_keys(signature)
+        n = self.slots
+        with self._lock:
+            self._ensure_loaded()
+            candidates = set()
+            for keys, ids, band_key in zip(self._band_keys, self._band_ids, band_keys):
+                position = bisect_left(keys, band_key)
+                while position < len(keys) and keys[position] == band_key:
+                    candidates.add(ids[position])
+                    position += 1
+
+            matches = []
+            for entry_id in candidates:
+                if self._versions[entry_id] != version:
+                    continue
+                stored = self._signatures[entry_id * n:(entry_id + 1) * n]
+                similarity = sum(x == y for x, y in zip(signature, stored)) / n
+                if similarity >= min_similarity:
+                    matches.append({"key": self._keys[entry_id], "similarity": similarity,
+                                    "created": self._created[entry_id], "preview": self._previews[entry_id]})
+
+        matches.sort(key=lambda match: (-match["similarity"], -match["created"]))
+        return matches[:limit]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._keys)
+
+
+scenario_index = ScenarioIndex(os.path.join(CACHE_DIR, "scenario_index.jsonl"))
@@ -0,0 +1,189 @@
+"""
+AdversaryIQ - Single-Flight Request Coalescing
+
+Concurrent identical requests (same content key) share one backend call:
+the first caller starts it on a background thread, later callers attach
+while it is still running, and every caller replays the same event stream
+from the start. Unlike the result cache this covers the window before any
+result exists; once a flight finishes, the next request starts a new one.
+
+When the last subscriber stops reading (its Gradio event was cancelled or
+superseded), the flight is cancelled: its on_cancel callbacks abort the
+backend request, which in turn aborts the LLM calls behind it.
+"""
+
+import threading
+
+
+class Flight:
+    """Event buffer for one in-flight call, readable by any number of subscribers."""
+
+    def __init__(self):
+        self.events = []
+        self.done = False
+        self.error = None
+        self.cancelled = False
+        self.subscribers = 0
+        self._on_cancel = []
+        self._cond = threading.Condition()
+
+    def publish(self, event):
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def finish(self, error: Exception = None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    def on_cancel(self, callback):
+        """Call callback() when the flight is cancelled (at once if it already was)."""
+        with self._cond:
+            if not self.cancelled:
+                self._on_cancel.append(callback)
+                return
+        callback()
+
+    def cancel(self):
+        """Abandon an unfinished flight and run its on_cancel callbacks once."""
+        with self._cond:
+            if self.cancelled or self.done:
+                return
+            self.cancelled = True
+            callbacks, self._on_cancel = self._on_cancel, []
+        for callback in callbacks:
+            callback()
+
+    def join(self):
+        """A Subscription counted from now on, or None if the flight was already cancelled."""
+        with self._cond:
+            if self.cancelled:
+                return None
+            self.subscribers += 1
+        return Subscription(self)
+
+    def release(self):
+        """Drop one subscriber; the last one leaving an unfinished flight cancels it."""
+        with self._cond:
+            self.subscribers -= 1
+            abandoned = self.subscribers == 0 and not self.done
+        if abandoned:
+            self.cancel()
+
+    def drain(self):
+        """Yield every event from the first; re-raise the producer's error at the end."""
+        position = 0
+        while True:
+            with self._cond:
+                while position >= len(self.events) and not self.done:
+                    self._cond.wait()
+                pending = self.events[position:]
+                done, error = self.done, self.error
+            position += len(pending)
+            yield from pending
+            if done and position >= len(self.events):
+                if error is not None:
+                    raise error
+                return
+
+
+class Subscription:
+    """One subscriber's view of a flight.
+
+    The subscriber is counted from the moment it joins, not from its first
+    next(), so a caller that has joined but not started reading keeps the
+    flight alive. Closing it (or reading to the end) releases it once.
+    """
+
+    def __init__(self, flight: Flight):
+        self.flight = flight
+        self._events = flight.drain()
+        self._released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._events)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._events.close()
+        self.flight.release()
+
+    def __del__(self):
+        self.close()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one producer."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.leaders = 0
+        self.followers = 0
+        self.abandoned = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def stream(self, key: str, produce) -> tuple:
+        """(event iterator, joined) for key; produce(flight) is only called if no flight is running.
+
+        joined is True when the caller attached to another caller's flight.
+        produce should register a way to abort its work with flight.on_cancel.
+        """
+        # Subscribers are counted while holding the lock, before the caller reads anything,
+        # so a leader cancelling in the meantime cannot abandon a flight someone just joined
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                subscription = flight.join()
+                if subscription is not None:
+                    self.followers += 1
+                    return subscription, True
+            flight = self._flights[key] = Flight()
+            subscription = flight.join()
+            self.leaders += 1
+        flight.on_cancel(lambda: self._abandon(key, flight))
+
+        def run():
+            error = None
+            try:
+                for event in produce(flight):
+                    if flight.cancelled:
+                        break
+                    flight.publish(event)
+            except Exception as e:
+                error = e
+            finally:
+                # Leave the map before waking subscribers so a retry starts a fresh flight
+                with self._lock:
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+                flight.finish(error)
+
+        threading.Thread(target=run, name=f"{self.name}-flight", daemon=True).start()
+        return subscription, False
+
+    def _abandon(self, key: str, flight: Flight):
+        # Leave the map now so a new request does not join a flight that is being torn down
+        with self._lock:
+            self.abandoned += 1
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def stats(self) -> dict:
+        return {"leaders": self.leaders, "followers": self.followers, "abandoned": self.abandoned,
+                "in_flight": self.in_flight()}
@@ -0,0 +1,217 @@
+"""
+AdversaryIQ - Belief Sensitivity Sweeps
+
+What-if runs over the leaders' belief values: one scenario, a grid of
+overrides for up to two beliefs (say domestic_support at 0.3 / 0.45 / 0.6
+crossed with western_threat at 0.6 / 0.8), one agent call per leader and
+distinct override. The Node API plans and runs the sweep
+(/api/process-crisis/sweep) under a hard call budget. This module parses
+the analyst's grid, mirrors the plan so the call count is known (and an
+over-budget grid refused) before anything is sent, and aggregates the
+variants into a sensitivity table and heatmap.
+
+Variants are scattered into one leaders x values x values array; a leader
+without a swept belief fills that whole axis from a single call. Everything
+after that (overall risk per cell, marginal means, swing, modal escalation
+phase) is NumPy array arithmetic, imported on first use.
+"""
+
+import json
+import os
+import re
+from itertools import product
+
+from leaders import BELIEFS_SUFFIX, PROFILE_SUFFIX
+from profiles import PROFILE_DIR
+from risk_estimate import RISK_LEVELS
+
+# Mirrors the backend's SWEEP_MAX_CALLS / SWEEP_MAX_VALUES defaults; the backend enforces its own
+SWEEP_MAX_CALLS = int(os.environ.get("SWEEP_MAX_CALLS", "75"))
+SWEEP_MAX_VALUES = int(os.environ.get("SWEEP_MAX_VALUES", "9"))
+SWEEP_MAX_PARAMETERS = 2
+
+_GRID_LINE = re.compile(r"^\s*(\w+)\s*[:=]\s*(.+?)\s*$")
+# "0.3..0.9/5": five evenly spaced values from 0.3 to 0.9
+_GRID_RANGE = re.compile(r"^(\d*\.?\d+)\s*\.\.\s*(\d*\.?\d+)\s*/\s*(\d+)$")
+
+
+def parse_grid(text: str) -> dict:
+    """{belief: [values]} from lines like "domestic_support: 0.3, 0.45, 0.6" or
+    "western_threat = 0.5..0.9/5". Raises ValueError with a message for the analyst."""
+    grid = {}
+    for line in (text or "").splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        match = _GRID_LINE.match(line)
+        if not match:
+            raise ValueError(f'Expected "belief: values", got "{line.strip()}"')
+        name, spec = match.groups()
+        spread = _GRID_RANGE.match(spec)
+        try:
+            if spread:
+                start, stop, count = float(spread.group(1)), float(spread.group(2)), int(spread.group(3))
+                if count < 2:
+                    raise ValueError
+                values = [round(start + (stop - start) * i / (count - 1), 4) for i in range(count)]
+            else:
+                values = [float(value) for value in re.split(r"[,\s]+", spec) if value]
+        except ValueError:
+            raise ValueError(f"Could not read the values for {name}: {spec}") from None
+        grid[name] = values
+    if not grid:
+        raise ValueError("Enter at least one belief to sweep, e.g. domestic_support: 0.3, 0.45, 0.6")
+    return grid
+
+
+def load_beliefs(directory: str = PROFILE_DIR) -> dict:
+    """{leader key: beliefs} from every profile with a matching beliefs file."""
+    beliefs = {}
+    if not os.path.isdir(directory):
+        return beliefs
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(PROFILE_SUFFIX):
+            continue
+        stem = name[:-len(PROFILE_SUFFIX)]
+        beliefs_path = os.path.join(directory, stem + BELIEFS_SUFFIX)
+        if not os.path.exists(beliefs_path):
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            key = (json.load(f).get("registry") or {}).get("key") or stem
+        with open(beliefs_path, encoding="utf-8") as f:
+            beliefs[key] = json.load(f).get("beliefs") or {}
+    return beliefs
+
+
+def plan_sweep(grid: dict, beliefs_by_leader: dict, budget: int = None) -> dict:
+    """Same plan as the backend's planSweep: parameters, sorted values, leaders,
+    baseline, cells, calls, budget and tasks [(leader, overrides)].
+
+    Raises ValueError for a bad grid or one needing more than min(budget,
+    SWEEP_MAX_CALLS) calls.
+    """
+    if not grid:
+        raise ValueError("Sweep grid required")
+    parameters = list(grid)
+    if len(parameters) > SWEEP_MAX_PARAMETERS:
+        raise ValueError(f"At most {SWEEP_MAX_PARAMETERS} beliefs can be swept at once")
+
+    values = {}
+    for parameter in parameters:
+        if not grid[parameter]:
+            raise ValueError(f"No values given for {parameter}")
+        if not all(0 <= value <= 1 for value in grid[parameter]):
+            raise ValueError(f"Values for {parameter} must be numbers between 0 and 1")
+        values[parameter] = sorted(set(grid[parameter]))
+        if len(values[parameter]) > SWEEP_MAX_VALUES:
+            raise ValueError(f"At most {SWEEP_MAX_VALUES} values per belief")
+        if not any(parameter in beliefs for beliefs in beliefs_by_leader.values()):
+            raise ValueError(f"No selected leader has a belief named {parameter}")
+
+    tasks = []
+    for leader, beliefs in beliefs_by_leader.items():
+        swept = [parameter for parameter in parameters if parameter in beliefs]
+        tasks.extend((leader, dict(zip(swept, combo))) for combo in product(*(values[p] for p in swept)))
+
+    limit = min(budget if budget and budget > 0 else SWEEP_MAX_CALLS, SWEEP_MAX_CALLS)
+    if len(tasks) > limit:
+        raise ValueError(f"Sweep needs {len(tasks)} LLM calls; the budget is {limit}")
+
+    cells = 1
+    for parameter in parameters:
+        cells *= len(values[parameter])
+    return {
+        "parameters": parameters,
+        "values": values,
+        "leaders": list(beliefs_by_leader),
+        "baseline": {leader: {p: beliefs[p] for p in parameters if p in beliefs}
+                     for leader, beliefs in beliefs_by_leader.items()},
+        "cells": cells,
+        "calls": len(tasks),
+        "budget": limit,
+        "tasks": tasks,
+    }
+
+
+def _mean(values, valid, axis):
+    """Mean over axis of the valid entries (NaN where none are)."""
+    import numpy as np
+
+    counts = valid.sum(axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(valid, values, 0).sum(axis=axis) / counts
+
+
+def aggregate(sweep: dict) -> dict:
+    """Sensitivity table and heatmap data for a (possibly partial) sweep.
+
+    sweep is the backend's plan or final "sweep" event with the variants
+    received so far. Scores are risk levels as 0 (Low) .. 2 (High), NaN where
+    no usable answer arrived. Returns {"scores": leaders x rows x columns,
+    "cell_mean", "cell_level" (-1 until every leader has answered the cell),
+    "table": {parameter: {"mean": leaders x values, "phase": leaders x values,
+    "swing": per leader}}, "completed", "failed", "usage"}; a one-belief sweep
+    has a single column.
+    """
+    import numpy as np
+
+    parameters, values, leaders = sweep["parameters"], sweep["values"], sweep["leaders"]
+    shape = [len(values[parameter]) for parameter in parameters] + [1] * (SWEEP_MAX_PARAMETERS - len(parameters))
+    scores = np.full((len(leaders), *shape), np.nan)
+    phases = np.full(scores.shape, -1)
+    phase_names, usage, failed = {}, {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}, 0
+
+    # Scatter: a belief the variant did not override spans its whole axis
+    for variant in sweep.get("variants", []):
+        if variant is None or variant.get("key") not in leaders:
+            continue
+        index = [leaders.index(variant["key"])]
+        for parameter in parameters:
+            value = variant["beliefs"].get(parameter)
+            index.append(slice(None) if value is None else values[parameter].index(value))
+        index = tuple(index) + (0,) * (SWEEP_MAX_PARAMETERS - len(parameters))
+        if variant.get("escalation_risk") in RISK_LEVELS:
+            scores[index] = RISK_LEVELS.index(variant["escalation_risk"])
+            phases[index] = phase_names.setdefault(variant.get("escalation_phase") or "?", len(phase_names))
+        else:
+            failed += 1
+        for field in usage:
+            usage[field] += (variant.get("usage") or {}).get(field, 0)
+
+    valid = ~np.isnan(scores)
+    high, medium = (scores == 2).sum(axis=0), (scores == 1).sum(axis=0)
+    # Same rule as the backend's calculateOverallRisk, per cell
+    cell_level = np.where(high >= 2, 2, np.where((high >= 1) | (medium >= 2), 1, 0))
+    cell_level[valid.sum(axis=0) < len(leaders)] = -1
+
+    # Phases as one-hot counts, so the modal phase per marginal is an argmax
+    onehot = phases[..., None] == np.arange(max(len(phase_names), 1))
+    names = sorted(phase_names, key=phase_names.get)
+    table = {}
+    for axis, parameter in enumerate(parameters, 1):
+        other = 3 - axis
+        mean = _mean(scores, valid, other)
+        counts = onehot.sum(axis=other)
+        phase = np.where(counts.any(axis=-1), counts.argmax(axis=-1), -1)
+        known = valid.any(axis=other)
+        with np.errstate(invalid="ignore"):
+            swing = np.where(known, mean, -np.inf).max(axis=1) - np.where(known, mean, np.inf).min(axis=1)
+        table[parameter] = {
+            "mean": mean,
+            "phase": [[names[code] if code >= 0 else None for code in row] for row in phase],
+            "swing": np.where(known.any(axis=1), swing, np.nan),
+        }
+
+    return {
+        "parameters": parameters,
+        "values": values,
+        "leaders": leaders,
+        "baseline": sweep.get("baseline", {}),
+        "scores": scores,
+        "cell_mean": _mean(scores, valid, 0),
+        "cell_level": cell_level,
+        "table": table,
+        "completed": len([variant for variant in sweep.get("variants", []) if variant is not None]),
+        "calls": sweep.get("calls", 0),
+        "failed": failed,
+        "usage": usage,
+    }
@@ -0,0 +1,160 @@
+"""
+AdversaryIQ - Request Tracing and Metrics
+
+Each analysis gets a trace ID that is sent to the Node API in the
+X-Trace-Id header, so frontend and server logs line up. A Trace collects
+timed spans for the frontend stages (cache lookup, backend stream,
+rendering) plus the server's own spans from its "timing" stream event,
+and the same durations feed Prometheus-style histograms. Set METRICS_PORT
+to serve them (with cache hit counters) at http://<host>:<port>/metrics.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+TRACE_HEADER = "X-Trace-Id"
+
+# 0 disables the frontend metrics endpoint
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+
+# Seconds; same buckets as the backend's histograms
+LATENCY_BUCKETS = (0.001, 0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+
+
+def new_trace_id() -> str:
+    return secrets.token_hex(8)
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{key}="{json.dumps(str(value))[1:-1]}"' for key, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram keyed by label set."""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines)
+
+
+handler_duration = Histogram("aiq_frontend_handler_seconds", "Handler duration by handler and outcome")
+stage_duration = Histogram("aiq_frontend_stage_seconds", "Frontend stage duration by handler and stage")
+
+# Callables returning extra exposition text (cache counters) at scrape time
+_collectors = []
+
+
+def register_collector(collect):
+    _collectors.append(collect)
+
+
+def render_metrics() -> str:
+    parts = [handler_duration.render(), stage_duration.render(), *(collect() for collect in _collectors)]
+    return "\n".join(parts) + "\n"
+
+
+class Trace:
+    """Timed spans for one handler call, plus the server spans it reported."""
+
+    def __init__(self, handler: str, trace_id: str = None):
+        self.handler = handler
+        self.id = trace_id or new_trace_id()
+        self.started = time.perf_counter()
+        self.stages = {}        # stage -> accumulated seconds
+        self.server = None      # the backend's timing event, once received
+
+    @contextmanager
+    def span(self, stage: str):
+        """Time a block; repeated spans of the same stage accumulate."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started)
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def finish(self, outcome: str = "ok"):
+        """Record the handler and stage durations in the histograms."""
+        handler_duration.observe(self.elapsed, handler=self.handler, outcome=outcome)
+        for stage, seconds in self.stages.items():
+            stage_duration.observe(seconds, handler=self.handler, stage=stage)
+
+    def slowest_server_span(self, name: str) -> dict:
+        spans = [span for span in (self.server or {}).get("spans", []) if span.get("name") == name]
+        return max(spans, key=lambda span: span.get("duration_ms", 0), default=None)
+
+    def server_total(self, name: str) -> float:
+        """Summed duration (ms) of the server's spans with this name."""
+        return sum(span.get("duration_ms", 0) for span in (self.server or {}).get("spans", [])
+                   if span.get("name") == name)
+
+
+def start_metrics_server(port: int = METRICS_PORT):
+    """Serve render_metrics() at /metrics on a daemon thread; no-op when port is 0."""
+    if not port:
+        return None
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = render_metrics().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -0,0 +1,40 @@
+"""Voice audio store: concurrent writers for one clip."""
+
+import os
+import sys
+
+FRONTEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, FRONTEND_DIR)
+
+from audio_cache import AudioStore  # noqa: E402
+
+
+def test_interleaved_writers_for_one_key_do_not_mix(tmp_path):
+    store = AudioStore(str(tmp_path), max_bytes=1024 * 1024)
+
+    # Two listeners streaming the same clip, stepped alternately on one thread
+    with store.writing("clip") as first:
+        first.write(b"AAA")
+        with store.writing("clip") as second:
+            second.write(b"BBB")
+            first.write(b"AAAA")
+            second.write(b"BBBB")
+        first.write(b"AAA")
+
+    with open(store.get("clip"), "rb") as f:
+        assert f.read() == b"AAAAAAAAAA"
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+
+def test_failed_writer_leaves_no_partial(tmp_path):
+    store = AudioStore(str(tmp_path), max_bytes=1024 * 1024)
+
+    try:
+        with store.writing("clip") as f:
+            f.write(b"AAA")
+            raise RuntimeError("stream dropped")
+    except RuntimeError:
+        pass
+
+    assert store.get("clip") is None
+    assert os.listdir(tmp_path) == []
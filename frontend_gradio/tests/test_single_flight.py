@@ -0,0 +1,58 @@
+"""Single-flight coalescing: subscriber accounting and abandonment."""
+
+import os
+import sys
+import threading
+
+FRONTEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, FRONTEND_DIR)
+
+from single_flight import SingleFlight  # noqa: E402
+
+
+def blocking_producer(release: threading.Event, cancelled: threading.Event):
+    def produce(flight):
+        flight.on_cancel(cancelled.set)
+        yield {"type": "first"}
+        release.wait(5)
+        yield {"type": "last"}
+    return produce
+
+
+def test_leader_cancel_before_follower_reads_keeps_flight():
+    flights = SingleFlight("test")
+    release, cancelled = threading.Event(), threading.Event()
+    produce = blocking_producer(release, cancelled)
+
+    leader, joined = flights.stream("key", produce)
+    assert not joined
+    assert next(leader)["type"] == "first"
+    follower, joined = flights.stream("key", produce)
+    assert joined
+
+    # The leader is cancelled before the follower has called next() even once
+    leader.close()
+    assert not cancelled.is_set()
+    assert flights.stats()["abandoned"] == 0
+
+    release.set()
+    assert [event["type"] for event in follower] == ["first", "last"]
+    assert not cancelled.is_set()
+
+
+def test_last_subscriber_closing_unread_cancels_flight():
+    flights = SingleFlight("test")
+    release, cancelled = threading.Event(), threading.Event()
+    produce = blocking_producer(release, cancelled)
+
+    leader, _ = flights.stream("key", produce)
+    follower, _ = flights.stream("key", produce)
+    leader.close()
+    follower.close()
+
+    assert cancelled.wait(1)
+    assert flights.stats()["abandoned"] == 1
+    # A new request starts its own flight instead of joining the torn-down one
+    _, joined = flights.stream("key", produce)
+    assert not joined
+    release.set()
@@ -0,0 +1,86 @@
+"""
+AdversaryIQ - Eager Voice Pre-synthesis
+
+Starts all leaders' voice syntheses as soon as a crisis assessment
+arrives, on a bounded worker pool shared by every session. Voice
+buttons then pick up the finished (or still running) clip instead of
+starting a fresh request.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+VOICE_PREFETCH_WORKERS = int(os.environ.get("VOICE_PREFETCH_WORKERS", "3"))
+# Sessions with syntheses still queued; the oldest beyond this have theirs cancelled
+VOICE_PREFETCH_MAX_SESSIONS = int(os.environ.get("VOICE_PREFETCH_MAX_SESSIONS", "64"))
+
+
+class VoicePrefetcher:
+    """Bounded pool of background syntheses, deduplicated by clip key."""
+
+    def __init__(self, synthesize: Callable[[str, str], Optional[str]],
+                 key_for: Callable[[str, str], str], max_workers: int = VOICE_PREFETCH_WORKERS,
+                 max_sessions: int = VOICE_PREFETCH_MAX_SESSIONS):
+        self._synthesize = synthesize
+        self._key_for = key_for
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="voice-prefetch")
+        self._lock = threading.Lock()
+        self._inflight = {}   # clip key -> Future
+        self._sessions = OrderedDict()   # session id -> [Future], least recently prefetched first
+        self._max_sessions = max_sessions
+
+    def prefetch(self, session_id: str, agents: dict):
+        """Queue synthesis for every agent's public response, superseding the session's last crisis."""
+        self.cancel_session(session_id)
+
+        futures = []
+        for agent, agent_data in agents.items():
+            text = (agent_data or {}).get('public_response', '')
+            if text:
+                futures.append(self._submit(agent, text))
+
+        with self._lock:
+            self._sessions[session_id] = futures
+            # Finished syntheses live on in the audio store; only unfinished ones need a handle here
+            for stale in [sid for sid, pending in self._sessions.items() if all(f.done() for f in pending)]:
+                del self._sessions[stale]
+            overflow = max(0, len(self._sessions) - self._max_sessions)
+            evicted = [future for _ in range(overflow) for future in self._sessions.popitem(last=False)[1]]
+        self._cancel_futures(evicted)
+
+    def _submit(self, agent: str, text: str) -> Future:
+        key = self._key_for(agent, text)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._synthesize, agent, text)
+                self._inflight[key] = future
+                future.add_done_callback(lambda f, key=key: self._forget(key, f))
+        return future
+
+    def _forget(self, key: str, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def pending(self, agent: str, text: str) -> Optional[Future]:
+        """Future for a clip that is queued or being synthesized, if any."""
+        with self._lock:
+            return self._inflight.get(self._key_for(agent, text))
+
+    def cancel_session(self, session_id: str):
+        """Drop a session's queued syntheses; requests already on the wire finish into the audio store."""
+        with self._lock:
+            futures = self._sessions.pop(session_id, [])
+        self._cancel_futures(futures)
+
+    def _cancel_futures(self, futures: list):
+        with self._lock:
+            # Identical clips are shared between sessions; keep those another session still wants
+            shared = {id(f) for other in self._sessions.values() for f in other}
+        for future in futures:
+            if id(future) not in shared:
+                future.cancel()